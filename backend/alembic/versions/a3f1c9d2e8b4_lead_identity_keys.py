@@ -0,0 +1,35 @@
+"""Add normalized identity keys to leads
+
+Revision ID: a3f1c9d2e8b4
+Revises: 64f48068c176
+Create Date: 2026-10-19 09:12:40.512318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e8b4'
+down_revision: Union[str, Sequence[str], None] = '64f48068c176'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leads', sa.Column('normalized_phone', sa.String(), nullable=True))
+    op.add_column('leads', sa.Column('normalized_email', sa.String(), nullable=True))
+    op.create_index('ix_leads_normalized_phone', 'leads', ['normalized_phone'], unique=False, postgresql_using='hash')
+    op.create_index('ix_leads_normalized_email', 'leads', ['normalized_email'], unique=False, postgresql_using='hash')
+    # Existing rows are backfilled and deduplicated by LeadIdentityService.merge_duplicate_leads()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_normalized_email', table_name='leads')
+    op.drop_index('ix_leads_normalized_phone', table_name='leads')
+    op.drop_column('leads', 'normalized_email')
+    op.drop_column('leads', 'normalized_phone')
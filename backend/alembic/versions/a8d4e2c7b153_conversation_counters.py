@@ -0,0 +1,62 @@
+"""Add denormalized message counters to conversations
+
+Revision ID: a8d4e2c7b153
+Revises: f2c6b8d4a930
+Create Date: 2026-10-19 17:42:26.380915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4e2c7b153'
+down_revision: Union[str, Sequence[str], None] = 'f2c6b8d4a930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIRST_OUTBOUND = "(SELECT min(sent_at) FROM messages WHERE conversation_id = conversations.id AND direction = 'outbound')"
+
+# Seconds from the conversation opening to its first reply, per dialect
+FIRST_RESPONSE_SECONDS = {
+    'postgresql': f"GREATEST(EXTRACT(EPOCH FROM {FIRST_OUTBOUND} - created_at), 0)",
+    'sqlite': f"MAX((julianday({FIRST_OUTBOUND}) - julianday(created_at)) * 86400, 0)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('inbound_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('last_inbound_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('conversations', sa.Column('last_outbound_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('conversations', sa.Column('first_response_seconds', sa.Float(), nullable=True))
+
+    # Backfill from existing messages; the app keeps the counters current from here on
+    op.execute("""
+        UPDATE conversations SET
+            message_count = (SELECT count(*) FROM messages WHERE conversation_id = conversations.id),
+            inbound_count = (
+                SELECT count(*) FROM messages WHERE conversation_id = conversations.id AND direction = 'inbound'
+            ),
+            last_inbound_at = (
+                SELECT max(sent_at) FROM messages WHERE conversation_id = conversations.id AND direction = 'inbound'
+            ),
+            last_outbound_at = (
+                SELECT max(sent_at) FROM messages WHERE conversation_id = conversations.id AND direction = 'outbound'
+            )
+    """)
+    first_response = FIRST_RESPONSE_SECONDS.get(op.get_bind().dialect.name)
+    if first_response:
+        op.execute(f"UPDATE conversations SET first_response_seconds = {first_response} WHERE created_at IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversations', 'first_response_seconds')
+    op.drop_column('conversations', 'last_outbound_at')
+    op.drop_column('conversations', 'last_inbound_at')
+    op.drop_column('conversations', 'inbound_count')
+    op.drop_column('conversations', 'message_count')
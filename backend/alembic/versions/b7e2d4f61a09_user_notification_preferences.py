@@ -0,0 +1,32 @@
+"""Add notification contact details and preferences to users
+
+Revision ID: b7e2d4f61a09
+Revises: a3f1c9d2e8b4
+Create Date: 2026-10-19 10:03:18.204771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4f61a09'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2e8b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('phone_number', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('device_token', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('notification_channels', sa.String(), server_default='push,email,sms', nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'notification_channels')
+    op.drop_column('users', 'device_token')
+    op.drop_column('users', 'phone_number')
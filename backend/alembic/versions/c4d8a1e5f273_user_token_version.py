@@ -0,0 +1,28 @@
+"""Add token version to users for token revocation
+
+Revision ID: c4d8a1e5f273
+Revises: b7e2d4f61a09
+Create Date: 2026-10-19 12:41:07.518342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8a1e5f273'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4f61a09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,93 @@
+"""Add normalized contact columns and trigram indexes for typeahead
+
+Revision ID: c6e1f8b3a947
+Revises: b3f9a6d1c824
+Create Date: 2026-10-19 19:07:13.842650
+
+"""
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e1f8b3a947'
+down_revision: Union[str, Sequence[str], None] = 'b3f9a6d1c824'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, column)
+TRIGRAM_INDEXES = [
+    ('ix_conversations_normalized_sender_name_trgm', 'conversations', 'normalized_sender_name'),
+    ('ix_conversations_normalized_sender_phone_trgm', 'conversations', 'normalized_sender_phone'),
+    ('ix_leads_normalized_name_trgm', 'leads', 'normalized_name'),
+    ('ix_leads_normalized_phone_trgm', 'leads', 'normalized_phone'),
+    ('ix_leads_normalized_email_trgm', 'leads', 'normalized_email'),
+]
+
+BATCH_SIZE = 1000
+
+
+def _normalize_name(name: Optional[str]) -> Optional[str]:
+    # Same as app.utils.identity.normalize_name at the time of this migration
+    if not name:
+        return None
+    decomposed = unicodedata.normalize('NFKD', name)
+    unaccented = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r'[\W_]+', ' ', unaccented.casefold()).strip() or None
+
+
+def _backfill(table: str, source: str, target: str, normalize, where: str = '') -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            f"SELECT id, {source} FROM {table} WHERE id > :last_id {where} ORDER BY id LIMIT {BATCH_SIZE}"
+        ), {'last_id': last_id}).fetchall()
+        if not rows:
+            return
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {target} = :value WHERE id = :id"),
+            [{'id': row[0], 'value': normalize(row[1])} for row in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def _whatsapp_phone(sender_id: Optional[str]) -> Optional[str]:
+    digits = re.sub(r'\D', '', sender_id or '')
+    return f"+{digits}" if len(digits) >= 7 else None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('normalized_sender_name', sa.String(), nullable=True))
+    op.add_column('conversations', sa.Column('normalized_sender_phone', sa.String(), nullable=True))
+    op.add_column('leads', sa.Column('normalized_name', sa.String(), nullable=True))
+
+    _backfill('conversations', 'sender_name', 'normalized_sender_name', _normalize_name)
+    _backfill('conversations', 'sender_id', 'normalized_sender_phone', _whatsapp_phone, "AND channel = 'whatsapp'")
+    _backfill('leads', 'name', 'normalized_name', _normalize_name)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column], unique=False, postgresql_concurrently=True,
+                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(TRIGRAM_INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    op.drop_column('leads', 'normalized_name')
+    op.drop_column('conversations', 'normalized_sender_phone')
+    op.drop_column('conversations', 'normalized_sender_name')
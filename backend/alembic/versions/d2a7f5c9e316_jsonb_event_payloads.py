@@ -0,0 +1,50 @@
+"""Store analytics event and report payloads as JSONB with payload indexes
+
+Revision ID: d2a7f5c9e316
+Revises: c6e1f8b3a947
+Create Date: 2026-10-19 21:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f5c9e316'
+down_revision: Union[str, Sequence[str], None] = 'c6e1f8b3a947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# analytics_events is partitioned, so these are built on the parent (CONCURRENTLY is not supported there)
+PAYLOAD_INDEXES = [
+    "CREATE INDEX ix_analytics_events_data ON analytics_events USING gin (data jsonb_path_ops)",
+    "CREATE INDEX ix_analytics_events_decision ON analytics_events (event_type, (data ->> 'decision'), timestamp)",
+    "CREATE INDEX ix_analytics_events_confidence ON analytics_events (((data ->> 'confidence')::float)) "
+    "WHERE event_type = 'ai_decision'",
+    "CREATE INDEX ix_analytics_events_processing_time ON analytics_events (((data ->> 'processing_time')::float)) "
+    "WHERE event_type = 'message_processing'",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite keeps JSON as text, so only PostgreSQL changes
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in ('analytics_events', 'reports'):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN data TYPE jsonb USING NULLIF(data, '')::jsonb")
+    for statement in PAYLOAD_INDEXES:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name in ('ix_analytics_events_processing_time', 'ix_analytics_events_confidence',
+                 'ix_analytics_events_decision', 'ix_analytics_events_data'):
+        op.drop_index(name, table_name='analytics_events')
+    for table in ('reports', 'analytics_events'):
+        op.alter_column(table, 'data', type_=sa.Text(), postgresql_using='data::text')
@@ -0,0 +1,54 @@
+"""Add composite, covering and partial indexes for hot queries
+
+Revision ID: d9b3e7a2c614
+Revises: c4d8a1e5f273
+Create Date: 2026-10-19 14:12:55.306127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b3e7a2c614'
+down_revision: Union[str, Sequence[str], None] = 'c4d8a1e5f273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, extra create_index options)
+INDEXES = [
+    ('ix_conversations_created_at_channel_status', 'conversations', ['created_at', 'channel', 'status'], {}),
+    ('ix_conversations_channel_status', 'conversations', ['channel', 'status'], {}),
+    ('ix_conversations_assigned_to_status', 'conversations', ['assigned_to', 'status'], {'postgresql_include': ['lead_score']}),
+    ('ix_conversations_needs_human_open', 'conversations', ['created_at'], {
+        'postgresql_where': sa.text("needs_human = true AND status <> 'closed'"),
+        'sqlite_where': sa.text("needs_human = 1 AND status <> 'closed'"),
+    }),
+    ('ix_messages_conversation_id_direction_sent_at', 'messages', ['conversation_id', 'direction', 'sent_at'], {}),
+    ('ix_leads_created_at_status', 'leads', ['created_at', 'status'], {}),
+    ('ix_leads_status_created_at', 'leads', ['status', 'created_at'], {}),
+    ('ix_leads_conversation_id', 'leads', ['conversation_id'], {}),
+    ('ix_analytics_events_event_type_timestamp', 'analytics_events', ['event_type', 'timestamp'], {}),
+    ('ix_analytics_events_timestamp', 'analytics_events', ['timestamp'], {}),
+    ('ix_analytics_events_conversation_id', 'analytics_events', ['conversation_id'], {}),
+    ('ix_analytics_events_lead_id', 'analytics_events', ['lead_id'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently on PostgreSQL so webhook writes are not blocked on large tables;
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, **options)
+    op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
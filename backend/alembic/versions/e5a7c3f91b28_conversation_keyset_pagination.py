@@ -0,0 +1,57 @@
+"""Backfill conversation sort keys and index them for keyset pagination
+
+Revision ID: e5a7c3f91b28
+Revises: d9b3e7a2c614
+Create Date: 2026-10-19 15:37:21.840153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3f91b28'
+down_revision: Union[str, Sequence[str], None] = 'd9b3e7a2c614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_conversations_updated_at_id', ['updated_at', 'id']),
+    ('ix_conversations_lead_score_id', ['lead_score', 'id']),
+    ('ix_conversations_channel_status_updated_at_id', ['channel', 'status', 'updated_at', 'id']),
+    ('ix_conversations_assigned_to_updated_at_id', ['assigned_to', 'updated_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sort keys must be non-null for cursor comparisons to see every row
+    op.execute("UPDATE conversations SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL")
+    op.execute("UPDATE conversations SET lead_score = 0 WHERE lead_score IS NULL")
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True),
+                              server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False)
+        batch_op.alter_column('lead_score', existing_type=sa.Float(),
+                              server_default='0', nullable=False)
+
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'conversations', columns, unique=False, postgresql_concurrently=True)
+        # Superseded by ix_conversations_channel_status_updated_at_id, which has it as a prefix
+        op.drop_index('ix_conversations_channel_status', table_name='conversations', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_conversations_channel_status', 'conversations', ['channel', 'status'],
+                        unique=False, postgresql_concurrently=True)
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='conversations', postgresql_concurrently=True)
+
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.alter_column('lead_score', existing_type=sa.Float(), server_default=None, nullable=True)
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True),
+                              server_default=None, nullable=True)
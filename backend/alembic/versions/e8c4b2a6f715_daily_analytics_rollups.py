@@ -0,0 +1,85 @@
+"""Add daily analytics rollup tables and backfill them
+
+Revision ID: e8c4b2a6f715
+Revises: d2a7f5c9e316
+Create Date: 2026-10-19 22:03:27.519846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4b2a6f715'
+down_revision: Union[str, Sequence[str], None] = 'd2a7f5c9e316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same aggregation as AnalyticsRollups.rebuild; NULL key values are stored as '' and {day}
+# is the creation day in UTC
+BACKFILL = [
+    """
+    INSERT INTO daily_conversation_stats (day, channel, status, conversations, responded, response_seconds)
+    SELECT {day}, coalesce(channel, ''), coalesce(status, ''), count(id),
+           count(first_response_seconds), coalesce(sum(first_response_seconds), 0.0)
+    FROM conversations WHERE created_at IS NOT NULL
+    GROUP BY {day}, coalesce(channel, ''), coalesce(status, '')
+    """,
+    """
+    INSERT INTO daily_agent_stats (day, agent_id, conversations, scored, lead_score_sum)
+    SELECT {day}, assigned_to, count(id), count(lead_score), coalesce(sum(lead_score), 0.0)
+    FROM conversations WHERE created_at IS NOT NULL AND assigned_to IS NOT NULL
+    GROUP BY {day}, assigned_to
+    """,
+    """
+    INSERT INTO daily_lead_stats (day, status, leads)
+    SELECT {day}, coalesce(status, ''), count(id)
+    FROM leads WHERE created_at IS NOT NULL
+    GROUP BY {day}, coalesce(status, '')
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_conversation_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('channel', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('conversations', sa.Integer(), nullable=False),
+        sa.Column('responded', sa.Integer(), nullable=False),
+        sa.Column('response_seconds', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'channel', 'status')
+    )
+    op.create_table(
+        'daily_agent_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('agent_id', sa.Integer(), nullable=False),
+        sa.Column('conversations', sa.Integer(), nullable=False),
+        sa.Column('scored', sa.Integer(), nullable=False),
+        sa.Column('lead_score_sum', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'agent_id')
+    )
+    op.create_table(
+        'daily_lead_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('leads', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'status')
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        day = "date(created_at AT TIME ZONE 'UTC')"
+    else:
+        day = "date(created_at)"
+    for statement in BACKFILL:
+        op.execute(statement.format(day=day))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_lead_stats')
+    op.drop_table('daily_agent_stats')
+    op.drop_table('daily_conversation_stats')
@@ -0,0 +1,120 @@
+"""Partition messages and analytics_events by month on PostgreSQL
+
+Revision ID: f2c6b8d4a930
+Revises: e5a7c3f91b28
+Create Date: 2026-10-19 16:58:40.117294
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6b8d4a930'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c3f91b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created ahead of today; the app's PartitionManager keeps extending them
+MONTHS_AHEAD = 3
+
+# table -> (partition key, foreign keys, indexes as (name, columns))
+TABLES = {
+    'messages': ('sent_at', [
+        ('messages_conversation_id_fkey', 'conversation_id', 'conversations(id)'),
+    ], [
+        ('ix_messages_id', ['id']),
+        ('ix_messages_conversation_id_direction_sent_at', ['conversation_id', 'direction', 'sent_at']),
+    ]),
+    'analytics_events': ('timestamp', [], [
+        ('ix_analytics_events_id', ['id']),
+        ('ix_analytics_events_event_type_timestamp', ['event_type', 'timestamp']),
+        ('ix_analytics_events_timestamp', ['timestamp']),
+        ('ix_analytics_events_conversation_id', ['conversation_id']),
+        ('ix_analytics_events_lead_id', ['lead_id']),
+    ]),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition(table: str, key: str) -> None:
+    bind = op.get_bind()
+    _, foreign_keys, indexes = TABLES[table]
+    legacy = f'{table}_unpartitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    for name, _ in indexes:
+        op.execute(f'ALTER INDEX IF EXISTS {name} RENAME TO {name}_unpartitioned')
+    op.execute(f'UPDATE {legacy} SET {key} = now() WHERE {key} IS NULL')
+
+    # Keeps column types and the id sequence default; the partition key joins the primary key
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})')
+    op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL')
+    op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, {key})')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    for name, column, target in foreign_keys:
+        op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {name}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}')
+
+    oldest = bind.execute(sa.text(f'SELECT min({key}) FROM {legacy}')).scalar() or datetime.utcnow()
+    month = date(oldest.year, oldest.month, 1)
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{following.isoformat()} 00:00:00+00')"
+        )
+        month = following
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+    for name, columns in indexes:
+        op.create_index(name, table, columns, unique=False)
+    op.execute(f'ANALYZE {table}')
+
+
+def _unpartition(table: str, key: str) -> None:
+    _, foreign_keys, indexes = TABLES[table]
+    partitioned = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+    for name, _ in indexes:
+        op.execute(f'ALTER INDEX IF EXISTS {name} RENAME TO {name}_partitioned')
+
+    op.execute(f'CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)')
+    op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+    op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    for name, column, target in foreign_keys:
+        op.execute(f'ALTER TABLE {partitioned} DROP CONSTRAINT IF EXISTS {name}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+    op.execute(f'DROP TABLE {partitioned}')
+    for name, columns in indexes:
+        op.create_index(name, table, columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Declarative partitioning is PostgreSQL-only; other databases keep plain tables
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, (key, _, _) in TABLES.items():
+        _partition(table, key)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, (key, _, _) in TABLES.items():
+        _unpartition(table, key)
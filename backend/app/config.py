@@ -10,6 +10,68 @@ class Settings(BaseSettings):
         description="PostgreSQL database connection URL"
     )
 
+    # Database pool
+    db_pool_size: int = Field(
+        default=10,
+        description="Persistent connections kept per engine and worker"
+    )
+    db_max_overflow: int = Field(
+        default=20,
+        description="Extra connections opened beyond the pool size under bursts"
+    )
+    db_pool_timeout_seconds: float = Field(
+        default=10,
+        description="How long a request waits for a free connection before failing with 503"
+    )
+    db_pool_pre_ping: bool = Field(
+        default=True,
+        description="Test connections on checkout so ones dropped by the server are replaced"
+    )
+    db_pool_recycle_seconds: int = Field(
+        default=1800,
+        description="Replace connections older than this (-1 disables)"
+    )
+    db_statement_timeout_ms: int = Field(
+        default=30000,
+        description="PostgreSQL statement_timeout per connection (0 disables)"
+    )
+    db_pgbouncer_mode: bool = Field(
+        default=False,
+        description="Connect through PgBouncer in transaction mode: no app-side pool, no prepared statement caches"
+    )
+
+    # Query instrumentation
+    slow_query_ms: float = Field(
+        default=200,
+        description="Statements slower than this are logged with their SQL fingerprint"
+    )
+    request_query_warn_count: int = Field(
+        default=50,
+        description="Requests issuing more SQL statements than this are logged (likely N+1 queries)"
+    )
+    server_timing_header: bool = Field(
+        default=True,
+        description="Report per-request query count and database time in a Server-Timing header"
+    )
+
+    # Read replicas
+    database_replica_urls: str = Field(
+        default="",
+        description="Comma-separated read replica URLs for read-only routes (same format as database_url)"
+    )
+    replica_max_lag_seconds: float = Field(
+        default=5,
+        description="Replicas further behind the primary than this are skipped"
+    )
+    replica_lag_check_seconds: float = Field(
+        default=2,
+        description="How often each replica's replication lag is re-measured"
+    )
+    read_your_writes_seconds: float = Field(
+        default=10,
+        description="After a client writes, its reads stay on the primary for this long"
+    )
+
     # Redis
     redis_url: str = Field(
         default="redis://localhost:6379",
@@ -36,9 +98,53 @@ class Settings(BaseSettings):
         description="JWT algorithm"
     )
     access_token_expire_minutes: int = Field(
-        default=30,
+        default=15,
         description="JWT access token expiration time in minutes"
     )
+    refresh_token_expire_days: int = Field(
+        default=7,
+        description="JWT refresh token expiration time in days"
+    )
+
+    # Password hashing and login throttling
+    password_hash_workers: int = Field(
+        default=2,
+        description="Threads dedicated to bcrypt hashing/verification per worker"
+    )
+    password_hash_max_pending: int = Field(
+        default=32,
+        description="Hashing requests allowed to wait for a thread before new ones get 503"
+    )
+    login_throttle_window_seconds: float = Field(
+        default=300,
+        description="Sliding window for login/register attempt limits"
+    )
+    login_max_attempts_per_ip: int = Field(
+        default=30,
+        description="Login/register attempts allowed per client IP within the window"
+    )
+    login_max_attempts_per_email: int = Field(
+        default=10,
+        description="Login attempts allowed per email within the window (reset on success)"
+    )
+
+    # Authenticated-principal cache
+    principal_cache_ttl_seconds: float = Field(
+        default=60,
+        description="Seconds an authenticated user (or a user's token version) is cached per worker"
+    )
+    principal_cache_max_entries: int = Field(
+        default=10000,
+        description="Maximum cached tokens per worker"
+    )
+    principal_cache_pubsub_enabled: bool = Field(
+        default=False,
+        description="Broadcast user invalidations to other workers over Redis pub/sub (enable with multiple workers)"
+    )
+    principal_cache_channel: str = Field(
+        default="omnilead:principal-invalidate",
+        description="Redis pub/sub channel for principal cache invalidations"
+    )
 
     # Webhook secrets
     whatsapp_webhook_secret: Optional[str] = Field(
@@ -63,6 +169,42 @@ class Settings(BaseSettings):
         default=None,
         description="SendGrid API key for email notifications"
     )
+    smtp_host: Optional[str] = Field(
+        default=None,
+        description="SMTP server for email notifications (takes precedence over SendGrid)"
+    )
+    smtp_port: int = Field(
+        default=587,
+        description="SMTP server port"
+    )
+    smtp_username: Optional[str] = Field(
+        default=None,
+        description="SMTP username"
+    )
+    smtp_password: Optional[str] = Field(
+        default=None,
+        description="SMTP password"
+    )
+    smtp_use_tls: bool = Field(
+        default=True,
+        description="Upgrade SMTP connections with STARTTLS"
+    )
+    smtp_pool_size: int = Field(
+        default=4,
+        description="Persistent SMTP connections kept open for notifications"
+    )
+    smtp_keepalive_seconds: float = Field(
+        default=60,
+        description="Idle time after which a pooled SMTP connection is probed with NOOP before reuse"
+    )
+    email_from_address: str = Field(
+        default="noreply@omnilead.com",
+        description="Sender address for notification emails"
+    )
+    email_batch_size: int = Field(
+        default=100,
+        description="Maximum emails sent per batch (one SMTP checkout or one SendGrid request)"
+    )
     twilio_account_sid: Optional[str] = Field(
         default=None,
         description="Twilio account SID"
@@ -76,6 +218,48 @@ class Settings(BaseSettings):
         description="Twilio phone number"
     )
 
+    # Notification dispatch
+    notification_push_workers: int = Field(
+        default=8,
+        description="Concurrent workers delivering push notifications"
+    )
+    notification_email_workers: int = Field(
+        default=4,
+        description="Concurrent workers delivering email notifications"
+    )
+    notification_sms_workers: int = Field(
+        default=4,
+        description="Concurrent workers delivering SMS notifications"
+    )
+    notification_queue_size: int = Field(
+        default=10000,
+        description="Maximum queued notifications per channel before new ones are dropped"
+    )
+    notification_max_retries: int = Field(
+        default=3,
+        description="Delivery retries per notification before it is marked failed"
+    )
+    notification_retry_backoff_seconds: float = Field(
+        default=1.0,
+        description="Base delay for exponential retry backoff"
+    )
+    notification_digest_window_seconds: float = Field(
+        default=120,
+        description="Window for collapsing notifications per recipient and channel into a digest (0 disables)"
+    )
+
+    # Notification recipients
+    recipient_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Seconds the cached role -> active users directory is reused before reloading"
+    )
+
+    # Lead identity resolution
+    default_country_calling_code: Optional[str] = Field(
+        default=None,
+        description="Country calling code (e.g. 44) applied to phone numbers without an international prefix"
+    )
+
     # AWS S3
     aws_access_key_id: Optional[str] = Field(
         default=None,
@@ -90,6 +274,88 @@ class Settings(BaseSettings):
         description="S3 bucket name for file storage"
     )
 
+    # Server
+    web_concurrency: int = Field(
+        default=0,
+        description="Worker processes for the production launcher (0 = one per CPU core)"
+    )
+    graceful_shutdown_seconds: float = Field(
+        default=30,
+        description="Time allowed for in-flight webhooks and connections to finish on shutdown"
+    )
+    drain_delay_seconds: float = Field(
+        default=5,
+        description="Delay between SIGTERM (readiness turns false) and closing the listener"
+    )
+    warmup_db_connections: int = Field(
+        default=5,
+        description="Database connections opened during worker warmup"
+    )
+    warmup_retry_seconds: float = Field(
+        default=5,
+        description="Delay between warmup attempts when warmup fails"
+    )
+
+    # Audit and analytics event writes
+    audit_flush_interval_seconds: float = Field(
+        default=1.0,
+        description="How often buffered audit/analytics events are bulk-written (0 writes each event immediately)"
+    )
+    audit_buffer_max_events: int = Field(
+        default=10000,
+        description="Buffered events above which new events are written immediately instead"
+    )
+
+    # Contact typeahead
+    contact_index_ttl_seconds: int = Field(
+        default=300,
+        description="Seconds the in-process contact prefix index (non-PostgreSQL databases) is reused before rebuilding"
+    )
+
+    # Table partitioning and retention (PostgreSQL)
+    partition_months_ahead: int = Field(
+        default=3,
+        description="Monthly partitions of messages/analytics_events created ahead of time"
+    )
+    partition_maintenance_interval_seconds: float = Field(
+        default=6 * 3600,
+        description="How often workers create future partitions and drop expired ones (0 disables)"
+    )
+
+    # Conversation counters
+    counter_reconcile_interval_seconds: float = Field(
+        default=24 * 3600,
+        description="How often conversation counters are recomputed from messages to repair drift (0 disables)"
+    )
+
+    # Analytics rollups
+    rollup_compaction_interval_seconds: float = Field(
+        default=24 * 3600,
+        description="How often the daily analytics rollups are rebuilt from source rows (0 disables)"
+    )
+    rollup_repair_days: int = Field(
+        default=90,
+        description="Days of rollups, counting back from today, rebuilt by each compaction"
+    )
+
+    # Analytics response cache
+    analytics_cache_ttl_seconds: float = Field(
+        default=30,
+        description="Seconds dashboard/performance responses are cached (0 disables)"
+    )
+    analytics_cache_local_ttl_seconds: float = Field(
+        default=5,
+        description="With the Redis tier, seconds a worker keeps its own copy (bounds staleness from other workers' writes)"
+    )
+    analytics_cache_redis_enabled: bool = Field(
+        default=False,
+        description="Share cached analytics responses between workers through Redis"
+    )
+    analytics_cache_redis_key: str = Field(
+        default="omnilead:analytics-cache",
+        description="Redis hash holding the shared analytics responses"
+    )
+
     # Environment
     environment: str = Field(
         default="development",
@@ -121,6 +387,15 @@ class Settings(BaseSettings):
             raise ValueError("Database URL must start with postgresql://, postgresql+psycopg2://, or sqlite:///")
         return v
 
+    @field_validator('database_replica_urls')
+    @classmethod
+    def validate_database_replica_urls(cls, v: str) -> str:
+        """Validate each replica URL like database_url"""
+        for url in filter(None, (url.strip() for url in v.split(","))):
+            if not url.startswith(('postgresql://', 'postgresql+psycopg2://', 'sqlite:///')):
+                raise ValueError("Replica URLs must start with postgresql://, postgresql+psycopg2://, or sqlite:///")
+        return v
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
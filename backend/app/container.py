@@ -0,0 +1,127 @@
+from functools import cached_property
+from .config import settings
+from .lifecycle import lifecycle
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Process-wide service singletons.
+
+    Services are built on first use rather than at import time, so importing the app
+    (worker cold start, test collection) does not construct provider clients. Background
+    machinery is started and stopped by the application lifespan.
+    """
+
+    @cached_property
+    def auth_service(self):
+        from .services.auth_service import AuthService
+        from .utils.metrics import metrics_registry
+        service = AuthService()
+        # Only the application's instance reports under "auth"
+        metrics_registry.register("auth", service.get_stats)
+        return service
+
+    @cached_property
+    def ai_service(self):
+        from .services.ai_service import AIService
+        return AIService()
+
+    @cached_property
+    def notification_service(self):
+        from .services.notification_service import NotificationService
+        return NotificationService()
+
+    @cached_property
+    def webhook_service(self):
+        from .services.webhook_service import WebhookService
+        return WebhookService(
+            ai_service=self.ai_service,
+            notification_service=self.notification_service
+        )
+
+    async def startup(self):
+        """Prepare the database and start background notification delivery"""
+        from .services.notification_dispatcher import notification_dispatcher
+        from .services.notification_coalescer import notification_coalescer
+        from .services.notification_transports import default_transports
+        from .services.conversation_counters import conversation_counter_reconciler
+        from .services.analytics_rollups import analytics_rollups
+        from .services.partition_manager import partition_manager
+        from .services.principal_cache import principal_cache
+        from .utils.logger import audit_logger
+
+        # Note: In production, use Alembic migrations instead of create_all
+        # Run: alembic upgrade head
+        # For development only:
+        if settings.environment == "development":
+            from .database import Base, async_engine
+            from . import models  # noqa: F401 - registers the tables on Base.metadata
+            async with async_engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+
+        await notification_dispatcher.start(default_transports())
+        await notification_coalescer.start()
+        await partition_manager.start()
+        await conversation_counter_reconciler.start()
+        await analytics_rollups.start()
+        await audit_logger.start()
+        principal_cache.start_listener()
+
+        # Readiness flips to "ready" once warmup succeeds
+        await lifecycle.start(self.warmup)
+
+    async def warmup(self):
+        """Open database connections and build provider clients before serving traffic"""
+        from sqlalchemy import text
+        from .database import async_engine
+
+        connections = []
+        try:
+            for _ in range(settings.warmup_db_connections):
+                connection = await async_engine.connect()
+                connections.append(connection)
+                await connection.execute(text("SELECT 1"))
+        finally:
+            # Returned to the pool, where they stay open for the first requests
+            for connection in connections:
+                await connection.close()
+
+        # Builds the AI client and notification transports
+        self.webhook_service
+
+    async def shutdown(self):
+        from .database import async_engine
+        from .db_router import replica_router
+        from .services.notification_dispatcher import notification_dispatcher
+        from .services.notification_coalescer import notification_coalescer
+        from .services.conversation_counters import conversation_counter_reconciler
+        from .services.analytics_rollups import analytics_rollups
+        from .services.partition_manager import partition_manager
+        from .services.principal_cache import principal_cache
+        from .utils.logger import audit_logger
+
+        # Let in-flight webhooks finish and disconnect Socket.IO clients first
+        await lifecycle.drain()
+
+        # Flush pending digests before draining the dispatcher queues
+        await notification_coalescer.stop()
+        await notification_dispatcher.stop()
+        await partition_manager.stop()
+        await conversation_counter_reconciler.stop()
+        await analytics_rollups.stop()
+        await audit_logger.stop()
+        principal_cache.stop_listener()
+        await async_engine.dispose()
+        await replica_router.dispose()
+        if "auth_service" in self.__dict__:
+            self.auth_service.close()
+        if "notification_service" in self.__dict__:
+            self.notification_service.close()
+
+# Global service container
+container = ServiceContainer()
+
+def get_webhook_service():
+    """FastAPI dependency returning the shared WebhookService"""
+    return container.webhook_service
@@ -1,11 +1,38 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_bulk import bulk_writer
+from .db_profiler import query_profiler
+from .db_pool import engine_options, get_pool_stats
+from .utils.metrics import metrics_registry
 
-engine = create_engine(settings.database_url)
+# Async drivers used for each configured (sync) database URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Translate a sync database URL to its async driver equivalent"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+# Sync engine and sessions, kept for Alembic, scripts and background jobs
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, "primary"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions used by request handlers.
+# Objects stay loaded after commit so responses never trigger lazy IO outside a query.
+ASYNC_DATABASE_URL = to_async_url(settings.database_url)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, "primary_async"))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +40,16 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        yield db
+        if db.info.get("has_writes"):
+            # Keep this client's reads on the primary until replicas have caught up
+            from .db_router import replica_router
+            replica_router.record_write(replica_router.client_key(request))
+
+metrics_registry.register("db_pool", get_pool_stats)
+metrics_registry.register("db_bulk", bulk_writer.get_stats)
+metrics_registry.register("db_queries", query_profiler.get_stats)
@@ -0,0 +1,128 @@
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from .config import settings
+
+# Drivers whose engines are created with create_async_engine
+ASYNC_DRIVER_NAMES = {"asyncpg", "aiosqlite"}
+
+class PoolStats:
+    """Checkout wait and timeout counters for one engine's pool.
+
+    Kept outside the pool object so the numbers survive ``engine.dispose()``, which
+    replaces the pool with a fresh instance.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        stats = {
+            "pool_class": type(pool).__name__ if pool else None,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": (self.wait_time / self.checkouts * 1000) if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait_time * 1000,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # Negative until the pool has opened all of its base connections
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+            })
+        return stats
+
+def _instrumented(pool_class, stats: PoolStats):
+    """Subclass ``pool_class`` so every checkout reports its wait time to ``stats``"""
+
+    class InstrumentedPool(pool_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            stats.pool = self
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                stats.record_checkout(time.perf_counter() - started, timed_out=True)
+                raise
+            stats.record_checkout(time.perf_counter() - started)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+def engine_options(url: str, name: str) -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine from the pool settings.
+
+    SQLite keeps SQLAlchemy's defaults. For PostgreSQL the pool is sized and instrumented
+    (exported as ``db_pool.<name>`` on the metrics endpoint); in PgBouncer mode the app
+    keeps no pool of its own and disables server-side prepared statement caches, which
+    do not survive transaction pooling.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return {}
+
+    is_async = parsed.get_driver_name() in ASYNC_DRIVER_NAMES
+    stats = pool_stats[name] = PoolStats(name)
+    connect_args: Dict[str, Any] = {}
+
+    if settings.db_pgbouncer_mode:
+        # PgBouncer rejects unknown startup parameters, so statement_timeout has to be
+        # configured on the database role instead of per connection here
+        options: Dict[str, Any] = {"poolclass": _instrumented(NullPool, stats)}
+        if is_async:
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4().hex}__",
+            )
+    else:
+        options = {
+            "poolclass": _instrumented(AsyncAdaptedQueuePool if is_async else QueuePool, stats),
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_recycle": settings.db_pool_recycle_seconds,
+        }
+        if settings.db_statement_timeout_ms > 0:
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: stats.get_stats() for name, stats in pool_stats.items()}
+
+# Pool statistics per engine name, filled in as engines are created
+pool_stats: Dict[str, PoolStats] = {}
@@ -0,0 +1,178 @@
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("omnilead.slow_query")
+
+# Distinct slow statements remembered for the metrics endpoint
+MAX_SLOW_FINGERPRINTS = 200
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """SQL with literals and bind parameters replaced, so repeats of one query compare equal"""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_sql(statement).encode()).hexdigest()[:12]
+
+@dataclass
+class QueryStats:
+    """Statements issued within one request (or one ``track_queries`` block)"""
+    capture: bool = False
+    count: int = 0
+    total_ms: float = 0.0
+    worst_ms: float = 0.0
+    worst_sql: Optional[str] = None
+    statements: List[str] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms >= self.worst_ms:
+            self.worst_ms = elapsed_ms
+            self.worst_sql = statement
+        if self.capture:
+            self.statements.append(statement)
+
+    @property
+    def worst_fingerprint(self) -> Optional[str]:
+        return fingerprint(self.worst_sql) if self.worst_sql else None
+
+    def server_timing(self) -> str:
+        timing = (
+            f'db;dur={self.total_ms:.1f};desc="{self.count} queries", '
+            f'db-worst;dur={self.worst_ms:.1f}'
+        )
+        if self.worst_sql:
+            # Matches the slow query log and the per-route stats
+            timing += f';desc="{self.worst_fingerprint}"'
+        return timing
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries(capture: bool = False):
+    """Count the SQL statements issued in this context (including awaited async sessions)"""
+    stats = QueryStats(capture=capture)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+class QueryProfiler:
+    """Per-route statement counts and a log of slow statements grouped by fingerprint.
+
+    Every statement on every engine is timed. Statements slower than ``slow_query_ms``
+    are logged to ``omnilead.slow_query`` with the fingerprint of their normalized SQL,
+    so occurrences of one query with different parameters can be grouped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.slow_queries = 0
+        self._slow: Dict[str, Dict[str, Any]] = {}
+        self._routes: Dict[str, Dict[str, float]] = {}
+
+    def record(self, statement: str, elapsed_ms: float):
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+        self.queries += 1
+
+        if elapsed_ms < settings.slow_query_ms:
+            return
+        normalized = normalize_sql(statement)
+        key = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+        slow_query_logger.warning(f"Slow query {key} took {elapsed_ms:.1f}ms: {normalized[:1000]}")
+        with self._lock:
+            self.slow_queries += 1
+            entry = self._slow.get(key)
+            if entry is None:
+                if len(self._slow) >= MAX_SLOW_FINGERPRINTS:
+                    return
+                entry = self._slow[key] = {"sql": normalized[:500], "count": 0, "max_ms": 0.0, "total_ms": 0.0}
+            entry["count"] += 1
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["total_ms"] += elapsed_ms
+
+    def record_request(self, method: str, route: str, stats: QueryStats):
+        key = f"{method} {route}"
+        with self._lock:
+            entry = self._routes.setdefault(key, {
+                "requests": 0, "queries": 0, "max_queries": 0, "total_ms": 0.0,
+                "worst_ms": 0.0, "worst_fingerprint": None, "worst_sql": None,
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["total_ms"] += stats.total_ms
+            if stats.worst_sql and stats.worst_ms >= entry["worst_ms"]:
+                normalized = normalize_sql(stats.worst_sql)
+                entry["worst_ms"] = stats.worst_ms
+                entry["worst_fingerprint"] = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+                entry["worst_sql"] = normalized[:500]
+        if stats.count > settings.request_query_warn_count:
+            logger.warning(f"{key} issued {stats.count} queries ({stats.total_ms:.1f}ms)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            slowest = sorted(self._slow.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:20]
+            return {
+                "queries": self.queries,
+                "slow_queries": self.slow_queries,
+                "slow_fingerprints": {
+                    key: dict(entry, max_ms=round(entry["max_ms"], 1), total_ms=round(entry["total_ms"], 1))
+                    for key, entry in slowest
+                },
+                "routes": {
+                    key: {
+                        "requests": entry["requests"],
+                        "avg_queries": round(entry["queries"] / entry["requests"], 1),
+                        "max_queries": entry["max_queries"],
+                        "avg_db_ms": round(entry["total_ms"] / entry["requests"], 1),
+                        "worst_query_ms": round(entry["worst_ms"], 1),
+                        "worst_query_fingerprint": entry["worst_fingerprint"],
+                        "worst_query_sql": entry["worst_sql"],
+                    }
+                    for key, entry in self._routes.items()
+                },
+            }
+
+# Global query profiler
+query_profiler = QueryProfiler()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    query_profiler.record(statement, (time.perf_counter() - started) * 1000)
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from .config import settings
+from .database import AsyncSessionLocal, to_async_url
+from .db_pool import engine_options
+from .utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds of replay lag; zero when the replica has replayed everything it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        async_url = to_async_url(url)
+        self.is_postgres = make_url(async_url).get_backend_name() == "postgresql"
+        self.engine = create_async_engine(async_url, **engine_options(async_url, name))
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self.reads = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= settings.replica_max_lag_seconds
+
+    async def check_lag(self):
+        try:
+            if self.is_postgres:
+                async with self.engine.connect() as connection:
+                    self.lag_seconds = float(await connection.scalar(REPLICA_LAG_SQL))
+            else:
+                self.lag_seconds = 0.0
+            self.error = None
+        except Exception as e:
+            if self.error is None:
+                logger.warning(f"Replica {self.name} unavailable, reading from primary: {e}")
+            self.lag_seconds = None
+            self.error = str(e)
+        self.checked_at = time.monotonic()
+
+class ReplicaRouter:
+    """Routes read-only sessions to replicas, falling back to the primary.
+
+    A replica is used only while its measured replication lag is within
+    ``replica_max_lag_seconds``. Clients that wrote recently keep reading from the
+    primary for ``read_your_writes_seconds`` so they always see their own changes.
+    """
+
+    def __init__(self, replica_urls: Optional[List[str]] = None):
+        urls = replica_urls if replica_urls is not None else [
+            url.strip() for url in settings.database_replica_urls.split(",") if url.strip()
+        ]
+        self.replicas = [Replica(f"replica_{index}", url) for index, url in enumerate(urls)]
+        self._round_robin = itertools.cycle(self.replicas) if self.replicas else None
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._check_lock: Optional[asyncio.Lock] = None
+        self.primary_reads = 0
+        self.read_your_writes_reads = 0
+
+    @staticmethod
+    def client_key(request: Request) -> str:
+        """Identify the caller by bearer token, or by address for anonymous requests"""
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return hashlib.sha256(authorization.encode()).hexdigest()
+        return request.client.host if request.client else "anonymous"
+
+    def record_write(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[key] = now + settings.read_your_writes_seconds
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {k: until for k, until in self._recent_writes.items() if until > now}
+
+    def wrote_recently(self, key: str) -> bool:
+        until = self._recent_writes.get(key)
+        return until is not None and until > time.monotonic()
+
+    async def _refresh_lag(self):
+        stale = [
+            replica for replica in self.replicas
+            if time.monotonic() - replica.checked_at >= settings.replica_lag_check_seconds
+        ]
+        if not stale:
+            return
+        # One lag check at a time; concurrent readers use the previous measurement
+        if self._check_lock is None:
+            self._check_lock = asyncio.Lock()
+        if self._check_lock.locked():
+            return
+        async with self._check_lock:
+            await asyncio.gather(*(replica.check_lag() for replica in stale))
+
+    async def sessionmaker_for(self, key: str) -> async_sessionmaker:
+        """Session factory for a read-only request from client ``key``"""
+        if not self.replicas:
+            self.primary_reads += 1
+            return AsyncSessionLocal
+        if self.wrote_recently(key):
+            self.read_your_writes_reads += 1
+            return AsyncSessionLocal
+
+        await self._refresh_lag()
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.usable:
+                replica.reads += 1
+                return replica.sessionmaker
+
+        self.primary_reads += 1
+        return AsyncSessionLocal
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+        self._check_lock = None
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "replicas": {
+                replica.name: {
+                    "lag_seconds": replica.lag_seconds,
+                    "usable": replica.usable,
+                    "reads": replica.reads,
+                    "error": replica.error,
+                }
+                for replica in self.replicas
+            },
+            "primary_reads": self.primary_reads,
+            "read_your_writes_reads": self.read_your_writes_reads,
+        }
+
+# Global replica router
+replica_router = ReplicaRouter()
+metrics_registry.register("db_replicas", replica_router.get_stats)
+
+async def get_read_db(request: Request):
+    """FastAPI dependency for read-only routes: a replica session when one is fresh enough"""
+    session_factory = await replica_router.sessionmaker_for(replica_router.client_key(request))
+    async with session_factory() as db:
+        yield db
+
+@event.listens_for(Session, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["has_writes"] = True
@@ -0,0 +1,140 @@
+import asyncio
+import signal
+import time
+from typing import Awaitable, Callable, List, Optional
+from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+WARMING = "warming"
+READY = "ready"
+DRAINING = "draining"
+
+class Lifecycle:
+    """Tracks worker warmup/drain state for readiness probes and graceful shutdown"""
+
+    def __init__(self):
+        self.state = WARMING
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self.in_flight_webhooks = 0
+        self._drain_hooks: List[Callable[[], Awaitable[None]]] = []
+        self._drain_hooks_task: Optional[asyncio.Task] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == READY
+
+    def on_drain(self, hook: Callable[[], Awaitable[None]]):
+        """Register a coroutine to run when the worker starts draining"""
+        self._drain_hooks.append(hook)
+        return hook
+
+    async def start(self, warmup: Callable[[], Awaitable[None]]):
+        """Run warmup before traffic is accepted, retrying in the background on failure"""
+        self.state = WARMING
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self._drain_hooks_task = None
+        self._install_sigterm_hook()
+        if not await self._try_warmup(warmup):
+            self._warmup_task = asyncio.create_task(self._retry_warmup(warmup))
+
+    async def _try_warmup(self, warmup: Callable[[], Awaitable[None]]) -> bool:
+        try:
+            await warmup()
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.error(f"Warmup failed, worker not ready: {e}")
+            return False
+
+        if self.state == WARMING:
+            self.state = READY
+            self.ready_at = time.monotonic()
+            self.warmup_error = None
+            logger.info(f"Worker ready after {self.ready_at - self.started_at:.2f}s warmup")
+        return True
+
+    async def _retry_warmup(self, warmup: Callable[[], Awaitable[None]]):
+        while self.state == WARMING:
+            await asyncio.sleep(settings.warmup_retry_seconds)
+            if await self._try_warmup(warmup):
+                return
+
+    def begin_drain(self):
+        """Stop reporting ready so load balancers route new traffic elsewhere"""
+        if self.state != DRAINING:
+            logger.info("Worker draining")
+            self.state = DRAINING
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait for in-flight webhooks and run drain hooks (e.g. closing Socket.IO clients)"""
+        self.begin_drain()
+        if self._warmup_task:
+            self._warmup_task.cancel()
+
+        timeout = timeout if timeout is not None else settings.graceful_shutdown_seconds
+        deadline = time.monotonic() + timeout
+        while self.in_flight_webhooks > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.in_flight_webhooks > 0:
+            logger.warning(f"Shutting down with {self.in_flight_webhooks} webhooks still in flight")
+
+        if self._drain_hooks_task is None:
+            self._start_drain_hooks()
+        await self._drain_hooks_task
+
+    def _start_drain_hooks(self):
+        if self._drain_hooks_task is None:
+            self._drain_hooks_task = asyncio.create_task(self._run_drain_hooks())
+
+    async def _run_drain_hooks(self):
+        for hook in self._drain_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"Drain hook failed: {e}")
+
+    def _install_sigterm_hook(self):
+        """Flip readiness as soon as SIGTERM arrives, then let the server shut down.
+
+        The server's own handler is delayed by ``drain_delay_seconds`` so load balancers
+        have time to observe the failing readiness probe before the listener closes.
+        """
+        try:
+            previous = signal.getsignal(signal.SIGTERM)
+            loop = asyncio.get_running_loop()
+        except (ValueError, RuntimeError):
+            return
+        if not callable(previous):
+            return
+
+        def handle_sigterm(signum, frame):
+            self.begin_drain()
+            # Disconnect long-lived Socket.IO clients right away so they reconnect elsewhere
+            loop.call_soon_threadsafe(self._start_drain_hooks)
+            if settings.drain_delay_seconds > 0:
+                loop.call_soon_threadsafe(loop.call_later, settings.drain_delay_seconds, previous, signum, frame)
+            else:
+                previous(signum, frame)
+
+        try:
+            signal.signal(signal.SIGTERM, handle_sigterm)
+        except ValueError:
+            # Not on the main thread (e.g. under a test client)
+            pass
+
+    def status(self) -> dict:
+        return {
+            "status": self.state,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "warmup_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            "warmup_error": self.warmup_error,
+            "in_flight_webhooks": self.in_flight_webhooks,
+        }
+
+# Global lifecycle state for this worker process
+lifecycle = Lifecycle()
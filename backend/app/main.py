@@ -1,27 +1,25 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 import socketio
-import uvicorn
-from .database import get_db, engine
-from .models import Base
-from .services import WebhookService, AuthService
-from .routes import auth, conversations, analytics, webhooks
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from .container import container
+from .db_profiler import query_profiler, track_queries
+from .lifecycle import lifecycle, DRAINING
+from .routes import auth, conversations, contacts, analytics, webhooks, metrics
 from .config import settings
 
-# Note: In production, use Alembic migrations instead of create_all
-# Run: alembic upgrade head
-# For development only:
-if settings.environment == "development":
-    Base.metadata.create_all(bind=engine)
-
-# Initialize services
-webhook_service = WebhookService()
-auth_service = AuthService()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Database setup and background services start here, not at import time
+    await container.startup()
+    yield
+    await container.shutdown()
 
 # Create FastAPI app
-app = FastAPI(title="OmniLead API", version="1.0.0")
+app = FastAPI(title="OmniLead API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -30,11 +28,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+@app.middleware("http")
+async def track_in_flight_webhooks(request: Request, call_next):
+    """Count webhook requests in flight so shutdown can wait for them"""
+    if not request.url.path.startswith("/api/webhooks"):
+        return await call_next(request)
+
+    lifecycle.in_flight_webhooks += 1
+    try:
+        return await call_next(request)
+    finally:
+        lifecycle.in_flight_webhooks -= 1
+
+@app.middleware("http")
+async def instrument_queries(request: Request, call_next):
+    """Count the SQL statements and database time of each request"""
+    with track_queries() as stats:
+        response = await call_next(request)
+
+    route = request.scope.get("route")
+    query_profiler.record_request(request.method, getattr(route, "path", request.url.path), stats)
+    if settings.server_timing_header:
+        response.headers.append("Server-Timing", stats.server_timing())
+    return response
+
+@app.exception_handler(PoolTimeoutError)
+async def database_pool_exhausted(request: Request, exc: PoolTimeoutError):
+    """Fail fast with 503 when no database connection frees up within the pool timeout"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Socket.IO setup
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 socket_app = socketio.ASGIApp(sio, app)
+connected_sids = set()
+
+@lifecycle.on_drain
+async def disconnect_socket_clients():
+    """Ask Socket.IO clients to reconnect to another worker"""
+    await sio.emit('server_draining', {})
+    for sid in list(connected_sids):
+        await sio.disconnect(sid)
 
 # Security
 security = HTTPBearer()
@@ -42,18 +82,24 @@ security = HTTPBearer()
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(conversations.router, prefix="/api/conversations", tags=["conversations"])
+app.include_router(contacts.router, prefix="/api/contacts", tags=["contacts"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
 
 # Note: get_current_user dependency is now in AuthService.get_current_user_dependency
 
 # Socket.IO events
 @sio.event
 async def connect(sid, environ):
+    if lifecycle.state == DRAINING:
+        return False
+    connected_sids.add(sid)
     print(f"Client connected: {sid}")
 
 @sio.event
 async def disconnect(sid):
+    connected_sids.discard(sid)
     print(f"Client disconnected: {sid}")
 
 @sio.event
@@ -77,5 +123,19 @@ async def leave_conversation(sid, data):
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """The worker process and its event loop are responsive"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Ready only after warmup succeeded and before draining starts"""
+    body = lifecycle.status()
+    if not lifecycle.is_ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app.main:socket_app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from .user import User
 from .conversation import Conversation, Message
 from .lead import Lead
-from .analytics import AnalyticsEvent, Report
+from .analytics import AnalyticsEvent, Report, DailyConversationStats, DailyAgentStats, DailyLeadStats
 
 # Import Base from database module
 from ..database import Base
\ No newline at end of file
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from ..database import Base
 
+# JSONB on PostgreSQL (indexable, binary), JSON text elsewhere
+JSONData = JSON().with_variant(JSONB(), "postgresql")
+
 class AnalyticsEvent(Base):
+    # On PostgreSQL this table is range-partitioned by month on timestamp, with primary
+    # key (id, timestamp); see PartitionManager
     __tablename__ = "analytics_events"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -11,8 +17,30 @@ class AnalyticsEvent(Base):
     conversation_id = Column(Integer, nullable=True)
     lead_id = Column(Integer, nullable=True)
     channel = Column(String)
-    data = Column(Text)  # JSON data
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    data = Column(JSONData)  # Event payload
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_analytics_events_event_type_timestamp", "event_type", "timestamp"),
+        Index("ix_analytics_events_timestamp", "timestamp"),
+        Index("ix_analytics_events_conversation_id", "conversation_id"),
+        Index("ix_analytics_events_lead_id", "lead_id"),
+        # Payload indexes: containment (data @> '{...}') and the keys aggregated by decision and timing
+        Index(
+            "ix_analytics_events_data", "data", postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_analytics_events_decision", "event_type", text("(data ->> 'decision')"), "timestamp"
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_analytics_events_confidence", text("((data ->> 'confidence')::float)"),
+            postgresql_where=text("event_type = 'ai_decision'")
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_analytics_events_processing_time", text("((data ->> 'processing_time')::float)"),
+            postgresql_where=text("event_type = 'message_processing'")
+        ).ddl_if(dialect="postgresql"),
+    )
 
 class Report(Base):
     __tablename__ = "reports"
@@ -20,6 +48,35 @@ class Report(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     type = Column(String)  # daily, weekly, monthly
-    data = Column(Text)  # JSON report data
+    data = Column(JSONData)  # Report contents
     generated_at = Column(DateTime(timezone=True), server_default=func.now())
-    created_by = Column(Integer)
\ No newline at end of file
+    created_by = Column(Integer)
+# Daily rollups of conversations and leads, keyed by the day they were created (UTC).
+# Maintained incrementally on write and rebuilt nightly; see services/analytics_rollups.
+# Key columns are part of the primary key, so a NULL channel or status is stored as "".
+
+class DailyConversationStats(Base):
+    __tablename__ = "daily_conversation_stats"
+
+    day = Column(Date, primary_key=True)
+    channel = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    conversations = Column(Integer, nullable=False, default=0)
+    responded = Column(Integer, nullable=False, default=0)  # Conversations with a first response time
+    response_seconds = Column(Float, nullable=False, default=0.0)  # Sum of first response times
+
+class DailyAgentStats(Base):
+    __tablename__ = "daily_agent_stats"
+
+    day = Column(Date, primary_key=True)
+    agent_id = Column(Integer, primary_key=True)  # Conversation.assigned_to
+    conversations = Column(Integer, nullable=False, default=0)
+    scored = Column(Integer, nullable=False, default=0)
+    lead_score_sum = Column(Float, nullable=False, default=0.0)
+
+class DailyLeadStats(Base):
+    __tablename__ = "daily_lead_stats"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    leads = Column(Integer, nullable=False, default=0)
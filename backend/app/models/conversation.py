@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import DDL, Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean, Index, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -11,11 +11,13 @@ class Conversation(Base):
     channel = Column(String)  # whatsapp, facebook, instagram
     sender_id = Column(String, index=True)
     sender_name = Column(String)
+    normalized_sender_name = Column(String, nullable=True)  # Case/accent-folded name for contact lookup
+    normalized_sender_phone = Column(String, nullable=True)  # E.164 form of a WhatsApp sender_id
     recipient_id = Column(String)
     message_text = Column(Text)
     message_type = Column(String)  # text, image, video, etc.
     timestamp = Column(DateTime(timezone=True))
-    lead_score = Column(Float, default=0.0)
+    lead_score = Column(Float, default=0.0, server_default="0", nullable=False)
     sentiment = Column(Float, default=0.0)  # -1 to 1
     intent = Column(String)
     ai_confidence = Column(Float, default=0.0)
@@ -23,13 +25,51 @@ class Conversation(Base):
     assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String, default="open")  # open, closed, escalated
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Maintained on write by conversation_counters.record_message, repaired by its reconciler
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    inbound_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_inbound_at = Column(DateTime(timezone=True), nullable=True)
+    last_outbound_at = Column(DateTime(timezone=True), nullable=True)
+    first_response_seconds = Column(Float, nullable=True)
 
     # Relationships
     assigned_user = relationship("User")
     messages = relationship("Message", back_populates="conversation")
 
+    __table_args__ = (
+        # Dashboard: date range grouped by channel/status, answered from the index alone
+        Index("ix_conversations_created_at_channel_status", "created_at", "channel", "status"),
+        # Keyset pagination of the conversation list (newest first, optionally filtered)
+        Index("ix_conversations_updated_at_id", "updated_at", "id"),
+        Index("ix_conversations_lead_score_id", "lead_score", "id"),
+        Index("ix_conversations_channel_status_updated_at_id", "channel", "status", "updated_at", "id"),
+        Index("ix_conversations_assigned_to_updated_at_id", "assigned_to", "updated_at", "id"),
+        # Agent views and per-agent performance
+        Index("ix_conversations_assigned_to_status", "assigned_to", "status", postgresql_include=["lead_score"]),
+        # Escalation queue: open conversations waiting for a human
+        Index(
+            "ix_conversations_needs_human_open",
+            "created_at",
+            postgresql_where=text("needs_human = true AND status <> 'closed'"),
+            sqlite_where=text("needs_human = 1 AND status <> 'closed'"),
+        ),
+        # Contact typeahead: substring/prefix matches via pg_trgm (see services/contact_directory.py);
+        # other databases use an in-process prefix index instead
+        Index(
+            "ix_conversations_normalized_sender_name_trgm", "normalized_sender_name",
+            postgresql_using="gin", postgresql_ops={"normalized_sender_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_conversations_normalized_sender_phone_trgm", "normalized_sender_phone",
+            postgresql_using="gin", postgresql_ops={"normalized_sender_phone": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class Message(Base):
+    # On PostgreSQL this table is range-partitioned by month on sent_at, with primary
+    # key (id, sent_at); see PartitionManager
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -37,9 +77,44 @@ class Message(Base):
     direction = Column(String)  # inbound, outbound
     content = Column(Text)
     content_type = Column(String, default="text")
-    sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+    __table_args__ = (
+        # Conversation history and first-response lookups
+        Index("ix_messages_conversation_id_direction_sent_at", "conversation_id", "direction", "sent_at"),
+    )
+
+# Full-text search over message content (see services/message_search.py). PostgreSQL keeps a
+# generated tsvector column with a GIN index; SQLite keeps an FTS5 index in sync with triggers.
+MESSAGE_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_messages_search_vector ON messages USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+        "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+        "CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    ],
+}
+
+for _dialect, _statements in MESSAGE_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Message.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Message.__table__, "before_drop", DDL("DROP TABLE IF EXISTS messages_fts").execute_if(dialect="sqlite"))
+
+# Trigram operator classes for the contact typeahead indexes
+event.listen(
+    Conversation.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -9,8 +9,11 @@ class Lead(Base):
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
     name = Column(String)
+    normalized_name = Column(String, nullable=True)  # Case/accent-folded name for contact lookup
     phone = Column(String)
     email = Column(String)
+    normalized_phone = Column(String, nullable=True)  # E.164-style key used for identity resolution
+    normalized_email = Column(String, nullable=True)  # Lower-cased email used for identity resolution
     program_interest = Column(String)
     score = Column(Float, default=0.0)
     status = Column(String, default="new")  # new, contacted, qualified, converted, lost
@@ -22,4 +25,28 @@ class Lead(Base):
 
     # Relationships
     conversation = relationship("Conversation")
-    assigned_user = relationship("User")
\ No newline at end of file
+    assigned_user = relationship("User")
+
+    __table_args__ = (
+        # Identity lookups are pure equality matches, so hash indexes are enough on PostgreSQL
+        Index("ix_leads_normalized_phone", "normalized_phone", postgresql_using="hash"),
+        Index("ix_leads_normalized_email", "normalized_email", postgresql_using="hash"),
+        # Dashboard totals/grouping by date range, and per-status funnel counts
+        Index("ix_leads_created_at_status", "created_at", "status"),
+        Index("ix_leads_status_created_at", "status", "created_at"),
+        Index("ix_leads_conversation_id", "conversation_id"),
+        # Contact typeahead: substring/prefix matches via pg_trgm (see services/contact_directory.py);
+        # other databases use an in-process prefix index instead
+        Index(
+            "ix_leads_normalized_name_trgm", "normalized_name",
+            postgresql_using="gin", postgresql_ops={"normalized_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_leads_normalized_phone_trgm", "normalized_phone",
+            postgresql_using="gin", postgresql_ops={"normalized_phone": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_leads_normalized_email_trgm", "normalized_email",
+            postgresql_using="gin", postgresql_ops={"normalized_email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -11,5 +11,9 @@ class User(Base):
     full_name = Column(String)
     role = Column(String)  # admin, sales, counselor, analyst
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped to revoke issued tokens
+    phone_number = Column(String, nullable=True)  # SMS notifications
+    device_token = Column(String, nullable=True)  # FCM token for push notifications
+    notification_channels = Column(String, default="push,email,sms")  # Comma-separated opted-in channels
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
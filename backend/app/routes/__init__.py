@@ -1,11 +1,15 @@
-# Export modules so they can be imported as: from .routes import auth, conversations, analytics, webhooks
+# Export modules so they can be imported as: from .routes import auth, conversations, contacts, analytics, webhooks, metrics
 from . import auth
 from . import conversations
+from . import contacts
 from . import analytics
 from . import webhooks
+from . import metrics
 
 # Also export routers for direct access if needed
 from .auth import router as auth_router
 from .conversations import router as conversations_router
+from .contacts import router as contacts_router
 from .analytics import router as analytics_router
-from .webhooks import router as webhooks_router
\ No newline at end of file
+from .webhooks import router as webhooks_router
+from .metrics import router as metrics_router
\ No newline at end of file
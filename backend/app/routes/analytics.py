@@ -1,101 +1,97 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 from typing import Dict, Any
-import pandas as pd
 import io
 from datetime import datetime, timedelta
-from ..database import get_db
-from ..models import Conversation, Message, Lead, AnalyticsEvent, User
-from ..services import AuthService
+from ..database import get_async_db
+from ..db_router import get_read_db
+from ..models import Conversation, AnalyticsEvent
+from ..container import container
+from ..services.auth_service import TokenPrincipal
+from ..services.analytics_cache import analytics_cache
+from ..services.dashboard_metrics import agent_performance, dashboard_metrics
 
 router = APIRouter()
-auth_service = AuthService()
+auth_service = container.auth_service
 
 @router.get("/dashboard")
 async def get_dashboard_data(
     days: int = 30,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    # Primary, not a replica: a lagging replica would cache pre-write figures after an invalidation
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get dashboard analytics data"""
     if not auth_service.check_permissions(current_user, "analyst"):
         raise HTTPException(status_code=403, detail="Not authorized")
 
     start_date = datetime.utcnow() - timedelta(days=days)
+    return await analytics_cache.get_or_compute(
+        "dashboard", current_user.role, lambda: db.run_sync(dashboard_metrics, start_date), days=days
+    )
 
-    # Conversation metrics
-    total_conversations = db.query(Conversation).filter(
-        Conversation.created_at >= start_date
-    ).count()
-
-    conversations_by_channel = db.query(
-        Conversation.channel,
-        func.count(Conversation.id).label('count')
-    ).filter(
-        Conversation.created_at >= start_date
-    ).group_by(Conversation.channel).all()
-
-    conversations_by_status = db.query(
-        Conversation.status,
-        func.count(Conversation.id).label('count')
-    ).filter(
-        Conversation.created_at >= start_date
-    ).group_by(Conversation.status).all()
-
-    # Lead metrics
-    total_leads = db.query(Lead).filter(
-        Lead.created_at >= start_date
-    ).count()
-
-    leads_by_status = db.query(
-        Lead.status,
-        func.count(Lead.id).label('count')
-    ).filter(
-        Lead.created_at >= start_date
-    ).group_by(Lead.status).all()
-
-    # Average response time (simplified)
-    avg_response_time = db.query(
-        func.avg(
-            func.extract('epoch', Message.sent_at - Conversation.timestamp)
+@router.get("/ai-decisions")
+async def get_ai_decision_metrics(
+    days: int = 30,
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """AI decision counts and confidence, and message processing times, aggregated in the database"""
+    if not auth_service.check_permissions(current_user, "analyst"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    start_date = datetime.utcnow() - timedelta(days=days)
+    decision = AnalyticsEvent.data["decision"].as_string()
+    confidence = AnalyticsEvent.data["confidence"].as_float()
+    processing_time = AnalyticsEvent.data["processing_time"].as_float()
+
+    decisions = (await db.execute(
+        select(
+            decision,
+            func.count(AnalyticsEvent.id),
+            func.avg(confidence),
+            func.min(confidence)
+        ).where(
+            AnalyticsEvent.event_type == "ai_decision",
+            AnalyticsEvent.timestamp >= start_date
+        ).group_by(decision).order_by(desc(func.count(AnalyticsEvent.id)))
+    )).all()
+
+    processing = (await db.execute(
+        select(
+            func.count(AnalyticsEvent.id),
+            func.avg(processing_time),
+            func.max(processing_time)
+        ).where(
+            AnalyticsEvent.event_type == "message_processing",
+            AnalyticsEvent.timestamp >= start_date
         )
-    ).join(Message, Message.conversation_id == Conversation.id).filter(
-        Conversation.created_at >= start_date,
-        Message.direction == 'outbound'
-    ).scalar()
-
-    # Conversion funnel
-    conversion_data = {
-        "conversations": total_conversations,
-        "leads": total_leads,
-        "qualified_leads": db.query(Lead).filter(
-            Lead.created_at >= start_date,
-            Lead.status == "qualified"
-        ).count(),
-        "converted": db.query(Lead).filter(
-            Lead.created_at >= start_date,
-            Lead.status == "converted"
-        ).count()
-    }
+    )).one()
 
     return {
-        "total_conversations": total_conversations,
-        "conversations_by_channel": dict(conversations_by_channel),
-        "conversations_by_status": dict(conversations_by_status),
-        "total_leads": total_leads,
-        "leads_by_status": dict(leads_by_status),
-        "avg_response_time_hours": avg_response_time / 3600 if avg_response_time else 0,
-        "conversion_funnel": conversion_data
+        "decisions": [
+            {
+                "decision": row[0],
+                "count": row[1],
+                "avg_confidence": float(row[2]) if row[2] is not None else None,
+                "min_confidence": float(row[3]) if row[3] is not None else None
+            } for row in decisions
+        ],
+        "message_processing": {
+            "count": processing[0],
+            "avg_processing_time": float(processing[1]) if processing[1] is not None else None,
+            "max_processing_time": float(processing[2]) if processing[2] is not None else None
+        }
     }
 
 @router.get("/export/{format}")
 async def export_analytics(
     format: str,
     days: int = 30,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Export analytics data"""
     if not auth_service.check_permissions(current_user, "analyst"):
@@ -104,9 +100,12 @@ async def export_analytics(
     start_date = datetime.utcnow() - timedelta(days=days)
 
     # Get conversation data
-    conversations = db.query(Conversation).filter(
-        Conversation.created_at >= start_date
-    ).all()
+    conversations = (await db.scalars(
+        select(Conversation).where(Conversation.created_at >= start_date)
+    )).all()
+
+    # Export libraries are only needed here, so they are imported on demand
+    import pandas as pd
 
     # Convert to DataFrame
     data = []
@@ -171,26 +170,16 @@ async def export_analytics(
 
 @router.get("/performance")
 async def get_performance_metrics(
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    # Primary for the same reason as the dashboard; only cache misses query it
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user performance metrics"""
     if not auth_service.check_permissions(current_user, "analyst"):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Agent performance
-    agent_performance = db.query(
-        User.full_name,
-        func.count(Conversation.id).label('conversations_handled'),
-        func.avg(Conversation.lead_score).label('avg_lead_score')
-    ).join(Conversation, Conversation.assigned_to == User.id).group_by(User.id, User.full_name).all()
+    # Agent performance, from the daily agent rollups
+    async def compute():
+        return {"agent_performance": await db.run_sync(agent_performance)}
 
-    return {
-        "agent_performance": [
-            {
-                "agent": perf[0],
-                "conversations_handled": perf[1],
-                "avg_lead_score": float(perf[2]) if perf[2] else 0.0
-            } for perf in agent_performance
-        ]
-    }
\ No newline at end of file
+    return await analytics_cache.get_or_compute("performance", current_user.role, compute)
@@ -1,26 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from datetime import timedelta
-from ..database import get_db
-from ..services import AuthService
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..container import container
 from ..models import User
-from ..schemas import UserCreate, Token, UserResponse
+from ..services.auth_service import TokenPrincipal
+from ..schemas import UserCreate, Token, RefreshRequest, UserResponse
 from ..utils.logger import get_logger
 
 router = APIRouter()
-auth_service = AuthService()
+auth_service = container.auth_service
 logger = get_logger(__name__)
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
+    auth_service.check_login_throttle(request.client.host if request.client else None)
+
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user_data.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create new user
-    hashed_password = auth_service.get_password_hash(user_data.password)
+    hashed_password = await auth_service.get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -28,26 +31,23 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         role=user_data.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    # Create access token
-    access_token = auth_service.create_access_token(
-        data={"sub": db_user.email}
-    )
+    await db.commit()
+    await db.refresh(db_user)
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return auth_service.create_user_tokens(db_user)
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     email: str = Form(..., alias="username"),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate user and return JWT token"""
     logger.info(f"Login attempt for email: {email}")
+    auth_service.check_login_throttle(request.client.host if request.client else None, email)
 
-    user = auth_service.authenticate_user(db, email, password)
+    user = await auth_service.authenticate_user_async(db, email, password)
     if not user:
         logger.warning(f"Failed login attempt for email: {email}")
         raise HTTPException(
@@ -57,11 +57,30 @@ async def login(
         )
 
     logger.info(f"Successful login for user: {user.email} (ID: {user.id})")
-    access_token = auth_service.create_access_token(
-        data={"sub": user.email}
-    )
+    auth_service.reset_login_throttle(email)
+    return auth_service.create_user_tokens(user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    tokens = await auth_service.refresh_tokens(db, request.refresh_token)
+    if not tokens:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or revoked refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return tokens
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/revoke")
+async def revoke(
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoke all tokens issued to the current user (log out everywhere)"""
+    await auth_service.revoke_tokens(db, current_user.id)
+    logger.info(f"Tokens revoked for user ID: {current_user.id}")
+    return {"message": "Tokens revoked"}
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(auth_service.get_current_user_dependency)):
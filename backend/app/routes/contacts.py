@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..db_router import get_read_db
+from ..schemas import ContactMatch
+from ..container import container
+from ..services.auth_service import TokenPrincipal
+from ..services.contact_directory import contact_directory
+
+router = APIRouter()
+auth_service = container.auth_service
+
+@router.get("/typeahead", response_model=List[ContactMatch])
+async def contact_typeahead(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Contacts (conversations and leads) whose name, phone or email matches a partial query.
+
+    Queries containing ``@`` match emails, mostly-digit queries match phone numbers and
+    anything else matches names, ignoring case and accents.
+    """
+    return await contact_directory.lookup(db, current_user, q, limit)
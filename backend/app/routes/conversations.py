@@ -1,51 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..database import get_db
-from ..models import Conversation, Message, User
-from ..schemas import Conversation as ConversationSchema, Message as MessageSchema
-from ..services import AuthService
+from datetime import datetime
+from ..database import get_async_db
+from ..db_router import get_read_db
+from ..models import Conversation, Message
+from ..schemas import Conversation as ConversationSchema, Message as MessageSchema, MessageSearchHit
+from ..container import container
+from ..services.auth_service import TokenPrincipal
+from ..services.conversation_counters import record_message
+from ..services.message_search import message_search
+from ..utils.pagination import InvalidCursor, KeysetPagination
 
 router = APIRouter()
-auth_service = AuthService()
+auth_service = container.auth_service
+
+# Newest-first orderings for the conversation list; id breaks ties so cursors are unique
+CONVERSATION_SORTS = {
+    "updated_at": KeysetPagination("updated_at", [Conversation.updated_at, Conversation.id]),
+    "lead_score": KeysetPagination("lead_score", [Conversation.lead_score, Conversation.id]),
+}
 
 @router.get("/", response_model=List[ConversationSchema])
 async def get_conversations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    sort: str = "updated_at",
     skip: int = 0,
-    limit: int = 50,
     channel: Optional[str] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all conversations with optional filtering"""
-    query = db.query(Conversation)
+    """Get conversations with optional filtering, one page at a time.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the next page;
+    the header is absent on the last page. ``skip`` is deprecated in favour of cursors.
+    """
+    pagination = CONVERSATION_SORTS.get(sort)
+    if pagination is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort. Use {', '.join(CONVERSATION_SORTS)}")
+
+    query = select(Conversation)
 
     if channel:
-        query = query.filter(Conversation.channel == channel)
+        query = query.where(Conversation.channel == channel)
     if status:
-        query = query.filter(Conversation.status == status)
+        query = query.where(Conversation.status == status)
 
     # Role-based filtering
     if current_user.role not in ["admin", "analyst"]:
         # Non-admin users only see assigned conversations
-        query = query.filter(
+        query = query.where(
             (Conversation.assigned_to == current_user.id) |
             (Conversation.assigned_to.is_(None))
         )
 
-    conversations = query.offset(skip).limit(limit).all()
+    try:
+        query = pagination.apply(query, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    conversations, next_cursor = pagination.page((await db.scalars(query)).all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return conversations
 
+# Declared before /{conversation_id} so "search" is not taken for a conversation id
+@router.get("/search", response_model=List[MessageSearchHit])
+async def search_messages(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    channel: Optional[str] = None,
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search message content across the conversations the user can see, best matches first.
+
+    Matched words are wrapped in ``<mark>`` in each hit's ``highlight``. Pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` to fetch the next page.
+    """
+    try:
+        hits, next_cursor = await message_search.search(db, current_user, q, cursor, limit, channel=channel)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return hits
+
 @router.get("/{conversation_id}", response_model=ConversationSchema)
 async def get_conversation(
     conversation_id: int,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific conversation"""
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -59,11 +116,11 @@ async def get_conversation(
 @router.get("/{conversation_id}/messages", response_model=List[MessageSchema])
 async def get_conversation_messages(
     conversation_id: int,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get messages for a conversation"""
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -72,7 +129,9 @@ async def get_conversation_messages(
         conversation.assigned_to != current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to view this conversation")
 
-    messages = db.query(Message).filter(Message.conversation_id == conversation_id).all()
+    messages = (await db.scalars(
+        select(Message).where(Message.conversation_id == conversation_id)
+    )).all()
     return messages
 
 class AssignConversationRequest(BaseModel):
@@ -82,20 +141,20 @@ class AssignConversationRequest(BaseModel):
 async def assign_conversation(
     conversation_id: int,
     request: AssignConversationRequest,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Assign conversation to a user"""
     if not auth_service.check_permissions(current_user, "counselor"):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     conversation.assigned_to = request.user_id
     conversation.status = "assigned"
-    db.commit()
+    await db.commit()
 
     return {"message": "Conversation assigned successfully"}
 
@@ -106,11 +165,11 @@ class ReplyRequest(BaseModel):
 async def send_reply(
     conversation_id: int,
     request: ReplyRequest,
-    current_user: User = Depends(auth_service.get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a reply to a conversation"""
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -123,12 +182,14 @@ async def send_reply(
     message = Message(
         conversation_id=conversation_id,
         direction="outbound",
-        content=request.content
+        content=request.content,
+        sent_at=datetime.utcnow()
     )
     db.add(message)
+    record_message(conversation, message.direction, message.sent_at)
 
     # Update conversation status
     conversation.status = "replied"
-    db.commit()
+    await db.commit()
 
     return {"message": "Reply sent successfully"}
\ No newline at end of file
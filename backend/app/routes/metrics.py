@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..container import container
+from ..services.auth_service import TokenPrincipal
+from ..utils.metrics import metrics_registry
+
+router = APIRouter()
+auth_service = container.auth_service
+
+@router.get("/")
+async def get_metrics(current_user: TokenPrincipal = Depends(auth_service.get_token_principal_dependency)):
+    """Get runtime metrics (notification dispatch, etc.)"""
+    if not auth_service.check_permissions(current_user, "admin"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return metrics_registry.snapshot()
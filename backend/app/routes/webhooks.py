@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..container import get_webhook_service
 from ..services import WebhookService
 
 router = APIRouter()
-webhook_service = WebhookService()
 
 @router.post("/whatsapp")
-async def whatsapp_webhook(request: Request, db: Session = Depends(get_db)):
+async def whatsapp_webhook(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
     """Handle WhatsApp webhook"""
     try:
         data = await request.json()
@@ -20,27 +24,35 @@ async def whatsapp_webhook(request: Request, db: Session = Depends(get_db)):
             ):
                 raise HTTPException(status_code=401, detail="Invalid signature")
 
-        result = webhook_service.process_whatsapp_message(data, db)
+        result = await webhook_service.process_whatsapp_message(data, db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/facebook")
-async def facebook_webhook(request: Request, db: Session = Depends(get_db)):
+async def facebook_webhook(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
     """Handle Facebook Messenger webhook"""
     try:
         data = await request.json()
-        result = webhook_service.process_facebook_message(data, db)
+        result = await webhook_service.process_facebook_message(data, db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/instagram")
-async def instagram_webhook(request: Request, db: Session = Depends(get_db)):
+async def instagram_webhook(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    webhook_service: WebhookService = Depends(get_webhook_service)
+):
     """Handle Instagram webhook"""
     try:
         data = await request.json()
-        result = webhook_service.process_instagram_message(data, db)
+        result = await webhook_service.process_instagram_message(data, db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
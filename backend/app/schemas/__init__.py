@@ -21,12 +21,18 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class ConversationBase(BaseModel):
     channel: str
     sender_id: str
-    sender_name: str
-    message_text: str
+    # Nullable columns; conversations created by hand or by imports may lack them
+    sender_name: Optional[str] = None
+    message_text: Optional[str] = None
 
 class Conversation(ConversationBase):
     id: int
@@ -36,7 +42,12 @@ class Conversation(ConversationBase):
     ai_confidence: float
     needs_human: bool
     status: str
-    timestamp: datetime
+    timestamp: Optional[datetime] = None
+    message_count: int = 0
+    inbound_count: int = 0
+    last_inbound_at: Optional[datetime] = None
+    last_outbound_at: Optional[datetime] = None
+    first_response_seconds: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -54,6 +65,31 @@ class Message(MessageBase):
     class Config:
         from_attributes = True
 
+class MessageSearchHit(BaseModel):
+    id: int
+    conversation_id: int
+    direction: str
+    sent_at: datetime
+    channel: Optional[str]
+    sender_name: Optional[str]
+    relevance: float
+    highlight: str
+
+    class Config:
+        from_attributes = True
+
+class ContactMatch(BaseModel):
+    kind: str
+    id: int
+    name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    channel: Optional[str]
+    conversation_id: Optional[int]
+
+    class Config:
+        from_attributes = True
+
 class LeadBase(BaseModel):
     name: Optional[str]
     phone: Optional[str]
@@ -1,4 +1,6 @@
 from .webhook_service import WebhookService
 from .ai_service import AIService
 from .notification_service import NotificationService
-from .auth_service import AuthService
\ No newline at end of file
+from .auth_service import AuthService
+from .lead_identity_service import LeadIdentityService
+from .notification_dispatcher import NotificationDispatcher, notification_dispatcher
\ No newline at end of file
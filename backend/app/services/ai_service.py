@@ -1,4 +1,3 @@
-import openai
 from typing import Dict, Any, Optional
 from ..config import settings
 import logging
@@ -15,6 +14,8 @@ class AIService:
             self.client = None
         else:
             try:
+                # Imported lazily so the SDK is only loaded when AI is configured
+                import openai
                 self.client = openai.OpenAI(api_key=settings.openai_api_key)
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
@@ -39,7 +40,8 @@ class AIService:
                 "reply": None,
                 "urgency": False
             }
-        
+
+        import openai
         try:
             # Intent classification and sentiment analysis
             intent_response = self.client.chat.completions.create(
@@ -118,7 +120,8 @@ Return JSON with:
         """Extract lead information from message"""
         if not self._check_client():
             return {}
-        
+
+        import openai
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -184,7 +187,8 @@ Return JSON with:
         """Generate automated reply"""
         if not self._check_client():
             return "Thank you for your message. A representative will get back to you shortly."
-        
+
+        import openai
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
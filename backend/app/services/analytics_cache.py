@@ -0,0 +1,217 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Conversation, Lead
+from ..utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsCache:
+    """Caches analytics responses per worker and, optionally, in Redis for all workers.
+
+    Entries are keyed on the route, the caller's role scope and the ``days`` window, and
+    expire after ``analytics_cache_ttl_seconds``. Committing a conversation or lead change
+    drops this worker's entries and the shared Redis entries; other workers keep their
+    own copies at most ``analytics_cache_local_ttl_seconds``. Concurrent misses for one
+    key are computed once per worker and the result is shared. Misses must be computed
+    on the primary: a replica may still return figures from before the invalidation.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._redis = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _key(name: str, scope: str, days: Optional[int]) -> str:
+        return f"{name}:{scope}:{days}"
+
+    def _local_ttl(self) -> float:
+        if settings.analytics_cache_redis_enabled:
+            return min(settings.analytics_cache_local_ttl_seconds, settings.analytics_cache_ttl_seconds)
+        return settings.analytics_cache_ttl_seconds
+
+    async def get_or_compute(
+        self,
+        name: str,
+        scope: str,
+        compute: Callable[[], Awaitable[Any]],
+        days: Optional[int] = None
+    ) -> Any:
+        """Cached response for ``name`` in ``scope``, computed with ``compute`` on a miss"""
+        if settings.analytics_cache_ttl_seconds <= 0:
+            return await compute()
+
+        key = self._key(name, scope, days)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            self.local_hits += 1
+            return entry[0]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leading request was cancelled (e.g. its client went away), not this one
+                if not inflight.cancelled():
+                    raise
+            return await self.get_or_compute(name, scope, compute, days)
+
+        future = asyncio.get_running_loop().create_future()
+        # Marks a failure as retrieved when no other request was waiting for it
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, compute)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        if settings.analytics_cache_redis_enabled:
+            value = await asyncio.to_thread(self._redis_get, key)
+            if value is not None:
+                self.redis_hits += 1
+                self._store(key, value, generation)
+                return value
+
+        self.misses += 1
+        value = await compute()
+        # Not cached if a write was committed while computing; the value may predate it
+        if self._store(key, value, generation) and settings.analytics_cache_redis_enabled:
+            await asyncio.to_thread(self._redis_set, key, value)
+        return value
+
+    def _store(self, key: str, value: Any, generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = (value, time.time() + self._local_ttl())
+            return True
+
+    def invalidate(self):
+        """Drop every cached response, here and in Redis"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        self.invalidations += 1
+
+        if not settings.analytics_cache_redis_enabled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed from a worker thread; a blocking DEL is fine here
+            self._redis_invalidate()
+        else:
+            # Committed on the event loop (e.g. an AsyncSession), which must not wait on Redis
+            loop.run_in_executor(None, self._redis_invalidate)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+            "redis_enabled": settings.analytics_cache_redis_enabled,
+        }
+
+    # Shared tier: one Redis hash, so an invalidation is a single DEL
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+        return self._redis
+
+    def _redis_get(self, key: str) -> Any:
+        try:
+            raw = self._get_redis().hget(settings.analytics_cache_redis_key, key)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Shared analytics cache unavailable: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"] if entry["expires_at"] > time.time() else None
+
+    def _redis_invalidate(self):
+        try:
+            self._get_redis().delete(settings.analytics_cache_redis_key)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Could not invalidate shared analytics cache: {e}")
+
+    def _redis_set(self, key: str, value: Any):
+        ttl = settings.analytics_cache_ttl_seconds
+        try:
+            pipeline = self._get_redis().pipeline()
+            pipeline.hset(
+                settings.analytics_cache_redis_key, key,
+                json.dumps({"value": value, "expires_at": time.time() + ttl}, default=str)
+            )
+            pipeline.expire(settings.analytics_cache_redis_key, int(ttl) + 1)
+            pipeline.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Could not store shared analytics cache entry: {e}")
+
+# Global analytics response cache
+analytics_cache = AnalyticsCache()
+metrics_registry.register("analytics_cache", analytics_cache.get_stats)
+
+@event.listens_for(Conversation, "after_insert")
+@event.listens_for(Conversation, "after_update")
+@event.listens_for(Conversation, "after_delete")
+@event.listens_for(Lead, "after_insert")
+@event.listens_for(Lead, "after_update")
+@event.listens_for(Lead, "after_delete")
+def _mark_analytics_changed(mapper, connection, target):
+    # Collected on the session and invalidated once the change is committed
+    Session.object_session(target).info["analytics_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_analytics_on_commit(session):
+    if session.info.pop("analytics_changed", False):
+        analytics_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_analytics_on_rollback(session):
+    session.info.pop("analytics_changed", None)
@@ -0,0 +1,302 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import delete, event, func, insert, inspect, literal_column, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ClauseElement
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Conversation, Lead, DailyConversationStats, DailyAgentStats, DailyLeadStats
+from ..utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stored in place of NULL in rollup key columns
+NULL_KEY = ""
+
+# Arbitrary key for the advisory lock that keeps compaction to one worker at a time
+COMPACTION_LOCK_ID = 7_320_049
+
+CONVERSATION_FIELDS = ("created_at", "channel", "status", "first_response_seconds", "assigned_to", "lead_score")
+LEAD_FIELDS = ("created_at", "status")
+
+# Per-model deltas: rollup key -> {column: change}
+Deltas = Dict[Any, Dict[Tuple, Dict[str, float]]]
+
+class _Unknown(Exception):
+    """A value is only known to the database (a SQL expression, or a row gone missing)"""
+
+def _day(value: Optional[datetime]) -> date:
+    # Rows inserted without created_at get the database's now() at flush
+    if value is None:
+        return datetime.utcnow().date()
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def _add(deltas: Deltas, model, key: Tuple, **changes: float):
+    entry = deltas.setdefault(model, {}).setdefault(key, dict.fromkeys(changes, 0))
+    for column, change in changes.items():
+        entry[column] += change
+
+def _conversation_contribution(deltas: Deltas, values: Dict[str, Any], sign: int):
+    day = _day(values["created_at"])
+    response = values["first_response_seconds"]
+    _add(
+        deltas, DailyConversationStats, (day, values["channel"] or NULL_KEY, values["status"] or NULL_KEY),
+        conversations=sign,
+        responded=sign if response is not None else 0,
+        response_seconds=sign * (response or 0.0),
+    )
+    if values["assigned_to"] is not None:
+        score = values["lead_score"]
+        _add(
+            deltas, DailyAgentStats, (day, values["assigned_to"]),
+            conversations=sign,
+            scored=sign if score is not None else 0,
+            lead_score_sum=sign * (score or 0.0),
+        )
+
+def _lead_contribution(deltas: Deltas, values: Dict[str, Any], sign: int):
+    _add(deltas, DailyLeadStats, (_day(values["created_at"]), values["status"] or NULL_KEY), leads=sign)
+
+def _pending_values(target, fields) -> Dict[str, Any]:
+    """Values a new object will be inserted with, including Python-side column defaults"""
+    columns = inspect(target).mapper.columns
+    values = {}
+    for field in fields:
+        value = getattr(target, field)
+        default = columns[field].default
+        if value is None and default is not None and default.is_scalar:
+            value = default.arg
+        if isinstance(value, ClauseElement):
+            raise _Unknown(field)
+        values[field] = value
+    return values
+
+def _previous_values(session: Session, target, fields) -> Dict[str, Any]:
+    """Values as last flushed, from attribute history or, where not loaded, the row itself"""
+    state = inspect(target)
+    values = {}
+    missing = []
+    for field in fields:
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        elif history.unchanged:
+            values[field] = history.unchanged[0]
+        else:
+            missing.append(field)
+
+    if missing:
+        # Expired (e.g. on commit) or never loaded; the row holds them until this flush
+        table = state.mapper.local_table
+        row = session.connection().execute(
+            select(*(table.c[field] for field in missing)).where(table.c.id == state.identity[0])
+        ).one_or_none()
+        if row is None:
+            raise _Unknown(missing[0])
+        values.update(zip(missing, row))
+    return values
+
+def _changed_values(target, fields, previous: Dict[str, Any]) -> Dict[str, Any]:
+    """Values a changed object will be updated to"""
+    state = inspect(target)
+    values = {}
+    for field in fields:
+        history = state.attrs[field].history
+        value = history.added[0] if history.added else previous[field]
+        if isinstance(value, ClauseElement):
+            raise _Unknown(field)
+        values[field] = value
+    return values
+
+def _has_changes(target, fields) -> bool:
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+class AnalyticsRollups:
+    """Daily rollups of conversations, agent assignments and leads for the analytics routes.
+
+    Rows are keyed by the UTC day the conversation or lead was created, so a dashboard
+    window reads one row per day and dimension instead of scanning the source tables.
+    Every flush that inserts, changes or deletes a conversation or lead applies the
+    difference as ``INSERT ... ON CONFLICT DO UPDATE`` increments in the same transaction.
+    Writes that bypass the ORM (bulk updates, manual fixes) are repaired by compaction,
+    which rebuilds the last ``rollup_repair_days`` days from the source tables.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.incremental_updates = 0
+        self.skipped_changes = 0
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.rows_rebuilt = 0
+
+    def collect(self, session: Session) -> Deltas:
+        """Rollup changes for the conversations and leads about to be flushed"""
+        deltas: Deltas = {}
+        for model, fields, contribute in (
+            (Conversation, CONVERSATION_FIELDS, _conversation_contribution),
+            (Lead, LEAD_FIELDS, _lead_contribution),
+        ):
+            changes = [(target, 1) for target in session.new if isinstance(target, model)]
+            changes += [
+                (target, 0) for target in session.dirty
+                if isinstance(target, model) and _has_changes(target, fields)
+            ]
+            changes += [(target, -1) for target in session.deleted if isinstance(target, model)]
+
+            for target, sign in changes:
+                try:
+                    previous = _previous_values(session, target, fields) if sign <= 0 else None
+                    if sign > 0:
+                        current = _pending_values(target, fields)
+                    elif sign == 0:
+                        current = _changed_values(target, fields, previous)
+                    else:
+                        current = None
+                except _Unknown as e:
+                    # Left for compaction to repair
+                    self.skipped_changes += 1
+                    logger.debug(f"Rollup change for {model.__name__} skipped, {e} is not known before flush")
+                    continue
+                if previous is not None:
+                    contribute(deltas, previous, -1)
+                if current is not None:
+                    contribute(deltas, current, 1)
+        return deltas
+
+    def apply(self, connection: Connection, deltas: Deltas) -> bool:
+        """Add ``deltas`` to the rollup tables; False where the database has no upsert"""
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            return False
+
+        for model, changes in deltas.items():
+            table = model.__table__
+            keys = [column.name for column in table.primary_key.columns]
+            # Sorted so concurrent writers lock rows in the same order
+            rows = [
+                dict(zip(keys, key), **values)
+                for key, values in sorted(changes.items())
+                if any(values.values())
+            ]
+            if not rows:
+                continue
+            statement = upsert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=keys,
+                set_={column: table.c[column] + statement.excluded[column] for column in rows[0] if column not in keys}
+            )
+            connection.execute(statement, rows)
+            self.incremental_updates += len(rows)
+        return True
+
+    def rebuild(self, db: Session, since: Optional[date] = None) -> int:
+        """Recompute the rollups for days from ``since`` (every day when None) from the source rows"""
+        postgresql = db.get_bind().dialect.name == "postgresql"
+
+        def utc_day(created_at):
+            # Bucketed by UTC day like _day; PostgreSQL would otherwise use the session time zone
+            return func.date(func.timezone("UTC", created_at) if postgresql else created_at)
+
+        conversation_day = utc_day(Conversation.created_at)
+        channel = func.coalesce(Conversation.channel, literal_column("''"))
+        conversation_status = func.coalesce(Conversation.status, literal_column("''"))
+        lead_day = utc_day(Lead.created_at)
+        lead_status = func.coalesce(Lead.status, literal_column("''"))
+        # (rollup, key expressions, aggregates, source creation time); columns in rollup table order
+        sources = [
+            (DailyConversationStats, [conversation_day, channel, conversation_status], [
+                func.count(Conversation.id),
+                func.count(Conversation.first_response_seconds),
+                func.coalesce(func.sum(Conversation.first_response_seconds), 0.0),
+            ], Conversation.created_at),
+            (DailyAgentStats, [conversation_day, Conversation.assigned_to], [
+                func.count(Conversation.id),
+                func.count(Conversation.lead_score),
+                func.coalesce(func.sum(Conversation.lead_score), 0.0),
+            ], Conversation.created_at),
+            (DailyLeadStats, [lead_day, lead_status], [
+                func.count(Lead.id),
+            ], Lead.created_at),
+        ]
+
+        rows = 0
+        for model, keys, aggregates, created_at in sources:
+            source = select(*keys, *aggregates).where(created_at.isnot(None)).group_by(*keys)
+            if model is DailyAgentStats:
+                source = source.where(Conversation.assigned_to.isnot(None))
+            cleanup = delete(model)
+            if since is not None:
+                start = datetime.combine(since, datetime.min.time(), tzinfo=timezone.utc if postgresql else None)
+                source = source.where(created_at >= start)
+                cleanup = cleanup.where(model.day >= since)
+            db.execute(cleanup)
+            result = db.execute(insert(model).from_select([column.name for column in model.__table__.columns], source))
+            rows += max(result.rowcount, 0)
+        db.commit()
+        self.rows_rebuilt += rows
+        return rows
+
+    def run(self) -> int:
+        """Rebuild the last ``rollup_repair_days`` days, unless another worker is at it"""
+        since = datetime.utcnow().date() - timedelta(days=settings.rollup_repair_days)
+        with SessionLocal() as db:
+            if db.get_bind().dialect.name == "postgresql" and not db.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": COMPACTION_LOCK_ID}
+            ):
+                return 0
+            rows = self.rebuild(db, since)
+        self.last_run = datetime.utcnow()
+        logger.info(f"Rebuilt {rows} analytics rollup rows since {since}")
+        return rows
+
+    async def start(self):
+        if self._task is not None or settings.rollup_compaction_interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._compaction_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _compaction_loop(self):
+        while True:
+            await asyncio.sleep(settings.rollup_compaction_interval_seconds)
+            try:
+                await asyncio.to_thread(self.run)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Analytics rollup compaction failed: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "incremental_updates": self.incremental_updates,
+            "skipped_changes": self.skipped_changes,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "rows_rebuilt": self.rows_rebuilt,
+        }
+
+# Global rollup maintainer, compacted by a background task started with the application
+analytics_rollups = AnalyticsRollups()
+metrics_registry.register("analytics_rollups", analytics_rollups.get_stats)
+
+@event.listens_for(Session, "before_flush")
+def _update_rollups(session, flush_context, instances):
+    deltas = analytics_rollups.collect(session)
+    if deltas:
+        analytics_rollups.apply(session.connection(), deltas)
@@ -1,17 +1,51 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 import bcrypt
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models import User
 from ..config import settings
-from ..database import get_db
+from ..database import get_async_db
+from ..utils.rate_limit import SlidingWindowLimiter
+from .principal_cache import principal_cache
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """The caller as described by a verified access token's claims (no ORM object)"""
+    id: int
+    email: str
+    role: str
+    token_version: int
 
 class AuthService:
     def __init__(self):
-        pass
+        # bcrypt is deliberately slow; keep it off the event loop and cap how much runs at once.
+        # The executor is created on first use and shut down by close()
+        self._hash_executor: Optional[ThreadPoolExecutor] = None
+        self._hash_executor_lock = threading.Lock()
+        self._hash_slots = threading.BoundedSemaphore(
+            settings.password_hash_workers + settings.password_hash_max_pending
+        )
+        self.hash_rejections = 0
+        self.ip_limiter = SlidingWindowLimiter(
+            settings.login_max_attempts_per_ip, settings.login_throttle_window_seconds
+        )
+        self.email_limiter = SlidingWindowLimiter(
+            settings.login_max_attempts_per_email, settings.login_throttle_window_seconds
+        )
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         try:
@@ -31,6 +65,43 @@ class AuthService:
     def get_password_hash(self, password: str) -> str:
         return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
+    def _get_hash_executor(self) -> ThreadPoolExecutor:
+        with self._hash_executor_lock:
+            if self._hash_executor is None:
+                self._hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.password_hash_workers,
+                    thread_name_prefix="password-hash"
+                )
+            return self._hash_executor
+
+    def close(self):
+        """Shut down the password hashing executor"""
+        with self._hash_executor_lock:
+            executor, self._hash_executor = self._hash_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def _run_hashing(self, func, *args):
+        """Run a bcrypt call on the dedicated executor, shedding load when it is saturated"""
+        if not self._hash_slots.acquire(blocking=False):
+            self.hash_rejections += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_hash_executor(), func, *args)
+        finally:
+            self._hash_slots.release()
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run_hashing(self.verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        return await self._run_hashing(self.get_password_hash, password)
+
     def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
         user = db.query(User).filter(User.email == email).first()
         if not user:
@@ -39,6 +110,32 @@ class AuthService:
             return None
         return user
 
+    async def authenticate_user_async(self, db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """authenticate_user for async routes; bcrypt runs off the event loop"""
+        user = await db.scalar(select(User).where(User.email == email))
+        if not user:
+            return None
+        if not await self.verify_password_async(password, user.hashed_password):
+            return None
+        return user
+
+    def check_login_throttle(self, client_ip: Optional[str], email: Optional[str] = None):
+        """Record an attempt and raise 429 if the client IP or email is over its limit"""
+        retry_after = None
+        if client_ip:
+            retry_after = self.ip_limiter.hit(client_ip)
+        if retry_after is None and email:
+            retry_after = self.email_limiter.hit(email.lower())
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.5)))},
+            )
+
+    def reset_login_throttle(self, email: str):
+        self.email_limiter.reset(email.lower())
+
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         to_encode = data.copy()
         if expires_delta:
@@ -46,35 +143,133 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
         to_encode.update({"exp": expire})
+        to_encode.setdefault("type", ACCESS_TOKEN)
         encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
         return encoded_jwt
 
-    def verify_token(self, token: str) -> Optional[str]:
+    def create_refresh_token(self, user: User) -> str:
+        expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+        to_encode = {
+            "sub": user.email,
+            "uid": user.id,
+            "ver": user.token_version or 0,
+            "type": REFRESH_TOKEN,
+            "jti": uuid.uuid4().hex,
+            "exp": expire,
+        }
+        return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+    def create_user_tokens(self, user: User) -> dict:
+        """Access token carrying id/role/version claims plus a refresh token"""
+        access_token = self.create_access_token(data={
+            "sub": user.email,
+            "uid": user.id,
+            "role": user.role,
+            "ver": user.token_version or 0,
+        })
+        return {
+            "access_token": access_token,
+            "refresh_token": self.create_refresh_token(user),
+            "token_type": "bearer",
+            "expires_in": settings.access_token_expire_minutes * 60,
+        }
+
+    def decode_token(self, token: str, token_type: str = ACCESS_TOKEN) -> Optional[dict]:
+        """Verify a token's signature, expiry and type and return its claims"""
         try:
             payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-            email: str = payload.get("sub")
-            if email is None:
-                return None
-            return email
         except JWTError:
             return None
+        # Tokens issued before the type claim existed are access tokens
+        if payload.get("type", ACCESS_TOKEN) != token_type or payload.get("sub") is None:
+            return None
+        return payload
+
+    def verify_token(self, token: str) -> Optional[str]:
+        payload = self.decode_token(token)
+        if payload is None:
+            return None
+        return payload["sub"]
+
+    def _token_expiry(self, token: str) -> Optional[float]:
+        """Expiry of an already-verified token as a Unix timestamp"""
+        exp = jwt.get_unverified_claims(token).get("exp")
+        return float(exp) if exp is not None else None
+
+    def _is_current_version(self, db: Session, payload: dict) -> bool:
+        """Tokens minted before the user's last revocation are rejected"""
+        if "ver" not in payload:
+            return True
+        return principal_cache.get_token_version(db, payload["uid"]) == payload["ver"]
 
     def get_current_user(self, db: Session, token: str) -> Optional[User]:
-        email = self.verify_token(token)
-        if email is None:
+        payload = self.decode_token(token)
+        if payload is None:
+            return None
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        if user and "ver" in payload and (user.token_version or 0) != payload["ver"]:
             return None
-        user = db.query(User).filter(User.email == email).first()
         return user
 
+    def get_token_principal(self, db: Session, token: str) -> Optional[TokenPrincipal]:
+        """Resolve the caller from token claims, loading the user only for legacy tokens"""
+        payload = self.decode_token(token)
+        if payload is None:
+            return None
+
+        if "uid" in payload and "role" in payload and "ver" in payload:
+            if not self._is_current_version(db, payload):
+                return None
+            return TokenPrincipal(
+                id=payload["uid"],
+                email=payload["sub"],
+                role=payload["role"],
+                token_version=payload["ver"]
+            )
+
+        user = principal_cache.get(token)
+        if user is None:
+            user = self.get_current_user(db, token)
+            if user is None:
+                return None
+            principal_cache.put(token, user, self._token_expiry(token))
+        return TokenPrincipal(id=user.id, email=user.email, role=user.role, token_version=user.token_version or 0)
+
+    async def refresh_tokens(self, db: AsyncSession, refresh_token: str) -> Optional[dict]:
+        """Exchange a valid refresh token for a new token pair"""
+        payload = self.decode_token(refresh_token, token_type=REFRESH_TOKEN)
+        if payload is None:
+            return None
+        user = await db.get(User, payload.get("uid"))
+        if not user or not user.is_active or (user.token_version or 0) != payload.get("ver"):
+            return None
+        return self.create_user_tokens(user)
+
+    async def revoke_tokens(self, db: AsyncSession, user_id: int):
+        """Invalidate every access and refresh token issued to a user so far"""
+        user = await db.get(User, user_id)
+        if user:
+            user.token_version = (user.token_version or 0) + 1
+            await db.commit()
+
     # FastAPI dependency function
     async def get_current_user_dependency(
         self,
         credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
     ) -> User:
         """FastAPI dependency to get current authenticated user"""
         token = credentials.credentials
-        user = self.get_current_user(db, token)
+        started = time.perf_counter()
+
+        user = principal_cache.get(token)
+        cache_hit = user is not None
+        if not cache_hit:
+            user = await db.run_sync(self.get_current_user, token)
+            if user:
+                principal_cache.put(token, user, self._token_expiry(token))
+
+        principal_cache.record(cache_hit, time.perf_counter() - started)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,7 +278,22 @@ class AuthService:
             )
         return user
 
-    def check_permissions(self, user: User, required_role: str) -> bool:
+    async def get_token_principal_dependency(
+        self,
+        credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> TokenPrincipal:
+        """FastAPI dependency for routes that only need the caller's id and role"""
+        principal = await db.run_sync(self.get_token_principal, credentials.credentials)
+        if not principal:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return principal
+
+    def check_permissions(self, user: Union[User, TokenPrincipal], required_role: str) -> bool:
         """Check if user has required role or higher permissions"""
         role_hierarchy = {
             "admin": 4,
@@ -95,4 +305,40 @@ class AuthService:
         user_level = role_hierarchy.get(user.role, 0)
         required_level = role_hierarchy.get(required_role, 0)
 
-        return user_level >= required_level
\ No newline at end of file
+        return user_level >= required_level
+
+    def get_stats(self) -> dict:
+        return {
+            "hash_workers": settings.password_hash_workers,
+            "hash_rejections": self.hash_rejections,
+            "throttled_by_ip": self.ip_limiter.throttled,
+            "throttled_by_email": self.email_limiter.throttled,
+        }
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target):
+    # Role changes and deactivation must not be outlived by tokens carrying the old claims
+    state = inspect(target)
+    if state.attrs.token_version.history.has_changes():
+        return
+    assigned = [name for name in ("role", "is_active") if state.attrs[name].history.has_changes()]
+    if not assigned:
+        return
+
+    previous = {}
+    for name in assigned:
+        history = state.attrs[name].history
+        if history.deleted:
+            previous[name] = history.deleted[0]
+    missing = [name for name in assigned if name not in previous]
+    if missing:
+        # Assigned while expired/unloaded, so the old value is only in the row
+        table = mapper.local_table
+        row = connection.execute(
+            select(*(table.c[name] for name in missing)).where(table.c.id == target.id)
+        ).one()
+        previous.update(zip(missing, row))
+
+    # Re-assigning the same value is not a change and must not revoke anything
+    if any(previous[name] != getattr(target, name) for name in assigned):
+        target.token_version = (target.token_version or 0) + 1
@@ -0,0 +1,247 @@
+import bisect
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Conversation, Lead
+from ..utils.identity import normalize_email, normalize_name, normalize_phone
+from ..utils.metrics import metrics_registry
+from .auth_service import TokenPrincipal
+
+# Roles that may look up every contact; others only see their own and unassigned ones
+UNRESTRICTED_ROLES = ("admin", "analyst")
+
+_PHONE_QUERY = re.compile(r'^[\d\s()+.-]+$')
+
+@dataclass
+class Contact:
+    kind: str  # conversation, lead
+    id: int
+    name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    channel: Optional[str]
+    conversation_id: Optional[int]
+    assigned_to: Optional[int]
+
+    @classmethod
+    def from_conversation(cls, conversation) -> "Contact":
+        return cls(
+            "conversation", conversation.id, conversation.sender_name, conversation.normalized_sender_phone,
+            None, conversation.channel, conversation.id, conversation.assigned_to
+        )
+
+    @classmethod
+    def from_lead(cls, lead) -> "Contact":
+        return cls(
+            "lead", lead.id, lead.name, lead.normalized_phone or lead.phone,
+            lead.email, None, lead.conversation_id, lead.assigned_to
+        )
+
+def parse_query(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """Which field a typeahead query targets (name, phone or email) and its normalized form"""
+    if "@" in query:
+        return "email", normalize_email(query) or query.strip().lower()
+    digits = re.sub(r'\D', '', query)
+    if len(digits) >= 3 and _PHONE_QUERY.match(query.strip()):
+        return "phone", digits
+    return "name", normalize_name(query)
+
+def conversation_sender_phone(conversation) -> Optional[str]:
+    # WhatsApp sender ids are international numbers without the leading +
+    if conversation.channel == "whatsapp" and conversation.sender_id:
+        return normalize_phone(f"+{conversation.sender_id}")
+    return None
+
+class PrefixIndex:
+    """Sorted (key, field, contact) entries answering prefix lookups by binary search"""
+
+    def __init__(self, contacts: List[Contact]):
+        self.contacts = contacts
+        entries = []
+        for position, contact in enumerate(contacts):
+            name = normalize_name(contact.name)
+            if name:
+                # Every word starts a key, so "gar" finds "maria garcia"
+                words = name.split(" ")
+                for start in range(len(words)):
+                    entries.append((" ".join(words[start:]), "name", position))
+            if contact.phone:
+                entries.append((re.sub(r'\D', '', contact.phone), "phone", position))
+            email = normalize_email(contact.email)
+            if email:
+                entries.append((email, "email", position))
+        entries.sort()
+        self.entries = entries
+
+    def lookup(self, field: str, term: str, visible, limit: int) -> List[Contact]:
+        matches, seen = [], set()
+        entries = self.entries
+        # Walk from the first candidate in place; slicing would copy the rest of the index
+        for i in range(bisect.bisect_left(entries, (term,)), len(entries)):
+            key, entry_field, position = entries[i]
+            if not key.startswith(term):
+                break
+            contact = self.contacts[position]
+            if entry_field != field or position in seen or not visible(contact):
+                continue
+            seen.add(position)
+            matches.append(contact)
+            if len(matches) >= limit:
+                break
+        return matches
+
+class ContactDirectory:
+    """Typeahead over contact names, E.164 phones and emails across conversations and leads.
+
+    On PostgreSQL lookups are substring matches served by pg_trgm GIN indexes on the
+    normalized columns, prefix matches first and then by similarity. Elsewhere (SQLite
+    in development and tests) an in-process prefix index is built from the tables and
+    reused until a conversation or lead changes or the TTL expires.
+    """
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.contact_index_ttl_seconds
+        # (index, load time), replaced as a whole so readers never see a mix
+        self._snapshot: Optional[Tuple[PrefixIndex, float]] = None
+        self._generation = 0
+        self._loading = threading.Lock()
+        self.lookups = 0
+        self.loads = 0
+
+    def invalidate(self):
+        """Force a rebuild of the in-process index on the next lookup"""
+        self._generation += 1
+        self._snapshot = None
+
+    async def lookup(self, db: AsyncSession, principal: TokenPrincipal, query: str, limit: int = 10) -> List[Contact]:
+        self.lookups += 1
+        field, term = parse_query(query)
+        if not term:
+            return []
+        if db.get_bind().dialect.name == "postgresql":
+            return await self._lookup_trigram(db, principal, field, term, limit)
+
+        index = await db.run_sync(self._get_index)
+        unrestricted = principal.role in UNRESTRICTED_ROLES
+        return index.lookup(
+            field, term, lambda contact: unrestricted or contact.assigned_to in (None, principal.id), limit
+        )
+
+    async def _lookup_trigram(
+        self, db: AsyncSession, principal: TokenPrincipal, field: str, term: str, limit: int
+    ) -> List[Contact]:
+        sources = [
+            (Conversation, {
+                "name": Conversation.normalized_sender_name,
+                "phone": Conversation.normalized_sender_phone,
+            }.get(field), Contact.from_conversation),
+            (Lead, {
+                "name": Lead.normalized_name,
+                "phone": Lead.normalized_phone,
+                "email": Lead.normalized_email,
+            }.get(field), Contact.from_lead),
+        ]
+
+        # Stored phones are E.164 ("+<digits>") while the term is bare digits
+        prefix_term = f"+{term}" if field == "phone" else term
+        ranked = []
+        for model, column, to_contact in sources:
+            if column is None:
+                continue
+            prefix = column.startswith(prefix_term, autoescape=True)
+            statement = select(model, prefix.label("prefix"), func.similarity(column, term).label("score")).where(
+                column.contains(term, autoescape=True)
+            )
+            if principal.role not in UNRESTRICTED_ROLES:
+                statement = statement.where(or_(model.assigned_to == principal.id, model.assigned_to.is_(None)))
+            statement = statement.order_by(prefix.desc(), func.similarity(column, term).desc()).limit(limit)
+            for entity, is_prefix, score in (await db.execute(statement)).all():
+                ranked.append((not is_prefix, -(score or 0), to_contact(entity)))
+
+        ranked.sort(key=lambda match: match[:2])
+        return [contact for _, _, contact in ranked[:limit]]
+
+    def _get_index(self, db: Session) -> PrefixIndex:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[1] < self.ttl_seconds:
+            return snapshot[0]
+
+        # Never wait for another build: under AsyncSession.run_sync that build may be a
+        # greenlet on this same thread, suspended on its query until we return
+        loading = self._loading.acquire(blocking=False)
+        if not loading and snapshot is not None:
+            # Someone else is refreshing an expired index; it is still good enough
+            return snapshot[0]
+        try:
+            generation = self._generation
+            contacts = [Contact.from_conversation(row) for row in db.execute(select(
+                Conversation.id, Conversation.sender_name, Conversation.normalized_sender_phone,
+                Conversation.channel, Conversation.assigned_to
+            ))]
+            contacts.extend(Contact.from_lead(row) for row in db.execute(select(
+                Lead.id, Lead.name, Lead.normalized_phone, Lead.phone, Lead.email,
+                Lead.conversation_id, Lead.assigned_to
+            )))
+
+            index = PrefixIndex(contacts)
+            # Not kept if a contact change was committed while loading; the rows may predate it
+            if generation == self._generation:
+                self._snapshot = (index, time.monotonic())
+            self.loads += 1
+            return index
+        finally:
+            if loading:
+                self._loading.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        snapshot = self._snapshot
+        return {
+            "lookups": self.lookups,
+            "loads": self.loads,
+            "indexed_contacts": len(snapshot[0].contacts) if snapshot else 0,
+        }
+
+# Global contact directory instance
+contact_directory = ContactDirectory()
+metrics_registry.register("contact_directory", contact_directory.get_stats)
+
+@event.listens_for(Conversation, "before_insert")
+@event.listens_for(Conversation, "before_update")
+def _normalize_conversation_contact(mapper, connection, target):
+    state = inspect(target)
+    if state.pending or state.attrs.sender_name.history.has_changes():
+        target.normalized_sender_name = normalize_name(target.sender_name)
+    if state.pending or state.attrs.sender_id.history.has_changes() or state.attrs.channel.history.has_changes():
+        target.normalized_sender_phone = conversation_sender_phone(target)
+
+@event.listens_for(Lead, "before_insert")
+@event.listens_for(Lead, "before_update")
+def _normalize_lead_contact(mapper, connection, target):
+    state = inspect(target)
+    if state.pending or state.attrs.name.history.has_changes():
+        target.normalized_name = normalize_name(target.name)
+
+@event.listens_for(Conversation, "after_insert")
+@event.listens_for(Conversation, "after_update")
+@event.listens_for(Conversation, "after_delete")
+@event.listens_for(Lead, "after_insert")
+@event.listens_for(Lead, "after_update")
+@event.listens_for(Lead, "after_delete")
+def _mark_contacts_changed(mapper, connection, target):
+    # Flag the session; the index is dropped once the change is committed
+    Session.object_session(target).info["contacts_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("contacts_changed", False):
+        contact_directory.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("contacts_changed", None)
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Conversation, Message
+from ..utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("message_count", "inbound_count", "last_inbound_at", "last_outbound_at", "first_response_seconds")
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def record_message(conversation: Conversation, direction: str, sent_at: datetime, count: int = 1) -> None:
+    """Fold new messages into their conversation's counters, in the caller's transaction.
+
+    ``count`` messages in ``direction`` were added, the last one sent at ``sent_at``.
+    Counts are incremented in SQL on existing rows, so concurrent writers never lose
+    updates; call this once per conversation and direction before each flush.
+    """
+    inbound = direction == "inbound"
+
+    if conversation.id is None:
+        conversation.message_count = (conversation.message_count or 0) + count
+        conversation.inbound_count = (conversation.inbound_count or 0) + (count if inbound else 0)
+    else:
+        conversation.message_count = Conversation.message_count + count
+        if inbound:
+            conversation.inbound_count = Conversation.inbound_count + count
+
+    if inbound:
+        conversation.last_inbound_at = sent_at
+        return
+    conversation.last_outbound_at = sent_at
+    # Measured from the opening (inbound) message, which creates the conversation
+    if conversation.first_response_seconds is None and conversation.created_at is not None:
+        elapsed = _naive_utc(sent_at) - _naive_utc(conversation.created_at)
+        conversation.first_response_seconds = max(elapsed.total_seconds(), 0.0)
+
+class ConversationCounterReconciler:
+    """Recomputes conversation counters from the messages table and repairs drift.
+
+    Counters are maintained on write; this periodic pass catches writes that bypassed
+    ``record_message`` (imports, manual fixes, failed partial updates). Conversations
+    are scanned in id order, one batch and one grouped messages query at a time.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.conversations_checked = 0
+        self.conversations_repaired = 0
+
+    def _expected(self, db: Session, conversations: List[Conversation]) -> Dict[int, Dict[str, object]]:
+        is_inbound = Message.direction == "inbound"
+        is_outbound = Message.direction == "outbound"
+        rows = db.execute(
+            select(
+                Message.conversation_id,
+                func.count(Message.id),
+                func.sum(case((is_inbound, 1), else_=0)),
+                func.max(case((is_inbound, Message.sent_at))),
+                func.max(case((is_outbound, Message.sent_at))),
+                func.min(case((is_outbound, Message.sent_at))),
+            ).where(
+                Message.conversation_id.in_([conversation.id for conversation in conversations])
+            ).group_by(Message.conversation_id)
+        ).all()
+        by_id = {row[0]: row for row in rows}
+
+        expected = {}
+        for conversation in conversations:
+            _, total, inbound, last_inbound, last_outbound, first_outbound = by_id.get(
+                conversation.id, (conversation.id, 0, 0, None, None, None)
+            )
+            first_response = None
+            if first_outbound is not None and conversation.created_at is not None:
+                elapsed = _naive_utc(first_outbound) - _naive_utc(conversation.created_at)
+                first_response = max(elapsed.total_seconds(), 0.0)
+            expected[conversation.id] = {
+                "message_count": total,
+                "inbound_count": inbound or 0,
+                "last_inbound_at": last_inbound,
+                "last_outbound_at": last_outbound,
+                "first_response_seconds": first_response,
+            }
+        return expected
+
+    @staticmethod
+    def _differs(current, expected) -> bool:
+        if current is None or expected is None:
+            return current is not expected
+        if isinstance(expected, float):
+            return abs(current - expected) >= 1
+        if isinstance(expected, datetime):
+            return _naive_utc(current) != _naive_utc(expected)
+        return current != expected
+
+    def reconcile(self, db: Session) -> int:
+        """Repair every conversation whose counters disagree with its messages"""
+        repaired = 0
+        after_id = 0
+        while True:
+            conversations = db.scalars(
+                select(Conversation).where(Conversation.id > after_id).order_by(Conversation.id).limit(self.batch_size)
+            ).all()
+            if not conversations:
+                break
+            expected = self._expected(db, conversations)
+            for conversation in conversations:
+                values = expected[conversation.id]
+                if any(self._differs(getattr(conversation, field), values[field]) for field in COUNTER_FIELDS):
+                    for field, value in values.items():
+                        setattr(conversation, field, value)
+                    repaired += 1
+            db.commit()
+            self.conversations_checked += len(conversations)
+            after_id = conversations[-1].id
+
+        self.conversations_repaired += repaired
+        return repaired
+
+    def run(self) -> int:
+        with SessionLocal() as db:
+            repaired = self.reconcile(db)
+        self.last_run = datetime.utcnow()
+        if repaired:
+            logger.warning(f"Repaired counters on {repaired} conversations")
+        return repaired
+
+    async def start(self):
+        if self._task is not None or settings.counter_reconcile_interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(settings.counter_reconcile_interval_seconds)
+            try:
+                await asyncio.to_thread(self.run)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Conversation counter reconciliation failed: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "conversations_checked": self.conversations_checked,
+            "conversations_repaired": self.conversations_repaired,
+        }
+
+# Global counter reconciler, started and stopped with the application
+conversation_counter_reconciler = ConversationCounterReconciler()
+metrics_registry.register("conversation_counters", conversation_counter_reconciler.get_stats)
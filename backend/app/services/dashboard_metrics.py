@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..models import User, DailyConversationStats, DailyAgentStats, DailyLeadStats
+from .analytics_rollups import NULL_KEY
+
+def _key(value):
+    return None if value == NULL_KEY else value
+
+def dashboard_metrics(db: Session, start_date: datetime) -> Dict[str, Any]:
+    """Dashboard figures for the conversations and leads created since ``start_date``'s day.
+
+    Read from the daily rollups, one grouped query per rollup: conversation rows grouped
+    by (channel, status) carry their count and response-time sum and count, which fold
+    into the totals, both breakdowns and the average; lead rows grouped by status give
+    the total and the conversion funnel.
+    """
+    day = start_date.date()
+    conversations = func.sum(DailyConversationStats.conversations)
+    conversation_groups = db.execute(
+        select(
+            DailyConversationStats.channel,
+            DailyConversationStats.status,
+            conversations,
+            func.sum(DailyConversationStats.response_seconds),
+            func.sum(DailyConversationStats.responded)
+        ).where(
+            DailyConversationStats.day >= day
+        ).group_by(DailyConversationStats.channel, DailyConversationStats.status).having(conversations != 0)
+    ).all()
+
+    leads = func.sum(DailyLeadStats.leads)
+    leads_by_status = {
+        _key(status): count
+        for status, count in db.execute(
+            select(DailyLeadStats.status, leads).where(
+                DailyLeadStats.day >= day
+            ).group_by(DailyLeadStats.status).having(leads != 0)
+        ).all()
+    }
+
+    total_conversations = 0
+    conversations_by_channel: Dict[Any, int] = {}
+    conversations_by_status: Dict[Any, int] = {}
+    response_seconds = 0.0
+    responded = 0
+    for channel, status, count, response_sum, response_count in conversation_groups:
+        channel, status = _key(channel), _key(status)
+        total_conversations += count
+        conversations_by_channel[channel] = conversations_by_channel.get(channel, 0) + count
+        conversations_by_status[status] = conversations_by_status.get(status, 0) + count
+        response_seconds += response_sum or 0
+        responded += response_count or 0
+    total_leads = sum(leads_by_status.values())
+
+    # Average first response time, from the per-conversation counters
+    avg_response_time = response_seconds / responded if responded else None
+
+    return {
+        "total_conversations": total_conversations,
+        "conversations_by_channel": conversations_by_channel,
+        "conversations_by_status": conversations_by_status,
+        "total_leads": total_leads,
+        "leads_by_status": leads_by_status,
+        "avg_response_time_hours": avg_response_time / 3600 if avg_response_time else 0,
+        "conversion_funnel": {
+            "conversations": total_conversations,
+            "leads": total_leads,
+            "qualified_leads": leads_by_status.get("qualified", 0),
+            "converted": leads_by_status.get("converted", 0)
+        }
+    }
+
+def agent_performance(db: Session) -> List[Dict[str, Any]]:
+    """Conversations handled and average lead score per agent, from the daily agent rollups"""
+    conversations = func.sum(DailyAgentStats.conversations)
+    rows = db.execute(
+        select(
+            User.full_name,
+            conversations,
+            func.sum(DailyAgentStats.lead_score_sum),
+            func.sum(DailyAgentStats.scored)
+        ).join(User, User.id == DailyAgentStats.agent_id).group_by(User.id, User.full_name).having(conversations > 0)
+    ).all()
+
+    return [
+        {
+            "agent": full_name,
+            "conversations_handled": handled,
+            "avg_lead_score": float(score_sum / scored) if scored and score_sum else 0.0
+        } for full_name, handled, score_sum, scored in rows
+    ]
@@ -0,0 +1,215 @@
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.mime.text import MIMEText
+from string import Template
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+from .notification_transports import BatchSendError, NotificationJob, Recipient
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmailTemplate:
+    """A notification email rendered once and personalized per recipient"""
+
+    def __init__(self, subject: str, message: str, reference_id: Optional[int] = None):
+        # Escape '$' in the notification text so only our placeholder is substituted
+        body = f"Hi $full_name,\n\n{message.replace('$', '$$')}\n\nPlease log in to OmniLead to view details."
+        if reference_id:
+            body += f"\n\nReference ID: {reference_id}"
+        self.subject = subject
+        self._body = Template(body)
+
+    def render(self, recipient: Recipient) -> str:
+        return self._body.safe_substitute(full_name=recipient.full_name or recipient.email)
+
+    @classmethod
+    def from_job(cls, job: NotificationJob) -> "EmailTemplate":
+        return cls(job.subject, job.message, job.reference_id)
+
+def group_jobs_by_template(jobs: List[NotificationJob]) -> List[Tuple[EmailTemplate, List[NotificationJob]]]:
+    """Group a batch so each distinct notification is rendered only once"""
+    groups: Dict[Tuple[str, str, Optional[int]], List[NotificationJob]] = {}
+    for job in jobs:
+        groups.setdefault((job.subject, job.message, job.reference_id), []).append(job)
+    return [(EmailTemplate.from_job(group[0]), group) for group in groups.values()]
+
+class SMTPConnectionPool:
+    """Pool of persistent, keep-alive SMTP connections.
+
+    Connections are opened lazily up to ``size``, reused across sends, probed with NOOP
+    when they have been idle longer than ``keepalive_seconds`` and replaced when the
+    server has dropped them.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        size: int = 4,
+        keepalive_seconds: float = 60,
+        timeout: float = 30
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        connection.ehlo()
+        if self.use_tls:
+            connection.starttls()
+            connection.ehlo()
+        if self.username:
+            connection.login(self.username, self.password or "")
+        self.opened += 1
+        return connection
+
+    def _is_alive(self, connection: smtplib.SMTP) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except OSError:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """Check out a live connection; it is returned to the pool unless it failed"""
+        self._slots.acquire()
+        try:
+            try:
+                connection, last_used = self._idle.get_nowait()
+                if time.monotonic() - last_used > self.keepalive_seconds and not self._is_alive(connection):
+                    self._close(connection)
+                    connection = self._connect()
+            except queue.Empty:
+                connection = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        try:
+            yield connection
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server answered, so the connection itself is still usable
+            self._idle.put((connection, time.monotonic()))
+            raise
+        except OSError:
+            # Disconnects and socket errors (SMTPException is an OSError too)
+            self._close(connection)
+            raise
+        else:
+            self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _close(self, connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+class SMTPEmailTransport:
+    """Email transport sending over pooled SMTP connections, batching when possible"""
+
+    def __init__(self, pool: SMTPConnectionPool, from_address: str):
+        self.pool = pool
+        self.from_address = from_address
+        self.enabled = True
+
+    def send(self, job: NotificationJob):
+        self.send_batch([job])
+
+    def send_batch(self, jobs: List[NotificationJob]):
+        """Send many emails over a single checked-out connection"""
+        delivered = set()
+        try:
+            with self.pool.connection() as connection:
+                for template, group in group_jobs_by_template(jobs):
+                    for job in group:
+                        msg = MIMEText(template.render(job.recipient), "plain")
+                        msg["From"] = self.from_address
+                        msg["To"] = job.recipient.email
+                        msg["Subject"] = template.subject
+                        connection.sendmail(self.from_address, [job.recipient.email], msg.as_string())
+                        delivered.add(id(job))
+        except Exception as e:
+            raise BatchSendError([job for job in jobs if id(job) not in delivered], e) from e
+
+    def close(self):
+        self.pool.close()
+
+class SendGridEmailTransport:
+    """Email transport using SendGrid's batched v3 mail API (one request per template)"""
+
+    # SendGrid accepts up to 1000 personalizations per request
+    MAX_PERSONALIZATIONS = 1000
+
+    def __init__(self, api_key: str, from_address: str):
+        from sendgrid import SendGridAPIClient
+        self.client = SendGridAPIClient(api_key)
+        self.from_address = from_address
+        self.enabled = True
+
+    def send(self, job: NotificationJob):
+        self.send_batch([job])
+
+    def send_batch(self, jobs: List[NotificationJob]):
+        from sendgrid.helpers.mail import Mail, Personalization, To, Substitution
+
+        delivered = set()
+        try:
+            for template, group in group_jobs_by_template(jobs):
+                for start in range(0, len(group), self.MAX_PERSONALIZATIONS):
+                    chunk = group[start:start + self.MAX_PERSONALIZATIONS]
+                    mail = Mail(from_email=self.from_address, subject=template.subject)
+                    mail.add_content(template.render(Recipient(id=0, email="", full_name="-full_name-")), "text/plain")
+                    for job in chunk:
+                        personalization = Personalization()
+                        personalization.add_to(To(job.recipient.email))
+                        personalization.add_substitution(
+                            Substitution("-full_name-", job.recipient.full_name or job.recipient.email)
+                        )
+                        mail.add_personalization(personalization)
+                    self.client.send(mail)
+                    delivered.update(id(job) for job in chunk)
+        except Exception as e:
+            raise BatchSendError([job for job in jobs if id(job) not in delivered], e) from e
+
+def build_email_transport():
+    """SMTP pool when SMTP is configured, otherwise SendGrid, otherwise None"""
+    if settings.smtp_host:
+        pool = SMTPConnectionPool(
+            host=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            size=settings.smtp_pool_size,
+            keepalive_seconds=settings.smtp_keepalive_seconds
+        )
+        return SMTPEmailTransport(pool, settings.email_from_address)
+    if settings.sendgrid_api_key:
+        return SendGridEmailTransport(settings.sendgrid_api_key, settings.email_from_address)
+    return None
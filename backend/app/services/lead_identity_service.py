@@ -0,0 +1,168 @@
+from typing import Dict, Any, Optional, List
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from ..models import Lead, Conversation, AnalyticsEvent
+from ..utils.identity import normalize_phone, normalize_email
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields that are filled from a newer extraction only when the existing lead has no value
+MERGEABLE_FIELDS = ["name", "phone", "email", "program_interest", "assigned_to"]
+
+class LeadIdentityService:
+    """Resolves extracted contact details to a single lead across channels"""
+
+    def find_existing_lead(self, db: Session, normalized_phone: Optional[str], normalized_email: Optional[str]) -> Optional[Lead]:
+        """Find the oldest lead matching either identity key"""
+        conditions = []
+        if normalized_phone:
+            conditions.append(Lead.normalized_phone == normalized_phone)
+        if normalized_email:
+            conditions.append(Lead.normalized_email == normalized_email)
+        if not conditions:
+            return None
+
+        return db.query(Lead).filter(or_(*conditions)).order_by(Lead.id).first()
+
+    def resolve_lead(self, db: Session, lead_info: Dict[str, Any], conversation: Conversation) -> Lead:
+        """Merge extracted lead info into an existing lead or create a new one.
+
+        The caller owns the transaction; the lead is added and flushed but not committed.
+        """
+        normalized_phone = normalize_phone(lead_info.get("phone"))
+        normalized_email = normalize_email(lead_info.get("email"))
+
+        lead = self.find_existing_lead(db, normalized_phone, normalized_email)
+        if lead is None:
+            # Repeat messages in one conversation belong to the same person even without contact details
+            lead = db.query(Lead).filter(Lead.conversation_id == conversation.id).order_by(Lead.id).first()
+        if lead is None:
+            lead = Lead(
+                conversation_id=conversation.id,
+                name=lead_info.get("name"),
+                phone=lead_info.get("phone"),
+                email=lead_info.get("email"),
+                normalized_phone=normalized_phone,
+                normalized_email=normalized_email,
+                program_interest=lead_info.get("program_interest"),
+                score=conversation.lead_score
+            )
+            db.add(lead)
+        else:
+            self._merge_values(lead, {
+                "name": lead_info.get("name"),
+                "phone": lead_info.get("phone"),
+                "email": lead_info.get("email"),
+                "program_interest": lead_info.get("program_interest"),
+                "score": conversation.lead_score,
+            })
+
+        db.flush()
+        return lead
+
+    def merge_duplicate_leads(self, db: Session, batch_size: int = 500) -> int:
+        """Batch-merge historical duplicate leads into the oldest matching lead.
+
+        Leads sharing a normalized phone or email (directly or transitively) are folded
+        into the lowest lead ID. Returns the number of duplicate leads removed.
+        """
+        self._backfill_identity_keys(db, batch_size)
+
+        survivor_by_key: Dict[str, int] = {}
+        parent: Dict[int, int] = {}
+
+        def find(lead_id: int) -> int:
+            while parent[lead_id] != lead_id:
+                parent[lead_id] = parent[parent[lead_id]]
+                lead_id = parent[lead_id]
+            return lead_id
+
+        def union(a: int, b: int):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                # Lowest ID (the oldest lead) always survives
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        rows = db.query(Lead.id, Lead.normalized_phone, Lead.normalized_email).filter(
+            or_(Lead.normalized_phone.isnot(None), Lead.normalized_email.isnot(None))
+        ).order_by(Lead.id).yield_per(batch_size)
+
+        for lead_id, phone_key, email_key in rows:
+            parent.setdefault(lead_id, lead_id)
+            for key in (f"phone:{phone_key}" if phone_key else None,
+                        f"email:{email_key}" if email_key else None):
+                if key is None:
+                    continue
+                if key in survivor_by_key:
+                    union(survivor_by_key[key], lead_id)
+                else:
+                    survivor_by_key[key] = lead_id
+
+        groups: Dict[int, List[int]] = {}
+        for lead_id in parent:
+            root = find(lead_id)
+            if root != lead_id:
+                groups.setdefault(root, []).append(lead_id)
+
+        merged = 0
+        for survivor_id, duplicate_ids in groups.items():
+            survivor = db.get(Lead, survivor_id)
+            for start in range(0, len(duplicate_ids), batch_size):
+                chunk = duplicate_ids[start:start + batch_size]
+                duplicates = db.query(Lead).filter(Lead.id.in_(chunk)).order_by(Lead.id).all()
+                for duplicate in duplicates:
+                    self._merge_lead(survivor, duplicate)
+                    db.delete(duplicate)
+                db.query(AnalyticsEvent).filter(AnalyticsEvent.lead_id.in_(chunk)).update(
+                    {AnalyticsEvent.lead_id: survivor_id}, synchronize_session=False
+                )
+                merged += len(duplicates)
+            db.commit()
+
+        logger.info(f"Merged {merged} duplicate leads into {len(groups)} leads")
+        return merged
+
+    def _backfill_identity_keys(self, db: Session, batch_size: int):
+        """Populate identity keys for leads created before identity resolution existed"""
+        last_id = 0
+        while True:
+            leads = db.query(Lead).filter(
+                Lead.id > last_id,
+                Lead.normalized_phone.is_(None),
+                Lead.normalized_email.is_(None),
+                or_(Lead.phone.isnot(None), Lead.email.isnot(None))
+            ).order_by(Lead.id).limit(batch_size).all()
+            if not leads:
+                break
+            for lead in leads:
+                lead.normalized_phone = normalize_phone(lead.phone)
+                lead.normalized_email = normalize_email(lead.email)
+            # Rows whose values cannot be normalized stay NULL, so page by ID
+            last_id = leads[-1].id
+            db.commit()
+
+    def _merge_lead(self, survivor: Lead, duplicate: Lead):
+        """Fold a duplicate lead into the surviving lead"""
+        values = {field: getattr(duplicate, field) for field in MERGEABLE_FIELDS}
+        values["score"] = duplicate.score
+        self._merge_values(survivor, values)
+
+        if duplicate.notes:
+            survivor.notes = f"{survivor.notes}\n{duplicate.notes}" if survivor.notes else duplicate.notes
+
+    def _merge_values(self, lead: Lead, values: Dict[str, Any]):
+        """Keep the highest score and fill fields the lead does not have yet"""
+        for field in MERGEABLE_FIELDS:
+            value = values.get(field)
+            if value and not getattr(lead, field):
+                setattr(lead, field, value)
+
+        score = values.get("score")
+        if score is not None and (lead.score is None or score > lead.score):
+            lead.score = score
+
+        if not lead.normalized_phone:
+            lead.normalized_phone = normalize_phone(lead.phone)
+        if not lead.normalized_email:
+            lead.normalized_email = normalize_email(lead.email)
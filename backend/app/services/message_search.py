@@ -0,0 +1,95 @@
+import re
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import Float, Integer, column, func, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from ..models import Conversation, Message
+from .auth_service import TokenPrincipal
+from ..utils.pagination import KeysetPagination
+
+# Must match the text search configuration of the messages.search_vector column
+SEARCH_CONFIG = "simple"
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# Roles that may search every conversation; others only see their own and unassigned ones
+UNRESTRICTED_ROLES = ("admin", "analyst")
+
+# SQLite FTS5 index kept in sync with messages by triggers (see models/conversation.py)
+messages_fts = table("messages_fts", column("rowid", Integer))
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+def fts5_query(query: str) -> str:
+    """Quote each word so user input is never parsed as FTS5 syntax (all words must match)"""
+    return " ".join(f'"{term}"' for term in _TERM.findall(query))
+
+class MessageSearch:
+    """Ranked full-text search over message content.
+
+    Results are ordered by relevance and paginated with a keyset cursor on
+    ``(relevance, message id)``. Each hit carries a highlighted snippet of the message.
+    """
+
+    def _postgres_statement(self, query: str) -> Tuple[Select, Any]:
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        tsquery = func.websearch_to_tsquery(config, query)
+        search_vector = literal_column("messages.search_vector")
+        rank = func.ts_rank_cd(search_vector, tsquery, type_=Float).label("relevance")
+        highlight = func.ts_headline(
+            config, Message.content, tsquery,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2"
+        ).label("highlight")
+        statement = select(Message.id, rank, highlight).where(search_vector.op("@@")(tsquery))
+        return statement, rank
+
+    def _sqlite_statement(self, query: str) -> Tuple[Select, Any]:
+        fts = literal_column("messages_fts")
+        # bm25() is lower for better matches, so it is negated to sort descending
+        rank = (-func.bm25(fts, type_=Float)).label("relevance")
+        highlight = func.snippet(fts, 0, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 16).label("highlight")
+        statement = select(Message.id, rank, highlight).select_from(messages_fts).join(
+            Message, Message.id == messages_fts.c.rowid
+        ).where(text("messages_fts MATCH :query").bindparams(query=fts5_query(query)))
+        return statement, rank
+
+    async def search(
+        self,
+        db: AsyncSession,
+        principal: TokenPrincipal,
+        query: str,
+        cursor: Optional[str],
+        limit: int,
+        channel: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """One page of hits for ``query`` visible to ``principal``, and the next page's cursor"""
+        if db.get_bind().dialect.name == "postgresql":
+            statement, rank = self._postgres_statement(query)
+        else:
+            if not fts5_query(query):
+                return [], None
+            statement, rank = self._sqlite_statement(query)
+
+        statement = statement.add_columns(
+            Message.conversation_id,
+            Message.direction,
+            Message.sent_at,
+            Conversation.channel,
+            Conversation.sender_name,
+        ).join(Conversation, Conversation.id == Message.conversation_id)
+
+        if channel:
+            statement = statement.where(Conversation.channel == channel)
+        if principal.role not in UNRESTRICTED_ROLES:
+            statement = statement.where(or_(
+                Conversation.assigned_to == principal.id,
+                Conversation.assigned_to.is_(None)
+            ))
+
+        pagination = KeysetPagination("rank", [rank, Message.id])
+        rows = (await db.execute(pagination.apply(statement, cursor, limit))).all()
+        return pagination.page(rows, limit)
+
+# Global message search
+message_search = MessageSearch()
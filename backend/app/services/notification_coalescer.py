@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+from ..utils.metrics import metrics_registry
+from .notification_transports import NotificationJob
+from .notification_dispatcher import NotificationDispatcher, notification_dispatcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Plural labels used when summarizing coalesced notifications
+CATEGORY_LABELS = {
+    "escalation": ("escalation", "escalations"),
+    "new_lead": ("high-value lead", "high-value leads"),
+    "missed_message": ("missed message", "missed messages"),
+}
+
+class _Bucket:
+    def __init__(self, window_ends: float):
+        self.window_ends = window_ends
+        self.jobs: List[NotificationJob] = []
+
+class NotificationCoalescer:
+    """Collapses bursts of notifications per recipient and channel into digests.
+
+    The first notification in a quiet period is delivered immediately and opens a window;
+    anything else for the same recipient/channel within the window is held back and sent
+    as a single digest when the window closes. Urgent notifications bypass the window.
+    """
+
+    def __init__(self, dispatcher: NotificationDispatcher, window_seconds: Optional[float] = None):
+        self.dispatcher = dispatcher
+        self.window_seconds = window_seconds if window_seconds is not None else settings.notification_digest_window_seconds
+        self._buckets: Dict[Tuple[int, str], _Bucket] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.coalesced = 0
+        self.digests_sent = 0
+        self.digests_dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running or self.window_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and deliver anything still held back"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        for job in self.flush_due(force=True):
+            self._dispatch(job)
+
+    def submit(self, job: NotificationJob, urgent: bool = False) -> bool:
+        """Offer a job to the coalescer.
+
+        Returns True if the job was absorbed into a pending digest, False if the caller
+        should deliver it right away.
+        """
+        if not self.running or urgent:
+            return False
+
+        key = (job.recipient.id, job.channel)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = _Bucket(now + self.window_seconds)
+                return False
+            bucket.jobs.append(job)
+            self.coalesced += 1
+            return True
+
+    def flush_due(self, force: bool = False) -> List[NotificationJob]:
+        """Build digests for every window that has closed"""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for key, bucket in list(self._buckets.items()):
+                if not force and bucket.window_ends > now:
+                    continue
+                if bucket.jobs:
+                    ready.append(self._build_digest(bucket.jobs))
+                    # Keep coalescing while the burst continues
+                    self._buckets[key] = _Bucket(now + self.window_seconds)
+                else:
+                    del self._buckets[key]
+        self.digests_sent += len(ready)
+        return ready
+
+    def _build_digest(self, jobs: List[NotificationJob]) -> NotificationJob:
+        if len(jobs) == 1:
+            return jobs[0]
+
+        counts = Counter(job.category for job in jobs)
+        parts = []
+        for category, count in counts.most_common():
+            singular, plural = CATEGORY_LABELS.get(category, ("notification", "notifications"))
+            parts.append(f"{count} {singular if count == 1 else plural}")
+
+        minutes = max(1, round(self.window_seconds / 60))
+        period = "minute" if minutes == 1 else f"{minutes} minutes"
+        summary = f"{', '.join(parts)} in the last {period}"
+
+        first = jobs[0]
+        return NotificationJob(
+            channel=first.channel,
+            recipient=first.recipient,
+            subject=f"OmniLead digest: {summary}",
+            message=summary,
+            reference_id=None,
+            category="digest"
+        )
+
+    async def _flush_loop(self):
+        interval = min(1.0, self.window_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            for job in self.flush_due():
+                self._dispatch(job)
+
+    def _dispatch(self, job: NotificationJob):
+        if self.dispatcher.enqueue(job):
+            return
+        # Dispatcher stopped or not serving the channel; held-back notifications are lost
+        self.digests_dropped += 1
+        logger.warning(
+            f"Dropped {job.channel} digest for recipient {job.recipient.id}: dispatcher is not accepting jobs"
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "coalesced": self.coalesced,
+            "digests_sent": self.digests_sent,
+            "digests_dropped": self.digests_dropped,
+            "open_windows": len(self._buckets),
+        }
+
+# Global coalescer instance, started and stopped with the application
+notification_coalescer = NotificationCoalescer(notification_dispatcher)
+metrics_registry.register("notification_digest", notification_coalescer.get_stats)
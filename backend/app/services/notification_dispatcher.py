@@ -0,0 +1,228 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from ..utils.metrics import metrics_registry
+from .notification_transports import BatchSendError, NotificationJob, CHANNELS, PUSH, EMAIL, SMS
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChannelMetrics:
+    """Throughput and latency counters for one notification channel"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.total_latency = 0.0  # enqueue -> delivered, seconds
+        self.max_latency = 0.0
+        self.total_send_time = 0.0  # time spent inside the provider call, seconds
+        self.started_at = time.monotonic()
+
+    def record_sent(self, latency: float, send_time: float):
+        self.sent += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_send_time += send_time
+
+    def snapshot(self, queue_depth: int) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "queue_depth": queue_depth,
+            "throughput_per_second": self.sent / elapsed,
+            "avg_latency_ms": (self.total_latency / self.sent * 1000) if self.sent else 0.0,
+            "max_latency_ms": self.max_latency * 1000,
+            "avg_send_ms": (self.total_send_time / self.sent * 1000) if self.sent else 0.0,
+        }
+
+class NotificationDispatcher:
+    """Fans notifications out over bounded, per-channel worker pools.
+
+    Each channel (push, email, SMS) gets its own queue, its own worker coroutines and its
+    own thread pool for the blocking provider SDKs, so a slow provider cannot starve the
+    others and enqueueing never blocks the request that triggered the notification.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[Dict[str, int]] = None,
+        queue_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.workers = workers or {
+            PUSH: settings.notification_push_workers,
+            EMAIL: settings.notification_email_workers,
+            SMS: settings.notification_sms_workers,
+        }
+        self.queue_size = queue_size if queue_size is not None else settings.notification_queue_size
+        self.max_retries = max_retries if max_retries is not None else settings.notification_max_retries
+        self.retry_backoff = retry_backoff if retry_backoff is not None else settings.notification_retry_backoff_seconds
+        # Transports exposing send_batch() get up to this many queued jobs per call
+        self.batch_size = batch_size if batch_size is not None else settings.email_batch_size
+
+        self.transports: Dict[str, Any] = {}
+        self.metrics: Dict[str, ChannelMetrics] = {channel: ChannelMetrics() for channel in CHANNELS}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._pending_retries = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self, transports: Dict[str, Any]):
+        """Start the worker pools on the current event loop"""
+        if self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self.transports = transports
+        for channel, transport in transports.items():
+            pool_size = max(1, self.workers.get(channel, 1))
+            self._queues[channel] = asyncio.Queue(maxsize=self.queue_size)
+            self._executors[channel] = ThreadPoolExecutor(
+                max_workers=pool_size, thread_name_prefix=f"notify-{channel}"
+            )
+            self.metrics.setdefault(channel, ChannelMetrics())
+            for _ in range(pool_size):
+                self._tasks.append(asyncio.create_task(self._worker(channel)))
+
+        logger.info(f"Notification dispatcher started with workers {self.workers}")
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain queued notifications (up to ``timeout`` seconds) and stop the workers"""
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Notification dispatcher stopped with undelivered notifications")
+
+        if self._pending_retries:
+            logger.warning(f"Dropping {len(self._pending_retries)} notifications waiting for retry")
+        for task in [*self._pending_retries, *self._tasks]:
+            task.cancel()
+        await asyncio.gather(*self._pending_retries, *self._tasks, return_exceptions=True)
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        for transport in self.transports.values():
+            if hasattr(transport, "close"):
+                transport.close()
+
+        self._tasks = []
+        self._queues = {}
+        self._executors = {}
+        self._pending_retries = set()
+        self._loop = None
+
+    def enqueue(self, job: NotificationJob) -> bool:
+        """Fire-and-forget enqueue; safe to call from the event loop or any thread.
+
+        Returns False when the dispatcher is not running or has no transport for the
+        channel, so callers can fall back to sending inline.
+        """
+        if not self.running or job.channel not in self._queues:
+            return False
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._put(job)
+        else:
+            self._loop.call_soon_threadsafe(self._put, job)
+        return True
+
+    def _put(self, job: NotificationJob):
+        metrics = self.metrics[job.channel]
+        try:
+            self._queues[job.channel].put_nowait(job)
+            metrics.enqueued += 1
+        except asyncio.QueueFull:
+            metrics.dropped += 1
+            logger.warning(f"Notification queue full for {job.channel}; dropping notification")
+
+    async def _retry_later(self, delay: float, job: NotificationJob):
+        await asyncio.sleep(delay)
+        self._put(job)
+
+    async def _worker(self, channel: str):
+        queue = self._queues[channel]
+        executor = self._executors[channel]
+        transport = self.transports[channel]
+        metrics = self.metrics[channel]
+        can_batch = hasattr(transport, "send_batch") and self.batch_size > 1
+
+        while True:
+            batch = [await queue.get()]
+            if can_batch:
+                while len(batch) < self.batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+            try:
+                send_started = time.monotonic()
+                failed: List[NotificationJob] = []
+                error: Optional[Exception] = None
+                try:
+                    if len(batch) > 1:
+                        await self._loop.run_in_executor(executor, transport.send_batch, batch)
+                    else:
+                        await self._loop.run_in_executor(executor, transport.send, batch[0])
+                except BatchSendError as e:
+                    # Jobs delivered before the failure must not be sent again
+                    failed, error = e.failed, e.error
+                except Exception as e:
+                    failed, error = batch, e
+
+                finished = time.monotonic()
+                failed_ids = {id(job) for job in failed}
+                for job in batch:
+                    if id(job) in failed_ids:
+                        self._retry_or_fail(channel, job, error)
+                    else:
+                        metrics.record_sent(finished - job.enqueued_at, (finished - send_started) / len(batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _retry_or_fail(self, channel: str, job: NotificationJob, error: Exception):
+        metrics = self.metrics[channel]
+        job.attempts += 1
+        if job.attempts <= self.max_retries:
+            metrics.retried += 1
+            delay = self.retry_backoff * (2 ** (job.attempts - 1))
+            retry = asyncio.create_task(self._retry_later(delay, job))
+            self._pending_retries.add(retry)
+            retry.add_done_callback(self._pending_retries.discard)
+        else:
+            metrics.failed += 1
+            logger.error(f"{channel} notification failed after {job.attempts} attempts: {error}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-channel throughput/latency snapshot"""
+        return {
+            channel: metrics.snapshot(self._queues[channel].qsize() if channel in self._queues else 0)
+            for channel, metrics in self.metrics.items()
+        }
+
+# Global dispatcher instance, started and stopped with the application
+notification_dispatcher = NotificationDispatcher()
+metrics_registry.register("notifications", notification_dispatcher.get_metrics)
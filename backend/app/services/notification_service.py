@@ -1,129 +1,124 @@
-import firebase_admin
-from firebase_admin import messaging, credentials
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from twilio.rest import Client
-from typing import List
+import threading
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 from ..models import User, Conversation
-from ..config import settings
+from .notification_transports import NotificationJob, Recipient, PUSH, EMAIL, SMS, default_transports
+from .notification_dispatcher import NotificationDispatcher, notification_dispatcher
+from .recipient_directory import RecipientDirectory, recipient_directory
+from .notification_coalescer import NotificationCoalescer, notification_coalescer
+
+# Escalations matching these are delivered immediately instead of being folded into a digest
+URGENT_INTENTS = ["urgent"]
+URGENT_SENTIMENT = -0.8
 
 class NotificationService:
-    def __init__(self):
-        # Initialize Firebase for push notifications
-        if settings.firebase_server_key:
-            try:
-                cred = credentials.Certificate(settings.firebase_server_key)
-                firebase_admin.initialize_app(cred)
-            except:
-                pass
-
-        # Initialize Twilio for SMS
-        if settings.twilio_account_sid and settings.twilio_auth_token:
-            self.twilio_client = Client(
-                settings.twilio_account_sid,
-                settings.twilio_auth_token
-            )
-        else:
-            self.twilio_client = None
-
-    def send_escalation_notification(self, conversation: Conversation, db: Session):
+    def __init__(
+        self,
+        dispatcher: Optional[NotificationDispatcher] = None,
+        directory: Optional[RecipientDirectory] = None,
+        coalescer: Optional[NotificationCoalescer] = None
+    ):
+        # Provider transports (Firebase push, SendGrid email, Twilio SMS) used for inline sends,
+        # built on the first inline send and closed by close()
+        self.transports: Optional[Dict[str, Any]] = None
+        self._transports_lock = threading.Lock()
+
+        # Notifications are handed to the dispatcher's worker pools when it is running
+        self.dispatcher = dispatcher or notification_dispatcher
+
+        # Cached role -> active users lookup, so fan-out does not query the users table
+        self.directory = directory or recipient_directory
+
+        # Collapses bursts per recipient/channel into digests
+        self.coalescer = coalescer or notification_coalescer
+
+    def send_escalation_notification(self, conversation: Conversation, db: Session, urgent: Optional[bool] = None):
         """Send notifications when conversation needs human attention"""
         # Get users who should be notified (based on role and availability)
-        users_to_notify = db.query(User).filter(
-            User.role.in_(["admin", "sales", "counselor"]),
-            User.is_active == True
-        ).all()
+        users_to_notify = self.directory.get_recipients(db, ["admin", "sales", "counselor"])
 
         message = f"New escalated conversation from {conversation.sender_name} ({conversation.channel})"
+        if urgent is None:
+            urgent = self._is_urgent(conversation)
 
         for user in users_to_notify:
-            self._send_push_notification(user, message, conversation.id)
-            self._send_email_notification(user, "Escalated Conversation", message, conversation)
-            self._send_sms_notification(user, message)
+            self._send_push_notification(user, message, conversation.id, category="escalation", urgent=urgent)
+            self._send_email_notification(user, "Escalated Conversation", message, conversation,
+                                          category="escalation", urgent=urgent)
+            self._send_sms_notification(user, message, category="escalation", urgent=urgent)
 
     def send_new_lead_notification(self, lead, db: Session):
         """Send notifications for new high-value leads"""
         if lead.score >= 0.7:
-            users_to_notify = db.query(User).filter(
-                User.role.in_(["admin", "sales"]),
-                User.is_active == True
-            ).all()
+            users_to_notify = self.directory.get_recipients(db, ["admin", "sales"])
 
             message = f"High-value lead: {lead.name} - Score: {lead.score:.2f}"
 
             for user in users_to_notify:
-                self._send_push_notification(user, message, lead.id)
-                self._send_email_notification(user, "New High-Value Lead", message, lead)
+                self._send_push_notification(user, message, lead.id, category="new_lead")
+                self._send_email_notification(user, "New High-Value Lead", message, lead, category="new_lead")
 
     def send_missed_message_notification(self, conversation: Conversation, db: Session):
         """Send notifications for missed messages"""
-        users_to_notify = db.query(User).filter(
-            User.role.in_(["admin", "sales", "counselor"]),
-            User.is_active == True
-        ).all()
+        users_to_notify = self.directory.get_recipients(db, ["admin", "sales", "counselor"])
 
         message = f"Missed message from {conversation.sender_name} ({conversation.channel})"
 
         for user in users_to_notify:
-            self._send_push_notification(user, message, conversation.id)
+            self._send_push_notification(user, message, conversation.id, category="missed_message")
 
-    def _send_push_notification(self, user: User, message: str, reference_id: int):
-        """Send push notification via Firebase"""
-        try:
-            if not hasattr(firebase_admin, '_apps') or not firebase_admin._apps:
-                return
+    def _is_urgent(self, conversation: Conversation) -> bool:
+        """Urgent escalations skip digest coalescing"""
+        return (conversation.intent in URGENT_INTENTS or
+                (conversation.sentiment or 0.0) <= URGENT_SENTIMENT)
 
-            # This would require storing FCM tokens for users
-            # For now, we'll skip the actual implementation
-            print(f"Push notification to {user.email}: {message}")
-        except Exception as e:
-            print(f"Push notification error: {e}")
+    def _send_push_notification(self, user: User, message: str, reference_id: int,
+                                category: Optional[str] = None, urgent: bool = False):
+        """Send push notification via Firebase"""
+        self._deliver(NotificationJob(PUSH, user, message, message, reference_id, category), urgent)
 
-    def _send_email_notification(self, user: User, subject: str, message: str, reference=None):
+    def _send_email_notification(self, user: User, subject: str, message: str, reference=None,
+                                 category: Optional[str] = None, urgent: bool = False):
         """Send email notification via SendGrid"""
-        try:
-            if not settings.sendgrid_api_key:
-                return
-
-            # SendGrid implementation would go here
-            # For now, using SMTP as fallback
-            msg = MIMEMultipart()
-            msg['From'] = "noreply@omnilead.com"
-            msg['To'] = user.email
-            msg['Subject'] = subject
-
-            body = f"""
-            {message}
+        reference_id = reference.id if reference is not None else None
+        self._deliver(NotificationJob(EMAIL, user, subject, message, reference_id, category), urgent)
 
-            Please log in to OmniLead to view details.
-            """
-
-            if reference:
-                body += f"\n\nReference ID: {reference.id}"
-
-            msg.attach(MIMEText(body, 'plain'))
-
-            # This would need SMTP server configuration
-            print(f"Email notification to {user.email}: {subject}")
-        except Exception as e:
-            print(f"Email notification error: {e}")
-
-    def _send_sms_notification(self, user: User, message: str):
+    def _send_sms_notification(self, user: User, message: str,
+                               category: Optional[str] = None, urgent: bool = False):
         """Send SMS notification via Twilio"""
-        try:
-            if not self.twilio_client or not settings.twilio_phone_number:
-                return
+        self._deliver(NotificationJob(SMS, user, message, message, None, category), urgent)
+
+    def _deliver(self, job: NotificationJob, urgent: bool = False):
+        """Coalesce, then enqueue on the dispatcher (fire-and-forget) or send inline when it is not running"""
+        job.recipient = Recipient.from_user(job.recipient)
+        if not job.recipient.accepts(job.channel):
+            return
+        if self.coalescer.submit(job, urgent):
+            return
+        if self.dispatcher.enqueue(job):
+            return
 
-            # This would require storing phone numbers for users
-            # For now, we'll skip
-            print(f"SMS notification: {message}")
+        try:
+            self._get_transports()[job.channel].send(job)
         except Exception as e:
-            print(f"SMS notification error: {e}")
+            print(f"{job.channel.capitalize()} notification error: {e}")
+
+    def _get_transports(self) -> Dict[str, Any]:
+        with self._transports_lock:
+            if self.transports is None:
+                self.transports = default_transports()
+            return self.transports
+
+    def close(self):
+        """Close the inline transports (e.g. the SMTP connection pool), if any were built"""
+        with self._transports_lock:
+            transports, self.transports = self.transports, None
+        for transport in (transports or {}).values():
+            if hasattr(transport, "close"):
+                transport.close()
 
     def send_bulk_notification(self, users: List[User], title: str, message: str):
         """Send bulk notifications to multiple users"""
         for user in users:
             self._send_push_notification(user, message, 0)
-            self._send_email_notification(user, title, message)
\ No newline at end of file
+            self._send_email_notification(user, title, message)
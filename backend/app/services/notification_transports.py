@@ -0,0 +1,164 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PUSH = "push"
+EMAIL = "email"
+SMS = "sms"
+CHANNELS = (PUSH, EMAIL, SMS)
+
+@dataclass(frozen=True)
+class Recipient:
+    """Detached snapshot of a user, safe to hand to worker threads after the session closes"""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    role: Optional[str] = None
+    phone_number: Optional[str] = None
+    device_token: Optional[str] = None
+    channels: FrozenSet[str] = frozenset(CHANNELS)
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Recipient":
+        if isinstance(user, cls):
+            return user
+        channels = getattr(user, "notification_channels", None)
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            phone_number=getattr(user, "phone_number", None),
+            device_token=getattr(user, "device_token", None),
+            channels=frozenset(c.strip() for c in channels.split(",") if c.strip()) if channels is not None else frozenset(CHANNELS)
+        )
+
+    def accepts(self, channel: str) -> bool:
+        """Whether the user has opted in to notifications on this channel"""
+        return channel in self.channels
+
+@dataclass
+class NotificationJob:
+    """A single notification to deliver to one recipient over one channel"""
+    channel: str
+    recipient: Recipient
+    subject: str
+    message: str
+    reference_id: Optional[int] = None
+    category: Optional[str] = None  # escalation, new_lead, missed_message, digest
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class BatchSendError(Exception):
+    """A batch send that stopped partway; only the jobs in ``failed`` were not delivered"""
+
+    def __init__(self, failed: List[NotificationJob], error: Exception):
+        super().__init__(str(error))
+        self.failed = failed
+        self.error = error
+
+class PushTransport:
+    """Push notifications via Firebase Cloud Messaging"""
+
+    def __init__(self):
+        self.enabled = False
+        if settings.firebase_server_key:
+            try:
+                import firebase_admin
+                from firebase_admin import credentials
+                if not firebase_admin._apps:
+                    firebase_admin.initialize_app(credentials.Certificate(settings.firebase_server_key))
+                self.enabled = True
+            except Exception as e:
+                logger.error(f"Failed to initialize Firebase: {e}")
+
+    def send(self, job: NotificationJob):
+        if not self.enabled or not job.recipient.device_token:
+            return
+
+        from firebase_admin import messaging
+        messaging.send(messaging.Message(
+            token=job.recipient.device_token,
+            notification=messaging.Notification(title=job.subject, body=job.message),
+            data={"reference_id": str(job.reference_id or "")}
+        ))
+
+class EmailTransport:
+    """Email notifications over pooled SMTP connections or SendGrid's batch API"""
+
+    def __init__(self):
+        from .email_transport import build_email_transport
+        self.backend = build_email_transport()
+        self.enabled = self.backend is not None
+
+    def send(self, job: NotificationJob):
+        if not self.enabled:
+            return
+        self.backend.send(job)
+
+    def send_batch(self, jobs: List[NotificationJob]):
+        """Send several emails at once; the same notification is rendered only once.
+
+        Raises BatchSendError listing the undelivered jobs when sending stops partway.
+        """
+        if not self.enabled:
+            return
+        self.backend.send_batch(jobs)
+
+    def close(self):
+        if self.enabled and hasattr(self.backend, "close"):
+            self.backend.close()
+
+class SMSTransport:
+    """SMS notifications via Twilio"""
+
+    def __init__(self):
+        self.client = None
+        if settings.twilio_account_sid and settings.twilio_auth_token:
+            from twilio.rest import Client
+            self.client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+
+    def send(self, job: NotificationJob):
+        if not self.client or not settings.twilio_phone_number or not job.recipient.phone_number:
+            return
+
+        self.client.messages.create(
+            body=job.message,
+            from_=settings.twilio_phone_number,
+            to=job.recipient.phone_number
+        )
+
+class LocalTransport:
+    """In-memory stand-in transport for tests and benchmarks.
+
+    Records every delivered job, can simulate provider latency and can be told to fail
+    the first ``fail_times`` sends to exercise retries.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_times: int = 0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.sent: List[NotificationJob] = []
+        self._lock = threading.Lock()
+
+    def send(self, job: NotificationJob):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError("Simulated provider failure")
+            self.sent.append(job)
+
+def default_transports() -> Dict[str, Any]:
+    """Build the provider-backed transports for every channel"""
+    return {
+        PUSH: PushTransport(),
+        EMAIL: EmailTransport(),
+        SMS: SMSTransport(),
+    }
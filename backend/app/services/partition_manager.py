@@ -0,0 +1,178 @@
+import asyncio
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..utils.compliance import ComplianceManager, compliance_manager
+from ..utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> (partition key column, ComplianceManager retention policy)
+PARTITIONED_TABLES = {
+    "messages": ("sent_at", "messages"),
+    "analytics_events": ("timestamp", "analytics"),
+}
+
+# Arbitrary key for the advisory lock that keeps maintenance to one worker at a time
+MAINTENANCE_LOCK_ID = 7_320_041
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+def _partition_month(table: str, name: str) -> Optional[date]:
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+class PartitionManager:
+    """Maintains monthly range partitions of messages and analytics_events on PostgreSQL.
+
+    Partitions are created ``partition_months_ahead`` months in advance. Retention is
+    enforced by detaching and dropping whole partitions once their entire month is
+    older than the table's retention policy, instead of deleting rows. On other
+    databases (SQLite in development and tests) the tables are not partitioned and
+    maintenance does nothing; neither does it for PostgreSQL tables created plain by
+    ``create_all`` in development.
+    """
+
+    def __init__(self, compliance: Optional[ComplianceManager] = None, months_ahead: Optional[int] = None):
+        self.compliance = compliance or compliance_manager
+        self.months_ahead = months_ahead if months_ahead is not None else settings.partition_months_ahead
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self._unpartitioned: Set[str] = set()
+
+    def is_supported(self, db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    def partitioned_tables(self, db: Session) -> List[str]:
+        """The tables that really are partitioned; each one that is not is reported once"""
+        partitioned = set(db.execute(text("""
+            SELECT parent.relname FROM pg_partitioned_table
+            JOIN pg_class parent ON parent.oid = pg_partitioned_table.partrelid
+            WHERE parent.relname = ANY(:tables)
+        """), {"tables": list(PARTITIONED_TABLES)}).scalars())
+        for table in PARTITIONED_TABLES:
+            if table not in partitioned and table not in self._unpartitioned:
+                self._unpartitioned.add(table)
+                logger.warning(f"{table} is not a partitioned table, skipping partition maintenance for it")
+        return [table for table in PARTITIONED_TABLES if table in partitioned]
+
+    def list_partitions(self, db: Session, table: str) -> List[str]:
+        return list(db.execute(text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """), {"table": table}).scalars())
+
+    def ensure_partitions(
+        self, db: Session, today: Optional[date] = None, tables: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """Create this month's and the next ``months_ahead`` months' partitions"""
+        current = month_start(today or datetime.utcnow().date())
+        created = []
+        for table in tables if tables is not None else PARTITIONED_TABLES:
+            existing = set(self.list_partitions(db, table))
+            for offset in range(self.months_ahead + 1):
+                month = add_months(current, offset)
+                name = partition_name(table, month)
+                if name in existing:
+                    continue
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                    f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+                ))
+                created.append(name)
+        self.partitions_created += len(created)
+        return created
+
+    def drop_expired_partitions(
+        self, db: Session, today: Optional[date] = None, tables: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """Detach and drop partitions whose whole month is past the retention period"""
+        today = today or datetime.utcnow().date()
+        dropped = []
+        for table in tables if tables is not None else PARTITIONED_TABLES:
+            _, policy = PARTITIONED_TABLES[table]
+            retention_days = self.compliance.retention_policies.get(policy)
+            if retention_days is None:
+                continue
+            cutoff = today - timedelta(days=retention_days)
+            for name in self.list_partitions(db, table):
+                month = _partition_month(table, name)
+                if month is None or add_months(month, 1) > cutoff:
+                    continue
+                db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+        self.partitions_dropped += len(dropped)
+        return dropped
+
+    def run_maintenance(self) -> Dict[str, List[str]]:
+        """Create upcoming partitions and drop expired ones, unless another worker is at it"""
+        with SessionLocal() as db:
+            if not self.is_supported(db):
+                return {"created": [], "dropped": []}
+            if not db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}):
+                return {"created": [], "dropped": []}
+            tables = self.partitioned_tables(db)
+            result = {
+                "created": self.ensure_partitions(db, tables=tables),
+                "dropped": self.drop_expired_partitions(db, tables=tables),
+            }
+            db.commit()
+
+        self.last_run = datetime.utcnow()
+        if result["created"] or result["dropped"]:
+            logger.info(f"Partition maintenance: created {result['created']}, dropped {result['dropped']}")
+        return result
+
+    async def start(self):
+        if self._task is not None or settings.partition_maintenance_interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_maintenance)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(settings.partition_maintenance_interval_seconds)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+        }
+
+# Global partition manager, started and stopped with the application
+partition_manager = PartitionManager()
+metrics_registry.register("partitions", partition_manager.get_stats)
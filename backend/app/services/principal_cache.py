@@ -0,0 +1,232 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import User
+from ..utils.metrics import metrics_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns copied into the cached, session-independent User
+PRINCIPAL_FIELDS = ["id", "email", "full_name", "role", "is_active", "token_version", "created_at", "updated_at"]
+
+class PrincipalCache:
+    """Caches the authenticated user per bearer token.
+
+    Entries live for ``ttl_seconds`` but never beyond the token's own expiry. They are
+    dropped when the user is updated/deactivated/deleted, and the invalidation is
+    broadcast to other workers over Redis pub/sub.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.principal_cache_ttl_seconds
+        self.max_entries = max_entries if max_entries is not None else settings.principal_cache_max_entries
+        self._entries: Dict[str, Tuple[User, float]] = {}
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._token_versions: Dict[int, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._worker_id = uuid.uuid4().hex
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self._listening = False
+        self._remote_listeners: List[Callable[[Optional[int]], None]] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+        self.max_miss_time = 0.0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[User]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            self._discard(key, user.id)
+            return None
+        return user
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        """Cache a detached copy of ``user`` until the TTL or the token expiry, whichever is first"""
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        principal = User(**{field: getattr(user, field) for field in PRINCIPAL_FIELDS})
+        key = self._key(token)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (principal, expires_at)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+
+    def get_token_version(self, db: Session, user_id: int) -> Optional[int]:
+        """Current server-side token version for a user (None if the user is gone)"""
+        cached = self._token_versions.get(user_id)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+
+        version = db.query(User.token_version).filter(User.id == user_id).scalar()
+        if version is None and not db.query(User.id).filter(User.id == user_id).first():
+            return None
+        version = version or 0
+        self._token_versions[user_id] = (version, time.time() + self.ttl_seconds)
+        return version
+
+    def invalidate_user(self, user_id: int, broadcast: bool = True):
+        """Drop every cached token for a user (locally and, optionally, on other workers)"""
+        with self._lock:
+            self._token_versions.pop(user_id, None)
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+        self.invalidations += 1
+
+        if broadcast:
+            self._publish(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self._token_versions.clear()
+
+    def _discard(self, key: str, user_id: int):
+        with self._lock:
+            self._entries.pop(key, None)
+            keys = self._keys_by_user.get(user_id)
+            if keys:
+                keys.discard(key)
+
+    def _evict(self):
+        """Drop expired entries, then the oldest ones, to make room (lock held)"""
+        now = time.time()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        if not expired:
+            # Dicts keep insertion order, so the first tenth are the oldest entries
+            expired = list(self._entries)[:max(1, self.max_entries // 10)]
+        for key in expired:
+            user, _ = self._entries.pop(key)
+            keys = self._keys_by_user.get(user.id)
+            if keys:
+                keys.discard(key)
+
+    def record(self, hit: bool, elapsed: float):
+        """Record one authentication for hit-rate and latency metrics"""
+        if hit:
+            self.hits += 1
+            self.hit_time += elapsed
+        else:
+            self.misses += 1
+            self.miss_time += elapsed
+            self.max_miss_time = max(self.max_miss_time, elapsed)
+
+    def get_stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "avg_hit_ms": (self.hit_time / self.hits * 1000) if self.hits else 0.0,
+            "avg_miss_ms": (self.miss_time / self.misses * 1000) if self.misses else 0.0,
+            "max_miss_ms": self.max_miss_time * 1000,
+            "pubsub_enabled": self._listening,
+        }
+
+    # Cross-worker invalidation over Redis pub/sub
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1)
+        return self._redis
+
+    def on_remote_invalidation(self, callback: Callable[[Optional[int]], None]):
+        """Call ``callback(user_id)`` for user changes committed by other workers (None: any user)"""
+        self._remote_listeners.append(callback)
+
+    def publish_users_changed(self):
+        """Tell other workers users were added; there is no cached principal to drop"""
+        self._publish(None)
+
+    def _notify_remote(self, user_id: Optional[int]):
+        for callback in self._remote_listeners:
+            callback(user_id)
+
+    def _publish(self, user_id: Optional[int]):
+        if not settings.principal_cache_pubsub_enabled:
+            return
+        try:
+            self._get_redis().publish(
+                settings.principal_cache_channel,
+                json.dumps({"user_id": user_id, "origin": self._worker_id})
+            )
+        except Exception as e:
+            logger.warning(f"Could not broadcast principal invalidation: {e}")
+
+    def start_listener(self):
+        """Subscribe to invalidations published by other workers"""
+        if not settings.principal_cache_pubsub_enabled or self._listener is not None:
+            return
+        self._listening = True
+        self._listener = threading.Thread(target=self._listen, name="principal-cache-pubsub", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._listening = False
+        self._listener = None
+
+    def _listen(self):
+        while self._listening:
+            try:
+                pubsub = self._get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.principal_cache_channel)
+                while self._listening:
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") != self._worker_id:
+                        if payload["user_id"] is not None:
+                            self.invalidate_user(payload["user_id"], broadcast=False)
+                        self._notify_remote(payload["user_id"])
+                pubsub.close()
+            except Exception as e:
+                logger.warning(f"Principal cache pub/sub unavailable, retrying: {e}")
+                # Entries may be stale while disconnected, so start from scratch
+                self.clear()
+                self._notify_remote(None)
+                time.sleep(5)
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
+metrics_registry.register("principal_cache", principal_cache.get_stats)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_principal_changed(mapper, connection, target):
+    # Collected on the session and invalidated once the change is committed
+    Session.object_session(target).info.setdefault("changed_user_ids", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals_on_commit(session):
+    for user_id in session.info.pop("changed_user_ids", set()):
+        principal_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _clear_principals_on_rollback(session):
+    session.info.pop("changed_user_ids", None)
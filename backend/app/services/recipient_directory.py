@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import User
+from ..utils.metrics import metrics_registry
+from .notification_transports import Recipient
+from .principal_cache import principal_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RecipientDirectory:
+    """In-process cache of active users by role, with their notification details.
+
+    Loaded with a single query and reused until a user is created/updated/deactivated
+    (see the session hooks below) or the TTL expires, so notification fan-out does not
+    query the users table on every escalation. Changes committed by other workers arrive
+    over the principal cache's Redis pub/sub channel; without it the TTL bounds how long
+    they go unseen.
+    """
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.recipient_cache_ttl_seconds
+        # (recipients by role, load time), replaced as a whole so readers never see a mix
+        self._snapshot: Optional[Tuple[Dict[str, List[Recipient]], float]] = None
+        self._generation = 0
+        self._loading = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def get_recipients(self, db: Session, roles: Iterable[str]) -> List[Recipient]:
+        """Active recipients holding any of the given roles"""
+        by_role = self._get_snapshot(db)
+        recipients = []
+        for role in roles:
+            recipients.extend(by_role.get(role, []))
+        return recipients
+
+    def invalidate(self):
+        """Force a reload on the next lookup"""
+        self._generation += 1
+        self._snapshot = None
+
+    def _get_snapshot(self, db: Session) -> Dict[str, List[Recipient]]:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[1] < self.ttl_seconds:
+            self.hits += 1
+            return snapshot[0]
+
+        # Never wait for another load: under AsyncSession.run_sync that load may be a
+        # greenlet on this same thread, suspended on its query until we return
+        loading = self._loading.acquire(blocking=False)
+        if not loading and snapshot is not None:
+            # Someone else is refreshing an expired snapshot; it is still good enough
+            self.hits += 1
+            return snapshot[0]
+        try:
+            generation = self._generation
+            by_role: Dict[str, List[Recipient]] = {}
+            for user in db.query(User).filter(User.is_active == True).all():
+                by_role.setdefault(user.role, []).append(Recipient.from_user(user))
+
+            # Not kept if a user change was committed while loading; the rows may predate it
+            if generation == self._generation:
+                self._snapshot = (by_role, time.monotonic())
+            self.loads += 1
+            return by_role
+        finally:
+            if loading:
+                self._loading.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        snapshot = self._snapshot
+        return {
+            "hits": self.hits,
+            "loads": self.loads,
+            "cached_recipients": sum(len(users) for users in snapshot[0].values()) if snapshot else 0,
+        }
+
+# Global recipient directory instance
+recipient_directory = RecipientDirectory()
+metrics_registry.register("recipient_directory", recipient_directory.get_stats)
+# Every user change another worker broadcasts can affect who gets notified
+principal_cache.on_remote_invalidation(lambda user_id: recipient_directory.invalidate())
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_users_changed(mapper, connection, target):
+    # Flag the session; the cache is dropped once the change is committed
+    Session.object_session(target).info["users_changed"] = True
+
+@event.listens_for(User, "after_insert")
+def _mark_users_added(mapper, connection, target):
+    Session.object_session(target).info["users_added"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("users_changed", False):
+        recipient_directory.invalidate()
+    if session.info.pop("users_added", False):
+        # The principal cache only broadcasts updates and deletes
+        principal_cache.publish_users_changed()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("users_changed", None)
+    session.info.pop("users_added", None)
@@ -1,18 +1,30 @@
+import asyncio
 import hmac
 import hashlib
-import json
-from typing import Dict, Any
+from collections import Counter
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from ..models import Conversation, Message, Lead
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db_bulk import bulk_writer
+from ..models import Conversation, Message
 from .ai_service import AIService
 from .notification_service import NotificationService
+from .lead_identity_service import LeadIdentityService
+from .conversation_counters import record_message
+import logging
+
+logger = logging.getLogger(__name__)
 
 class WebhookService:
-    def __init__(self):
-        self.ai_service = AIService()
-        self.notification_service = NotificationService()
+    def __init__(
+        self,
+        ai_service: Optional[AIService] = None,
+        notification_service: Optional[NotificationService] = None
+    ):
+        self.ai_service = ai_service or AIService()
+        self.notification_service = notification_service or NotificationService()
+        self.lead_identity_service = LeadIdentityService()
 
     def verify_whatsapp_signature(self, payload: bytes, signature: str, secret: str) -> bool:
         expected_signature = hmac.new(
@@ -22,110 +34,123 @@ class WebhookService:
         ).hexdigest()
         return hmac.compare_digest(f"sha256={expected_signature}", signature)
 
-    def process_whatsapp_message(self, data: Dict[str, Any], db: Session) -> Dict[str, Any]:
-        """Process incoming WhatsApp message"""
+    async def process_whatsapp_message(self, data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+        """Process incoming WhatsApp messages (a webhook may batch several)"""
         try:
             entry = data.get("entry", [{}])[0]
             changes = entry.get("changes", [{}])[0]
             messages = changes.get("value", {}).get("messages", [])
 
-            for message in messages:
-                if message.get("type") == "text":
-                    conversation = self._create_or_update_conversation(
-                        message, "whatsapp", db
-                    )
-                    self._process_message_with_ai(conversation, db)
-                    return {"status": "processed", "conversation_id": conversation.id}
-
-            return {"status": "no_text_message"}
+            text_messages = [message for message in messages if message.get("type") == "text"]
+            if not text_messages:
+                return {"status": "no_text_message"}
+            return await self._process_batch(text_messages, "whatsapp", db)
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def process_facebook_message(self, data: Dict[str, Any], db: Session) -> Dict[str, Any]:
-        """Process incoming Facebook Messenger message"""
+    async def process_facebook_message(self, data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+        """Process incoming Facebook Messenger messages (a webhook may batch several)"""
         try:
             messaging = data.get("entry", [{}])[0].get("messaging", [])
 
-            for event in messaging:
-                if event.get("message"):
-                    message = event["message"]
-                    if message.get("text"):
-                        conversation = self._create_or_update_conversation(
-                            {
-                                "id": event["sender"]["id"],
-                                "from": event["sender"]["id"],
-                                "text": {"body": message["text"]},
-                                "timestamp": event["timestamp"]
-                            },
-                            "facebook",
-                            db
-                        )
-                        self._process_message_with_ai(conversation, db)
-                        return {"status": "processed", "conversation_id": conversation.id}
-
-            return {"status": "no_text_message"}
+            text_messages = [
+                {
+                    "id": event["sender"]["id"],
+                    "from": event["sender"]["id"],
+                    "text": {"body": event["message"]["text"]},
+                    "timestamp": event["timestamp"]
+                }
+                for event in messaging
+                if event.get("message") and event["message"].get("text")
+            ]
+            if not text_messages:
+                return {"status": "no_text_message"}
+            return await self._process_batch(text_messages, "facebook", db)
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def process_instagram_message(self, data: Dict[str, Any], db: Session) -> Dict[str, Any]:
+    async def process_instagram_message(self, data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
         """Process incoming Instagram DM"""
         # Similar to Facebook but with Instagram-specific fields
-        return self.process_facebook_message(data, db)
-
-    def _create_or_update_conversation(self, message: Dict[str, Any], channel: str, db: Session) -> Conversation:
-        """Create or update conversation from message data"""
-        external_id = message.get("id")
-        sender_id = message.get("from")
-        sender_name = message.get("profile", {}).get("name", "Unknown")
-
-        # Extract message text based on channel
-        if channel == "whatsapp":
-            message_text = message.get("text", {}).get("body", "")
-        else:
+        return await self.process_facebook_message(data, db)
+
+    async def _process_batch(self, messages: List[Dict[str, Any]], channel: str, db: AsyncSession) -> Dict[str, Any]:
+        conversations = await self._ingest_messages(messages, channel, db)
+        # Classify each conversation once, on its latest message
+        for conversation in conversations:
+            await self._process_message_with_ai(conversation, db)
+        return {"status": "processed", "conversation_id": conversations[0].id, "messages": len(messages)}
+
+    async def _ingest_messages(self, messages: List[Dict[str, Any]], channel: str, db: AsyncSession) -> List[Conversation]:
+        """Store a batch of inbound messages in one transaction.
+
+        One conversation upsert per sender, one bulk insert for all the messages and one
+        counter update per conversation.
+        """
+        received_at = datetime.utcnow()
+        conversations: Dict[str, Conversation] = {}
+        counts: Counter = Counter()
+        rows = []
+
+        for message in messages:
+            sender_id = message.get("from")
             message_text = message.get("text", {}).get("body", "")
+            timestamp = datetime.fromtimestamp(int(message.get("timestamp", 0)) / 1000)
 
-        timestamp = datetime.fromtimestamp(int(message.get("timestamp", 0)) / 1000)
-
-        # Find existing conversation or create new one
-        conversation = db.query(Conversation).filter(
-            Conversation.sender_id == sender_id,
-            Conversation.channel == channel
-        ).first()
-
-        if not conversation:
-            conversation = Conversation(
-                external_id=external_id,
-                channel=channel,
-                sender_id=sender_id,
-                sender_name=sender_name,
-                recipient_id="business",  # Our business account
-                message_text=message_text,
-                timestamp=timestamp
-            )
-            db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-        else:
+            conversation = conversations.get(sender_id)
+            if conversation is None:
+                conversation = await self._create_or_update_conversation(message, channel, db, received_at)
+                conversations[sender_id] = conversation
             conversation.message_text = message_text
             conversation.timestamp = timestamp
-            db.commit()
 
-        # Add message to conversation
-        db_message = Message(
-            conversation_id=conversation.id,
-            direction="inbound",
-            content=message_text
-        )
-        db.add(db_message)
-        db.commit()
+            rows.append({
+                "conversation_id": conversation.id,
+                "direction": "inbound",
+                "content": message_text,
+                "sent_at": received_at
+            })
+            counts[sender_id] += 1
+
+        await db.run_sync(lambda session: bulk_writer.insert(session, Message, rows))
+        for sender_id, conversation in conversations.items():
+            record_message(conversation, "inbound", received_at, count=counts[sender_id])
+        await db.commit()
+
+        return list(conversations.values())
+
+    async def _create_or_update_conversation(
+        self, message: Dict[str, Any], channel: str, db: AsyncSession, received_at: datetime
+    ) -> Conversation:
+        """Find the sender's conversation on this channel, creating it if needed (not committed)"""
+        sender_id = message.get("from")
 
+        conversation = await db.scalar(
+            select(Conversation).where(
+                Conversation.sender_id == sender_id,
+                Conversation.channel == channel
+            )
+        )
+        if conversation:
+            return conversation
+
+        conversation = Conversation(
+            external_id=message.get("id"),
+            channel=channel,
+            sender_id=sender_id,
+            sender_name=message.get("profile", {}).get("name", "Unknown"),
+            recipient_id="business",  # Our business account
+            created_at=received_at
+        )
+        db.add(conversation)
+        await db.flush()
         return conversation
 
-    def _process_message_with_ai(self, conversation: Conversation, db: Session):
+    async def _process_message_with_ai(self, conversation: Conversation, db: AsyncSession):
         """Process message with AI for classification and response"""
         try:
-            # AI processing
-            ai_result = self.ai_service.process_message(conversation.message_text)
+            # AI processing (a blocking provider call, so it runs in a thread)
+            ai_result = await asyncio.to_thread(self.ai_service.process_message, conversation.message_text)
 
             # Update conversation with AI results
             conversation.intent = ai_result.get("intent")
@@ -137,22 +162,26 @@ class WebhookService:
             if self._should_escalate(conversation):
                 conversation.needs_human = True
                 conversation.status = "escalated"
-                self.notification_service.send_escalation_notification(conversation, db)
+                # Recipient lookup is sync ORM code; run_sync drives it over the async connection
+                await db.run_sync(
+                    lambda session: self.notification_service.send_escalation_notification(conversation, session)
+                )
 
             # Auto-reply if confidence is high enough
             elif conversation.ai_confidence >= 0.7:
                 reply = ai_result.get("reply")
                 if reply:
-                    self._send_auto_reply(conversation, reply, db)
+                    await self._send_auto_reply(conversation, reply, db)
 
-            db.commit()
+            await db.commit()
 
             # Extract lead information if applicable
             if conversation.intent in ["enquiry", "enrollment"]:
-                self._extract_lead_info(conversation, db)
+                await self._extract_lead_info(conversation, db)
 
-        except Exception as e:
-            print(f"AI processing error: {e}")
+        except Exception:
+            # Escalation notices and lead extraction for this conversation are lost too
+            logger.exception(f"AI processing failed for conversation {conversation.id}")
 
     def _should_escalate(self, conversation: Conversation) -> bool:
         """Check if conversation should be escalated to human"""
@@ -165,30 +194,24 @@ class WebhookService:
             return True
         return False
 
-    def _send_auto_reply(self, conversation: Conversation, reply: str, db: Session):
+    async def _send_auto_reply(self, conversation: Conversation, reply: str, db: AsyncSession):
         """Send automated reply"""
         # This would integrate with the actual messaging APIs
         # For now, just log the reply
         db_message = Message(
             conversation_id=conversation.id,
             direction="outbound",
-            content=reply
+            content=reply,
+            sent_at=datetime.utcnow()
         )
         db.add(db_message)
-        db.commit()
-
-    def _extract_lead_info(self, conversation: Conversation, db: Session):
-        """Extract and save lead information"""
-        lead_info = self.ai_service.extract_lead_info(conversation.message_text)
-
-        if lead_info.get("name") or lead_info.get("phone"):
-            lead = Lead(
-                conversation_id=conversation.id,
-                name=lead_info.get("name"),
-                phone=lead_info.get("phone"),
-                email=lead_info.get("email"),
-                program_interest=lead_info.get("program_interest"),
-                score=conversation.lead_score
-            )
-            db.add(lead)
-            db.commit()
\ No newline at end of file
+        record_message(conversation, db_message.direction, db_message.sent_at)
+        await db.commit()
+
+    async def _extract_lead_info(self, conversation: Conversation, db: AsyncSession):
+        """Extract lead information and merge it into the matching lead"""
+        lead_info = await asyncio.to_thread(self.ai_service.extract_lead_info, conversation.message_text)
+
+        if lead_info.get("name") or lead_info.get("phone") or lead_info.get("email"):
+            await db.run_sync(self.lead_identity_service.resolve_lead, lead_info, conversation)
+            await db.commit()
\ No newline at end of file
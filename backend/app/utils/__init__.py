@@ -1,2 +0,0 @@
-from .logger import audit_logger
-from .compliance import compliance_manager, data_retention_manager
\ No newline at end of file
@@ -0,0 +1,46 @@
+import re
+import unicodedata
+from typing import Optional
+from ..config import settings
+
+_NON_DIGITS = re.compile(r'\D')
+_NON_WORD = re.compile(r'[\W_]+')
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Normalize a phone number to an E.164-style key (``+<digits>``)"""
+    if not phone:
+        return None
+
+    raw = phone.strip()
+    digits = _NON_DIGITS.sub('', raw)
+    if len(digits) < 7:
+        return None
+
+    if raw.startswith('+'):
+        return f"+{digits}"
+    if digits.startswith('00'):
+        return f"+{digits[2:]}"
+    if settings.default_country_calling_code:
+        # Local numbers: drop the trunk prefix and add the configured country code
+        return f"+{settings.default_country_calling_code}{digits.lstrip('0')}"
+    return f"+{digits}"
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Normalize an email address for identity matching"""
+    if not email:
+        return None
+
+    normalized = email.strip().lower()
+    if '@' not in normalized:
+        return None
+    return normalized
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Normalize a person's name for lookups: case-folded, accents and punctuation removed"""
+    if not name:
+        return None
+
+    decomposed = unicodedata.normalize('NFKD', name)
+    unaccented = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    normalized = _NON_WORD.sub(' ', unaccented.casefold()).strip()
+    return normalized or None
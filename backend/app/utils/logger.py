@@ -1,11 +1,33 @@
+import asyncio
 import logging
 import json
+import threading
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..db_bulk import bulk_writer
 from ..models import AnalyticsEvent
+from .metrics import metrics_registry
 
 class AuditLogger:
+    """Writes audit and analytics events to the log and the analytics_events table.
+
+    While the application runs, stored events are buffered and written in batches by a
+    background task (one bulk insert per flush, on its own session) instead of one
+    INSERT and commit per event on the caller's session. Without the task (scripts,
+    tests), or when the buffer is full, events are written immediately as before.
+    """
+
     def __init__(self):
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.events_buffered = 0
+        self.events_written = 0
+        self.flushes = 0
+        self.flush_failures = 0
         self.logger = logging.getLogger('omnilead_audit')
         self.logger.setLevel(logging.INFO)
 
@@ -38,16 +60,11 @@ class AuditLogger:
         self.logger.info(f"USER_ACTION: {json.dumps(log_data)}")
 
         # Store in database
-        try:
-            event = AnalyticsEvent(
-                event_type='user_action',
-                user_id=user_id,
-                data=json.dumps(log_data)
-            )
-            db.add(event)
-            db.commit()
-        except Exception as e:
-            self.logger.error(f"Failed to store audit log: {e}")
+        self._store(db, {
+            'event_type': 'user_action',
+            'user_id': user_id,
+            'data': log_data,
+        }, "Failed to store audit log")
 
     def log_conversation_event(self, db: Session, conversation_id: int, event_type: str, details: dict = None):
         """Log conversation-related events"""
@@ -60,16 +77,12 @@ class AuditLogger:
 
         self.logger.info(f"CONVERSATION_EVENT: {json.dumps(log_data)}")
 
-        try:
-            event = AnalyticsEvent(
-                event_type='conversation_event',
-                conversation_id=conversation_id,
-                data=json.dumps(log_data)
-            )
-            db.add(event)
-            db.commit()
-        except Exception as e:
-            self.logger.error(f"Failed to store conversation log: {e}")
+        # Store in database
+        self._store(db, {
+            'event_type': 'conversation_event',
+            'conversation_id': conversation_id,
+            'data': log_data,
+        }, "Failed to store conversation log")
 
     def log_ai_decision(self, db: Session, conversation_id: int, decision: str, confidence: float, details: dict = None):
         """Log AI decision making for compliance"""
@@ -83,16 +96,12 @@ class AuditLogger:
 
         self.logger.info(f"AI_DECISION: {json.dumps(log_data)}")
 
-        try:
-            event = AnalyticsEvent(
-                event_type='ai_decision',
-                conversation_id=conversation_id,
-                data=json.dumps(log_data)
-            )
-            db.add(event)
-            db.commit()
-        except Exception as e:
-            self.logger.error(f"Failed to store AI decision log: {e}")
+        # Store in database
+        self._store(db, {
+            'event_type': 'ai_decision',
+            'conversation_id': conversation_id,
+            'data': log_data,
+        }, "Failed to store AI decision log")
 
     def log_message_processing(self, db: Session, message_id: int, processing_time: float, success: bool, error: str = None):
         """Log message processing metrics"""
@@ -106,8 +115,77 @@ class AuditLogger:
 
         self.logger.info(f"MESSAGE_PROCESSING: {json.dumps(log_data)}")
 
+        # Store in database
+        self._store(db, {
+            'event_type': 'message_processing',
+            'data': log_data,
+        }, "Failed to store message processing log")
+
+    def _store(self, db: Session, row: Dict[str, Any], failure: str):
+        row['timestamp'] = datetime.utcnow()
+        with self._lock:
+            if self._task is not None and len(self._pending) < settings.audit_buffer_max_events:
+                self._pending.append(row)
+                self.events_buffered += 1
+                return
+
+        try:
+            bulk_writer.insert(db, AnalyticsEvent, [row])
+            db.commit()
+            self.events_written += 1
+        except Exception as e:
+            self.logger.error(f"{failure}: {e}")
+
+    def flush(self) -> int:
+        """Write every buffered event in one bulk insert"""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+
+        try:
+            with SessionLocal() as db:
+                bulk_writer.insert(db, AnalyticsEvent, rows)
+                db.commit()
+        except Exception as e:
+            self.flush_failures += 1
+            self.logger.error(f"Failed to store {len(rows)} buffered audit events: {e}")
+            return 0
+        self.flushes += 1
+        self.events_written += len(rows)
+        return len(rows)
+
+    async def start(self):
+        if self._task is not None or settings.audit_flush_interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop buffering and write whatever is still pending"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(settings.audit_flush_interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "events_buffered": self.events_buffered,
+            "events_written": self.events_written,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+        }
+
 # Global audit logger instance
 audit_logger = AuditLogger()
+metrics_registry.register("audit_events", audit_logger.get_stats)
 
 def get_logger(name: str):
     """Get a logger instance for the given name"""
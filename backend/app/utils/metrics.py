@@ -0,0 +1,28 @@
+from typing import Any, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MetricsRegistry:
+    """Collects named metric providers exposed on the metrics endpoint"""
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """Register a callable returning a JSON-serializable snapshot"""
+        self._providers[name] = provider
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Collect the current value of every registered provider"""
+        result = {}
+        for name, provider in self._providers.items():
+            try:
+                result[name] = provider()
+            except Exception as e:
+                logger.error(f"Metrics provider {name} failed: {e}")
+                result[name] = {"error": str(e)}
+        return result
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
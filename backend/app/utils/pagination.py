@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for the row a page ended on"""
+    payload = [sort, [value.isoformat() if isinstance(value, datetime) else value for value in values]]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, List[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(sort, str) or not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return sort, values
+
+class KeysetPagination:
+    """Seek pagination over a descending, unique sort key (e.g. ``(updated_at, id)``).
+
+    Each page continues strictly after the last row of the previous one, so fetching
+    any page costs one index range scan regardless of depth, and rows inserted or
+    updated while paging never shift later pages.
+    """
+
+    def __init__(self, name: str, columns: Sequence[Any]):
+        self.name = name
+        self.columns = list(columns)
+
+    def _parse(self, values: List[Any]) -> List[Any]:
+        if len(values) != len(self.columns):
+            raise InvalidCursor("Cursor does not match the sort order")
+        parsed = []
+        for column, value in zip(self.columns, values):
+            if value is not None and column.type.python_type is datetime:
+                try:
+                    value = datetime.fromisoformat(value)
+                except (TypeError, ValueError) as e:
+                    raise InvalidCursor("Malformed cursor") from e
+            parsed.append(value)
+        return parsed
+
+    def apply(self, statement: Select, cursor: Optional[str], limit: int) -> Select:
+        """Restrict ``statement`` to the page after ``cursor`` (one extra row detects the next page)"""
+        if cursor:
+            sort, values = decode_cursor(cursor)
+            if sort != self.name:
+                raise InvalidCursor("Cursor does not match the sort order")
+            statement = statement.where(tuple_(*self.columns) < tuple_(*self._parse(values)))
+        return statement.order_by(*(column.desc() for column in self.columns)).limit(limit + 1)
+
+    def page(self, rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+        """Split fetched rows into the page and the cursor for the next one"""
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(self.name, [getattr(last, column.key) for column in self.columns])
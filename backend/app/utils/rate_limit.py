@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+class SlidingWindowLimiter:
+    """Allows at most ``max_attempts`` per key within any ``window_seconds`` span"""
+
+    def __init__(self, max_attempts: int, window_seconds: float, max_keys: int = 100000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._attempts: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def _prune(self, attempts: Deque[float], now: float):
+        cutoff = now - self.window_seconds
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+
+    def hit(self, key: str) -> Optional[float]:
+        """Record an attempt for ``key``.
+
+        Returns None if the attempt is allowed, otherwise the number of seconds until
+        the oldest attempt leaves the window (the attempt is not recorded).
+        """
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                if len(self._attempts) >= self.max_keys:
+                    self._sweep(now)
+                attempts = self._attempts[key] = deque()
+            self._prune(attempts, now)
+
+            if len(attempts) >= self.max_attempts:
+                self.throttled += 1
+                return max(0.0, attempts[0] + self.window_seconds - now)
+            attempts.append(now)
+            return None
+
+    def reset(self, key: str):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._attempts.clear()
+
+    def _sweep(self, now: float):
+        """Forget keys with no attempts left in the window (lock held)"""
+        for key in list(self._attempts):
+            attempts = self._attempts[key]
+            self._prune(attempts, now)
+            if not attempts:
+                del self._attempts[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "tracked_keys": len(self._attempts),
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark: ORM inserts vs. the bulk writer for messages and analytics events.
+
+Times writing the same rows three ways: one ORM object and commit per row (the old
+ingestion/audit path), ORM objects with a single commit, and BulkWriter batches (COPY
+on PostgreSQL, executemany on SQLite). Prints rows/sec for each.
+Usage: python benchmarks/bulk_insert.py [rows] [database_url]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.db_bulk import BulkWriter
+from app.models import AnalyticsEvent, Conversation, Message
+
+BATCH = 1000
+
+
+def message_rows(conversation_id: int, rows: int):
+    now = datetime.utcnow()
+    return [
+        {"conversation_id": conversation_id, "direction": "inbound", "content": f"message {i}", "sent_at": now}
+        for i in range(rows)
+    ]
+
+
+def event_rows(rows: int):
+    now = datetime.utcnow()
+    return [
+        {"event_type": "conversation_event", "conversation_id": i, "data": {"event_type": "closed"}, "timestamp": now}
+        for i in range(rows)
+    ]
+
+
+def orm_per_row(db, model, rows):
+    for row in rows:
+        db.add(model(**row))
+        db.commit()
+
+
+def orm_single_commit(db, model, rows):
+    db.add_all(model(**row) for row in rows)
+    db.commit()
+
+
+def bulk(db, model, rows):
+    writer = BulkWriter()
+    for start in range(0, len(rows), BATCH):
+        writer.insert(db, model, rows[start:start + BATCH])
+    db.commit()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    url = sys.argv[2] if len(sys.argv) > 2 else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bulk.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        conversation = Conversation(external_id="bench", channel="whatsapp", sender_id="bench")
+        db.add(conversation)
+        db.commit()
+        conversation_id = conversation.id
+
+    print(f"{rows} rows per run ({engine.dialect.name})")
+    print(f"{'table':>18} {'orm per row':>14} {'orm 1 commit':>14} {'bulk writer':>14}")
+    for name, model, make_rows in (
+        ("messages", Message, lambda: message_rows(conversation_id, rows)),
+        ("analytics_events", AnalyticsEvent, lambda: event_rows(rows)),
+    ):
+        rates = []
+        for write in (orm_per_row, orm_single_commit, bulk):
+            data = make_rows()
+            with Session(engine) as db:
+                started = time.perf_counter()
+                write(db, model, data)
+                rates.append(rows / (time.perf_counter() - started))
+                db.execute(delete(model))
+                db.commit()
+        print(f"{name:>18} " + " ".join(f"{rate:>12,.0f}/s" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark: OFFSET paging vs. keyset (cursor) paging of the conversation list.
+
+Builds a SQLite database with the production schema and indexes (1M conversations by
+default, created once and reused), then times fetching a 50-row page at increasing
+depths. Usage: python benchmarks/conversation_pagination.py [rows] [db_path]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Conversation
+from app.routes.conversations import CONVERSATION_SORTS
+
+PAGE = 50
+BATCH = 50000
+
+
+def populate(engine, rows: int):
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        existing = db.scalar(select(func.count(Conversation.id)))
+        if existing >= rows:
+            return
+        started = datetime.utcnow()
+        for start in range(existing, rows, BATCH):
+            db.execute(insert(Conversation), [
+                {
+                    "external_id": f"ext-{i}",
+                    "channel": ("whatsapp", "facebook", "instagram")[i % 3],
+                    "sender_id": f"sender-{i}",
+                    "status": ("open", "escalated", "closed", "replied")[i % 4],
+                    "lead_score": (i % 1000) / 1000,
+                    "updated_at": started - timedelta(seconds=i),
+                }
+                for i in range(start, min(start + BATCH, rows))
+            ])
+            db.commit()
+        db.execute(text("ANALYZE"))
+
+
+def timed(db, statement):
+    started = time.perf_counter()
+    rows = db.scalars(statement).all()
+    return time.perf_counter() - started, rows
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"omnilead_pagination_{rows}.db")
+    engine = create_engine(f"sqlite:///{path}")
+
+    started = time.perf_counter()
+    populate(engine, rows)
+    print(f"{rows} conversations ready in {time.perf_counter() - started:.1f}s ({path})")
+
+    pagination = CONVERSATION_SORTS["updated_at"]
+    base = select(Conversation)
+    depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, rows - PAGE) if d < rows]
+
+    with Session(engine) as db:
+        print(f"{'depth':>10} {'offset':>12} {'cursor':>12}")
+        for depth in depths:
+            offset_time, _ = timed(db, base.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).offset(depth).limit(PAGE))
+
+            # Cursor for the row just before this depth, as a client would hold after paging there
+            cursor = None
+            if depth:
+                _, previous = timed(db, base.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).offset(depth - 1).limit(2))
+                cursor = pagination.page(previous, 1)[1]
+            cursor_time, _ = timed(db, pagination.apply(base, cursor, PAGE))
+
+            print(f"{depth:>10} {offset_time * 1000:>10.2f}ms {cursor_time * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
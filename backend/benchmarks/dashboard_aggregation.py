@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark: the dashboard's former eight queries vs. the daily rollups it now reads.
+
+Builds SQLite databases with the production schema and indexes (100k, 1M and 10M
+conversations by default, plus one lead per five conversations, created once and
+reused, with their rollups), checks both versions return the same figures, then times
+each over a 30-day window. Usage: python benchmarks/dashboard_aggregation.py [rows,rows,...] [db_dir]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Conversation, Lead
+from app.services.analytics_rollups import AnalyticsRollups
+from app.services.dashboard_metrics import dashboard_metrics
+
+BATCH = 50000
+RUNS = 5
+# Rows are spread over this many days, so a 30-day window covers about a third
+SPREAD_DAYS = 90
+
+
+def populate(engine, rows: int):
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        existing = db.scalar(select(func.count(Conversation.id)))
+        if existing >= rows:
+            return
+        now = datetime.utcnow()
+        step = timedelta(days=SPREAD_DAYS) / rows
+        for start in range(existing, rows, BATCH):
+            db.execute(insert(Conversation), [
+                {
+                    "external_id": f"ext-{i}",
+                    "channel": ("whatsapp", "facebook", "instagram")[i % 3],
+                    "sender_id": f"sender-{i}",
+                    "status": ("open", "escalated", "closed", "replied")[i % 4],
+                    "first_response_seconds": float(i % 7200) if i % 3 else None,
+                    "created_at": now - step * i,
+                }
+                for i in range(start, min(start + BATCH, rows))
+            ])
+            db.execute(insert(Lead), [
+                {
+                    "conversation_id": i + 1,
+                    "name": f"Lead {i}",
+                    "status": ("new", "contacted", "qualified", "converted", "lost")[i % 5],
+                    "created_at": now - step * i,
+                }
+                for i in range(start, min(start + BATCH, rows), 5)
+            ])
+            db.commit()
+        # Rows were written with Core inserts, which skip the incremental rollup updates
+        AnalyticsRollups().rebuild(db)
+        db.execute(text("ANALYZE"))
+
+
+def eight_queries(db, start_date):
+    """The dashboard as it was: one query per figure"""
+    total_conversations = db.scalar(select(func.count(Conversation.id)).where(Conversation.created_at >= start_date))
+    by_channel = db.execute(select(Conversation.channel, func.count(Conversation.id)).where(
+        Conversation.created_at >= start_date).group_by(Conversation.channel)).all()
+    by_status = db.execute(select(Conversation.status, func.count(Conversation.id)).where(
+        Conversation.created_at >= start_date).group_by(Conversation.status)).all()
+    total_leads = db.scalar(select(func.count(Lead.id)).where(Lead.created_at >= start_date))
+    leads_by_status = db.execute(select(Lead.status, func.count(Lead.id)).where(
+        Lead.created_at >= start_date).group_by(Lead.status)).all()
+    avg_response_time = db.scalar(select(func.avg(Conversation.first_response_seconds)).where(
+        Conversation.created_at >= start_date))
+    qualified = db.scalar(select(func.count(Lead.id)).where(Lead.created_at >= start_date, Lead.status == "qualified"))
+    converted = db.scalar(select(func.count(Lead.id)).where(Lead.created_at >= start_date, Lead.status == "converted"))
+    return {
+        "total_conversations": total_conversations,
+        "conversations_by_channel": dict(by_channel),
+        "conversations_by_status": dict(by_status),
+        "total_leads": total_leads,
+        "leads_by_status": dict(leads_by_status),
+        "avg_response_time_hours": avg_response_time / 3600 if avg_response_time else 0,
+        "conversion_funnel": {
+            "conversations": total_conversations,
+            "leads": total_leads,
+            "qualified_leads": qualified,
+            "converted": converted,
+        },
+    }
+
+
+def best_of(db, compute, start_date):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = compute(db, start_date)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100_000, 1_000_000, 10_000_000]
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.gettempdir()
+
+    print(f"{'conversations':>14} {'8 queries':>12} {'rollups':>12}")
+    for rows in sizes:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, f'omnilead_dashboard_{rows}.db')}")
+        populate(engine, rows)
+        # Rollups are per day, so the window starts at midnight for both versions
+        start_date = datetime.combine(datetime.utcnow().date() - timedelta(days=30), datetime.min.time())
+        with Session(engine) as db:
+            old_time, old = best_of(db, eight_queries, start_date)
+            new_time, new = best_of(db, dashboard_metrics, start_date)
+        old_hours, new_hours = old.pop("avg_response_time_hours"), new.pop("avg_response_time_hours")
+        assert old == new and abs(old_hours - new_hours) < 1e-6, "aggregations disagree"
+        print(f"{rows:>14,} {old_time * 1000:>10.1f}ms {new_time * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
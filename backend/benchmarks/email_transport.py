@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Benchmark: one SMTP connection per email vs. pooled, batched sends.
+
+Runs against an in-process SMTP sink, so it measures connection/setup overhead rather
+than a real provider. Usage: python benchmarks/email_transport.py [emails]
+"""
+import smtplib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.email_transport import EmailTemplate, SMTPConnectionPool, SMTPEmailTransport
+from app.services.notification_transports import NotificationJob, Recipient, EMAIL
+from app.utils.smtp_sink import LocalSMTPSink
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    jobs = [
+        NotificationJob(EMAIL, Recipient(id=i, email=f"agent{i}@example.com", full_name=f"Agent {i}"),
+                        "Escalated Conversation", "New escalated conversation from Student (whatsapp)")
+        for i in range(count)
+    ]
+
+    with LocalSMTPSink() as sink:
+        started = time.perf_counter()
+        for job in jobs:
+            connection = smtplib.SMTP(sink.host, sink.port)
+            body = EmailTemplate.from_job(job).render(job.recipient)
+            connection.sendmail("noreply@omnilead.com", [job.recipient.email], body)
+            connection.quit()
+        naive = time.perf_counter() - started
+        naive_connections = sink.connections
+
+    with LocalSMTPSink() as sink:
+        transport = SMTPEmailTransport(SMTPConnectionPool(sink.host, sink.port, use_tls=False, size=4), "noreply@omnilead.com")
+        started = time.perf_counter()
+        for start in range(0, count, 100):
+            transport.send_batch(jobs[start:start + 100])
+        pooled = time.perf_counter() - started
+        transport.close()
+        pooled_connections = sink.connections
+
+    print(f"{count} emails")
+    print(f"  connection per email: {naive:.3f}s ({count / naive:.0f}/s, {naive_connections} connections)")
+    print(f"  pooled + batched:     {pooled:.3f}s ({count / pooled:.0f}/s, {pooled_connections} connections)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Benchmark: cold import time of the application module.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and reports the
+median wall time, the number of modules loaded and the slowest imports. Heavy optional
+dependencies (pandas, openpyxl, reportlab, openai, firebase_admin, twilio, sendgrid)
+should not appear unless they are configured.
+
+Usage: python benchmarks/import_time.py [module] [runs]
+"""
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["pandas", "openpyxl", "reportlab", "openai", "firebase_admin", "twilio", "sendgrid"]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(result.stderr.splitlines()[-1] if result.stderr else f"import {module} failed")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    return elapsed, imports
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.main"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    timings = []
+    for _ in range(runs):
+        elapsed, imports = measure(module)
+        timings.append(elapsed)
+
+    loaded = {name for _, _, name in imports}
+    top_level = sorted((imp for imp in imports if imp[1] <= 1), reverse=True)[:15]
+
+    print(f"import {module}: median {statistics.median(timings) * 1000:.0f}ms over {runs} runs, {len(loaded)} modules")
+    print("slowest top-level imports (cumulative):")
+    for cumulative_us, _, name in top_level:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    print(f"heavy optional dependencies loaded: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Benchmark: event-loop lag while concurrent logins verify bcrypt hashes.
+
+A ticker coroutine sleeps 10ms in a loop and records how late it wakes up, standing in
+for webhooks and Socket.IO traffic sharing the worker. Logins either call bcrypt inline
+(as the routes used to) or through AuthService's dedicated executor.
+Usage: python benchmarks/login_event_loop_lag.py [concurrent_logins]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.auth_service import AuthService
+
+TICK = 0.01
+
+
+async def measure(login, concurrency: int):
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - started - TICK)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 5)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await ticker_task
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    return elapsed, lags[-1], p99
+
+
+async def run(concurrency: int):
+    auth_service = AuthService()
+    hashed = auth_service.get_password_hash("correct horse battery staple")
+
+    async def inline_login():
+        auth_service.verify_password("wrong password", hashed)
+
+    async def offloaded_login():
+        await auth_service.verify_password_async("wrong password", hashed)
+
+    print(f"{concurrency} concurrent logins")
+    for label, login in (("inline bcrypt:      ", inline_login), ("dedicated executor: ", offloaded_login)):
+        elapsed, worst, p99 = await measure(login, concurrency)
+        print(f"  {label} {elapsed:.2f}s total, loop lag max {worst * 1000:.0f}ms, p99 {p99 * 1000:.0f}ms")
+    auth_service.close()
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    asyncio.run(run(concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Production launcher for the OmniLead backend.
+
+Runs one uvicorn worker process per CPU core (or WEB_CONCURRENCY), using uvloop and
+httptools when they are installed. Each worker warms its database pool and AI client
+before accepting traffic (see /health/ready) and drains in-flight webhooks and
+Socket.IO connections on SIGTERM.
+
+For local development use start_server.py, which runs a single reloading process.
+"""
+import argparse
+import importlib.util
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def default_workers() -> int:
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    return os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the OmniLead API with multiple workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    print(f"Starting OmniLead on {args.host}:{args.port} with {args.workers} workers (loop={loop}, http={http})")
+    uvicorn.run(
+        "app.main:socket_app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        proxy_headers=True,
+        # Covers the readiness drain delay plus in-flight requests
+        timeout_graceful_shutdown=int(settings.drain_delay_seconds + settings.graceful_shutdown_seconds),
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,42 @@
 """
 Pytest configuration and fixtures
 """
+import os
+import re
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.db_router import get_read_db
 from app.main import app
+from app.container import container
 from app.models import User
 from app.services import AuthService
+from app.services.analytics_cache import analytics_cache
+from app.services.contact_directory import contact_directory
+from app.services.recipient_directory import recipient_directory
+from app.services.principal_cache import principal_cache
 
-# Test database (in-memory SQLite for testing)
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Test database (a temporary SQLite file, shared by the sync fixtures and the async app path)
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="omnilead-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: each TestClient runs its own event loop, so connections must not be reused across tests
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -33,6 +48,12 @@ def db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        recipient_directory.invalidate()
+        contact_directory.invalidate()
+        analytics_cache.clear()
+        principal_cache.clear()
+        container.auth_service.ip_limiter.clear()
+        container.auth_service.email_limiter.clear()
 
 
 @pytest.fixture(scope="function")
@@ -44,7 +65,13 @@ def client(db):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -53,7 +80,9 @@ def client(db):
 @pytest.fixture
 def auth_service():
     """Create an AuthService instance"""
-    return AuthService()
+    service = AuthService()
+    yield service
+    service.close()
 
 
 @pytest.fixture
@@ -78,3 +107,18 @@ def auth_token(test_user, auth_service):
     """Generate an auth token for test user"""
     return auth_service.create_access_token(data={"sub": test_user.email})
 
+
+
+@pytest.fixture
+def query_budget():
+    """Assert a response stayed within a number of SQL statements (read from its Server-Timing header)"""
+    def check(response, max_queries: int) -> int:
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers.get("Server-Timing", ""))
+        assert match, "response has no database Server-Timing entry"
+        queries = int(match.group(1))
+        request = response.request
+        assert queries <= max_queries, (
+            f"{request.method} {request.url.path} issued {queries} queries (budget {max_queries})"
+        )
+        return queries
+    return check
@@ -0,0 +1,122 @@
+"""
+Tests for the analytics response cache
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+from fastapi import status
+
+from app.models import Conversation
+from app.services.analytics_cache import AnalyticsCache, analytics_cache
+
+
+def test_dashboard_is_served_from_cache_until_a_write(client, db, auth_token, query_budget):
+    """Test repeated polls skip the database and a committed conversation refreshes them"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = client.get("/api/analytics/dashboard", headers=headers)
+    hits = analytics_cache.local_hits
+
+    second = client.get("/api/analytics/dashboard", headers=headers)
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert analytics_cache.local_hits == hits + 1
+    # The caller is cached too, so nothing reaches the database
+    query_budget(second, 0)
+
+    db.add(Conversation(external_id="ext-1", channel="whatsapp", sender_id="1", created_at=datetime.utcnow()))
+    db.commit()
+
+    third = client.get("/api/analytics/dashboard", headers=headers)
+    assert third.json()["total_conversations"] == 1
+
+
+def test_concurrent_misses_compute_once():
+    """Test requests missing the same key share one computation"""
+    cache = AnalyticsCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"total": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("dashboard", "admin", compute, days=30) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == [1]
+    assert results == [{"total": 1}] * 5
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"]) == (1, 4)
+
+
+def test_followers_do_not_inherit_the_leaders_cancellation():
+    """Test a coalesced request recomputes when the request it waited on is cancelled"""
+    cache = AnalyticsCache()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_compute("dashboard", "admin", slow, days=30))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute("dashboard", "admin", _value("fresh"), days=30))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "fresh"
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"]) == (2, 1)
+
+
+def test_entries_are_scoped_and_invalidated():
+    """Test role scope and window are part of the key, and invalidation drops every entry"""
+    cache = AnalyticsCache()
+
+    async def scenario():
+        await cache.get_or_compute("dashboard", "admin", _value("admin"), days=30)
+        await cache.get_or_compute("dashboard", "analyst", _value("analyst"), days=30)
+        cached = await cache.get_or_compute("dashboard", "admin", _value("recomputed"), days=30)
+        other_window = await cache.get_or_compute("dashboard", "admin", _value("seven days"), days=7)
+        cache.invalidate()
+        refreshed = await cache.get_or_compute("dashboard", "admin", _value("recomputed"), days=30)
+        return cached, other_window, refreshed
+
+    assert asyncio.run(scenario()) == ("admin", "seven days", "recomputed")
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_shared_invalidation_is_kept_off_the_event_loop(monkeypatch):
+    """Test committing on the event loop clears local entries at once and deletes from Redis elsewhere"""
+    monkeypatch.setattr("app.config.settings.analytics_cache_redis_enabled", True)
+    cache = AnalyticsCache()
+    deleted = []
+
+    class FakeRedis:
+        def delete(self, key):
+            deleted.append((key, threading.get_ident()))
+
+    cache._redis = FakeRedis()
+
+    async def scenario():
+        cache._store("dashboard:admin:30", {"total": 1}, cache._generation)
+        cache.invalidate()
+        assert cache.get_stats()["entries"] == 0
+        return threading.get_ident()
+
+    # asyncio.run waits for the default executor, so the deletion has run by now
+    loop_thread = asyncio.run(scenario())
+    assert len(deleted) == 1
+    assert deleted[0][1] != loop_thread
+
+
+def _value(value):
+    async def compute():
+        return value
+    return compute
@@ -0,0 +1,46 @@
+"""
+Tests for JSON event payloads and their server-side aggregation
+"""
+from fastapi import status
+from sqlalchemy import select
+
+from app.models import AnalyticsEvent, Report
+from app.utils.logger import AuditLogger
+
+
+def test_payloads_round_trip_as_json(db):
+    """Test event and report payloads are stored and loaded as structured data"""
+    audit = AuditLogger()
+    audit.log_ai_decision(db, 7, "escalate", 0.42, {"reason": "pricing"})
+    db.add(Report(name="daily", type="daily", data={"totals": {"conversations": 3}}))
+    db.commit()
+
+    event = db.scalar(select(AnalyticsEvent))
+    assert event.data["decision"] == "escalate"
+    assert event.data["details"] == {"reason": "pricing"}
+    assert db.scalar(
+        select(AnalyticsEvent.id).where(AnalyticsEvent.data["decision"].as_string() == "escalate")
+    ) == event.id
+    assert db.scalar(select(Report)).data["totals"]["conversations"] == 3
+
+
+def test_ai_decision_metrics(client, db, auth_token):
+    """Test decisions and processing times are aggregated from event payloads"""
+    audit = AuditLogger()
+    audit.log_ai_decision(db, 1, "reply", 0.9)
+    audit.log_ai_decision(db, 2, "reply", 0.7)
+    audit.log_ai_decision(db, 3, "escalate", 0.4)
+    audit.log_message_processing(db, 1, 1.5, True)
+    audit.log_message_processing(db, 2, 2.5, True)
+
+    response = client.get("/api/analytics/ai-decisions", headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["decisions"][0]["decision"] == "reply"
+    assert data["decisions"][0]["count"] == 2
+    assert abs(data["decisions"][0]["avg_confidence"] - 0.8) < 1e-9
+    assert data["decisions"][1] == {
+        "decision": "escalate", "count": 1, "avg_confidence": 0.4, "min_confidence": 0.4
+    }
+    assert data["message_processing"] == {"count": 2, "avg_processing_time": 2.0, "max_processing_time": 2.5}
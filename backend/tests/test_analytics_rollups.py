@@ -0,0 +1,79 @@
+"""
+Tests for the daily analytics rollups
+"""
+from datetime import datetime, timedelta
+
+from fastapi import status
+from sqlalchemy import select, update
+
+from app.models import Conversation, DailyAgentStats, DailyConversationStats, DailyLeadStats, Lead, User
+from app.services.analytics_rollups import AnalyticsRollups
+
+
+def _conversation_rows(db):
+    return {
+        (row.channel, row.status): (row.conversations, row.responded, row.response_seconds)
+        for row in db.scalars(select(DailyConversationStats)) if row.conversations
+    }
+
+
+def test_rollups_follow_writes(db):
+    """Test inserts, changes and deletes move counts between rollup rows"""
+    created_at = datetime.utcnow() - timedelta(days=1)
+    conversation = Conversation(
+        external_id="ext-1", channel="whatsapp", sender_id="1", created_at=created_at, assigned_to=7, lead_score=0.5
+    )
+    lead = Lead(name="Ana", created_at=created_at)
+    db.add_all([conversation, lead])
+    db.commit()
+    assert _conversation_rows(db) == {("whatsapp", "open"): (1, 0, 0.0)}
+    assert db.scalar(select(DailyLeadStats.leads).where(DailyLeadStats.status == "new")) == 1
+
+    conversation.status = "closed"
+    conversation.first_response_seconds = 90.0
+    conversation.lead_score = 0.9
+    lead.status = "qualified"
+    db.commit()
+    assert _conversation_rows(db) == {("whatsapp", "closed"): (1, 1, 90.0)}
+    agent = db.scalar(select(DailyAgentStats))
+    assert (agent.day, agent.agent_id, agent.conversations) == (created_at.date(), 7, 1)
+    assert abs(agent.lead_score_sum - 0.9) < 1e-9
+    assert dict(db.execute(select(DailyLeadStats.status, DailyLeadStats.leads)).all()) == {"new": 0, "qualified": 1}
+
+    db.delete(conversation)
+    db.commit()
+    assert _conversation_rows(db) == {}
+
+
+def test_rebuild_repairs_drift(db):
+    """Test compaction recomputes rows changed outside the ORM"""
+    db.add(Conversation(external_id="ext-1", channel="facebook", sender_id="1", created_at=datetime.utcnow()))
+    db.commit()
+    db.execute(update(Conversation).values(status="escalated"))
+    db.commit()
+    assert _conversation_rows(db) == {("facebook", "open"): (1, 0, 0.0)}
+
+    rollups = AnalyticsRollups()
+    assert rollups.rebuild(db, datetime.utcnow().date() - timedelta(days=1)) == 1
+    assert _conversation_rows(db) == {("facebook", "escalated"): (1, 0, 0.0)}
+
+
+def test_performance_reads_agent_rollups(client, db, test_user, auth_token):
+    """Test agent figures come from the rollups"""
+    agent = User(email="agent@example.com", full_name="Agent", role="sales", hashed_password="x")
+    db.add(agent)
+    db.commit()
+    for i, score in enumerate([0.2, 0.6]):
+        db.add(Conversation(
+            external_id=f"ext-{i}", channel="whatsapp", sender_id=str(i), assigned_to=agent.id, lead_score=score,
+            created_at=datetime.utcnow() - timedelta(days=i * 40)
+        ))
+    db.commit()
+
+    response = client.get("/api/analytics/performance", headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    [performance] = response.json()["agent_performance"]
+    assert performance["agent"] == "Agent"
+    assert performance["conversations_handled"] == 2
+    assert abs(performance["avg_lead_score"] - 0.4) < 1e-9
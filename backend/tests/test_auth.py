@@ -91,3 +91,129 @@ def test_get_current_user_no_token(client):
     response = client.get("/api/auth/me")
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
+
+
+def _login(client, test_user):
+    response = client.post(
+        "/api/auth/login",
+        data={"username": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_login_returns_claims_and_refresh_token(client, test_user, auth_service):
+    """Access tokens carry id, role and version; a refresh token is issued alongside"""
+    tokens = _login(client, test_user)
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] > 0
+
+    claims = auth_service.decode_token(tokens["access_token"])
+    assert claims["uid"] == test_user.id
+    assert claims["role"] == test_user.role
+    assert claims["ver"] == 0
+
+
+def test_refresh_token_is_not_an_access_token(client, test_user):
+    """Refresh tokens are rejected by authenticated routes"""
+    tokens = _login(client, test_user)
+    response = client.get(
+        "/api/auth/me",
+        headers={"Authorization": f"Bearer {tokens['refresh_token']}"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_refresh_issues_new_pair(client, test_user):
+    """A refresh token can be exchanged for a working access token"""
+    tokens = _login(client, test_user)
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+
+    refreshed = response.json()
+    response = client.get(
+        "/api/auth/me",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_revoke_invalidates_access_and_refresh_tokens(client, test_user):
+    """Revoking bumps the token version so previously issued tokens stop working"""
+    tokens = _login(client, test_user)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/conversations/", headers=headers).status_code == status.HTTP_200_OK
+
+    assert client.post("/api/auth/revoke", headers=headers).status_code == status.HTTP_200_OK
+
+    assert client.get("/api/conversations/", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/auth/me", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_role_change_revokes_tokens(client, db, test_user):
+    """Changing a user's role invalidates tokens carrying the old role claim"""
+    tokens = _login(client, test_user)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/conversations/", headers=headers).status_code == status.HTTP_200_OK
+
+    test_user.role = "sales"
+    db.commit()
+
+    assert client.get("/api/conversations/", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_reassigning_same_role_keeps_tokens(client, db, test_user):
+    """Assigning a user's current role (even while expired) does not revoke their tokens"""
+    tokens = _login(client, test_user)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    db.expire(test_user)
+    test_user.role = "admin"
+    test_user.is_active = True
+    db.commit()
+
+    assert test_user.token_version == 0
+    assert client.get("/api/conversations/", headers=headers).status_code == status.HTTP_200_OK
+
+
+def test_legacy_token_still_authorizes(client, auth_token):
+    """Tokens with only a subject claim fall back to loading the user"""
+    response = client.get(
+        "/api/conversations/",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_login_throttled_per_email(client, test_user, monkeypatch):
+    """Repeated attempts for one email are rejected with 429 before hashing"""
+    from app.container import container
+    monkeypatch.setattr(container.auth_service.email_limiter, "max_attempts", 3)
+
+    for _ in range(3):
+        response = client.post(
+            "/api/auth/login",
+            data={"username": test_user.email, "password": "wrongpassword"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post(
+        "/api/auth/login",
+        data={"username": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_auth_metrics_belong_to_the_application_service(auth_service):
+    """Test other AuthService instances do not take over the application's auth metrics"""
+    from app.container import container
+    from app.utils.metrics import metrics_registry
+
+    container.auth_service.hash_rejections = 0
+    auth_service.hash_rejections = 7
+
+    assert metrics_registry.snapshot()["auth"]["hash_rejections"] == 0
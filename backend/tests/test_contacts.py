@@ -0,0 +1,89 @@
+"""
+Tests for the contact typeahead
+"""
+from fastapi import status
+
+from app.models import Conversation, Lead, User
+from app.services.contact_directory import parse_query
+from app.utils.identity import normalize_name
+
+
+def _typeahead(client, token, q):
+    return client.get("/api/contacts/typeahead", params={"q": q}, headers={"Authorization": f"Bearer {token}"})
+
+
+def _seed(db, assigned_to=None):
+    conversation = Conversation(
+        external_id="ext-1", channel="whatsapp", sender_id="14155550123", sender_name="José García",
+        assigned_to=assigned_to,
+    )
+    db.add(conversation)
+    db.flush()
+    db.add(Lead(
+        conversation_id=conversation.id, name="Maria Lopez", phone="+44 20 7946 0958",
+        normalized_phone="+442079460958", email="Maria.Lopez@Example.com", normalized_email="maria.lopez@example.com",
+    ))
+    db.commit()
+    return conversation
+
+
+def test_queries_are_normalized():
+    """Test names fold case and accents, and phone-like queries keep only digits"""
+    assert normalize_name("  José  O'Brien-Núñez ") == "jose o brien nunez"
+    assert parse_query("Garc") == ("name", "garc")
+    assert parse_query("+44 (20) 7946") == ("phone", "44207946")
+    assert parse_query("maria.lopez@") == ("email", "maria.lopez@")
+
+
+def test_typeahead_matches_names_phones_and_emails(client, db, auth_token):
+    """Test partial names (any word, accent-insensitive), phones and emails all match"""
+    conversation = _seed(db)
+    assert conversation.normalized_sender_name == "jose garcia"
+    assert conversation.normalized_sender_phone == "+14155550123"
+
+    by_name = _typeahead(client, auth_token, "garc").json()
+    assert [(match["kind"], match["name"]) for match in by_name] == [("conversation", "José García")]
+
+    by_phone = _typeahead(client, auth_token, "4420 79").json()
+    assert [(match["kind"], match["name"]) for match in by_phone] == [("lead", "Maria Lopez")]
+    assert _typeahead(client, auth_token, "1415555").json()[0]["kind"] == "conversation"
+
+    by_email = _typeahead(client, auth_token, "MARIA.LOPEZ@ex").json()
+    assert [match["email"] for match in by_email] == ["Maria.Lopez@Example.com"]
+
+
+def test_typeahead_sees_new_contacts_and_respects_assignment(client, db, auth_service):
+    """Test committed writes refresh the index and agents only see their own or unassigned contacts"""
+    other = User(email="other@example.com", hashed_password="x", full_name="Other", role="counselor")
+    agent = User(email="agent@example.com", hashed_password="x", full_name="Agent", role="counselor")
+    db.add_all([other, agent])
+    db.commit()
+    token = auth_service.create_access_token(data={"sub": agent.email})
+    _seed(db, assigned_to=other.id)
+
+    response = _typeahead(client, token, "jose")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+    db.add(Conversation(external_id="ext-2", channel="facebook", sender_id="fb-2", sender_name="Josephine"))
+    db.commit()
+
+    assert [match["name"] for match in _typeahead(client, token, "jose").json()] == ["Josephine"]
+
+
+def test_index_build_does_not_wait_for_a_build_in_progress(db):
+    """Test a cold lookup builds the index itself while another build holds the loading lock"""
+    from app.services.contact_directory import ContactDirectory
+
+    _seed(db)
+    directory = ContactDirectory(ttl_seconds=60)
+    # As when another run_sync greenlet on this thread is suspended mid-build
+    directory._loading.acquire()
+    try:
+        index = directory._get_index(db)
+    finally:
+        directory._loading.release()
+
+    assert [c.name for c in index.lookup("phone", "4420", lambda contact: True, 10)] == ["Maria Lopez"]
+    assert directory._get_index(db) is index
+    assert directory.loads == 1
@@ -0,0 +1,88 @@
+"""
+Tests for the denormalized conversation counters
+"""
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.models import Conversation, Message
+from app.services.conversation_counters import ConversationCounterReconciler, record_message
+
+
+def _conversation(db, opened_at):
+    conversation = Conversation(
+        external_id="ext-1",
+        channel="whatsapp",
+        sender_id="sender-1",
+        sender_name="Sender",
+        message_text="Hello",
+        timestamp=opened_at,
+        created_at=opened_at,
+    )
+    db.add(conversation)
+    db.flush()
+    return conversation
+
+
+def _message(db, conversation, direction, sent_at):
+    message = Message(conversation_id=conversation.id, direction=direction, content="hi", sent_at=sent_at)
+    db.add(message)
+    record_message(conversation, direction, sent_at)
+    db.commit()
+    db.refresh(conversation)
+
+
+def test_counters_follow_inbound_and_outbound_messages(db):
+    """Test counts, last activity and first response time are maintained on write"""
+    opened_at = datetime.utcnow() - timedelta(hours=1)
+    conversation = _conversation(db, opened_at)
+
+    _message(db, conversation, "inbound", opened_at)
+    _message(db, conversation, "inbound", opened_at + timedelta(minutes=5))
+    _message(db, conversation, "outbound", opened_at + timedelta(minutes=10))
+    _message(db, conversation, "outbound", opened_at + timedelta(minutes=30))
+
+    assert conversation.message_count == 4
+    assert conversation.inbound_count == 2
+    assert conversation.last_inbound_at == opened_at + timedelta(minutes=5)
+    assert conversation.last_outbound_at == opened_at + timedelta(minutes=30)
+    assert conversation.first_response_seconds == 600
+
+
+def test_reply_updates_counters(client, db, auth_token):
+    """Test a reply sent through the API counts as the first response"""
+    conversation = _conversation(db, datetime.utcnow() - timedelta(minutes=2))
+    _message(db, conversation, "inbound", conversation.created_at)
+
+    response = client.post(
+        f"/api/conversations/{conversation.id}/reply",
+        json={"content": "Thanks for reaching out"},
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    db.refresh(conversation)
+    assert conversation.message_count == 2
+    assert conversation.inbound_count == 1
+    assert conversation.last_outbound_at is not None
+    assert 100 <= conversation.first_response_seconds <= 300
+
+
+def test_reconciler_repairs_drift(db):
+    """Test messages written without counters are folded in by reconciliation"""
+    opened_at = datetime.utcnow() - timedelta(hours=1)
+    conversation = _conversation(db, opened_at)
+    _message(db, conversation, "inbound", opened_at)
+    db.add(Message(
+        conversation_id=conversation.id, direction="outbound", content="hi", sent_at=opened_at + timedelta(minutes=1)
+    ))
+    db.commit()
+
+    reconciler = ConversationCounterReconciler(batch_size=1)
+    assert reconciler.reconcile(db) == 1
+    assert reconciler.reconcile(db) == 0
+
+    db.refresh(conversation)
+    assert conversation.message_count == 2
+    assert conversation.last_outbound_at == opened_at + timedelta(minutes=1)
+    assert conversation.first_response_seconds == 60
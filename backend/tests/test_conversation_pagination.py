@@ -0,0 +1,87 @@
+"""
+Tests for cursor pagination of the conversation list
+"""
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.models import Conversation
+
+
+def _create_conversations(db, count):
+    now = datetime.utcnow()
+    for i in range(count):
+        db.add(Conversation(
+            external_id=f"ext-{i}",
+            channel="whatsapp" if i % 2 else "facebook",
+            sender_id=f"sender-{i}",
+            status="open",
+            lead_score=i / 10,
+            updated_at=now - timedelta(minutes=i),
+        ))
+    db.commit()
+
+
+def _fetch_all(client, headers, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, limit=2, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/conversations/", headers=headers, params=query)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(conversation["id"] for conversation in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages
+
+
+def test_cursor_pages_cover_every_conversation_once(client, db, auth_token):
+    """Test following cursors returns each conversation exactly once, newest first"""
+    _create_conversations(db, 5)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    ids, pages = _fetch_all(client, headers)
+
+    assert pages == 3
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_cursor_pagination_respects_filters_and_sort(client, db, auth_token):
+    """Test cursors work with channel filtering and lead score ordering"""
+    _create_conversations(db, 6)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    ids, _ = _fetch_all(client, headers, channel="whatsapp", sort="lead_score")
+
+    assert ids == [6, 4, 2]
+
+
+def test_new_conversations_do_not_shift_later_pages(client, db, auth_token):
+    """Test rows added while paging do not cause duplicates on later pages"""
+    _create_conversations(db, 4)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    first = client.get("/api/conversations/", headers=headers, params={"limit": 2})
+    db.add(Conversation(external_id="ext-new", channel="whatsapp", sender_id="sender-new", status="open"))
+    db.commit()
+    second = client.get(
+        "/api/conversations/", headers=headers,
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+
+    assert [c["id"] for c in first.json()] == [1, 2]
+    assert [c["id"] for c in second.json()] == [3, 4]
+
+
+def test_invalid_cursor_is_rejected(client, db, auth_token):
+    """Test malformed or mismatched cursors return 400"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    _create_conversations(db, 3)
+    first = client.get("/api/conversations/", headers=headers, params={"limit": 1})
+
+    assert client.get("/api/conversations/", headers=headers, params={"cursor": "not-a-cursor"}).status_code == 400
+    response = client.get(
+        "/api/conversations/", headers=headers,
+        params={"cursor": first.headers["X-Next-Cursor"], "sort": "lead_score"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,57 @@
+"""
+Tests for the single-pass dashboard aggregation
+"""
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.models import Conversation, Lead
+
+
+def _seed(db):
+    now = datetime.utcnow()
+    rows = [
+        ("whatsapp", "open", 600.0, now - timedelta(days=1)),
+        ("whatsapp", "closed", 1800.0, now - timedelta(days=2)),
+        ("facebook", "open", None, now - timedelta(days=3)),
+        ("instagram", "escalated", 3600.0, now - timedelta(days=60)),  # Outside the window
+    ]
+    for i, (channel, conversation_status, response, created_at) in enumerate(rows):
+        db.add(Conversation(
+            external_id=f"ext-{i}", channel=channel, sender_id=f"sender-{i}", status=conversation_status,
+            first_response_seconds=response, created_at=created_at
+        ))
+    for i, lead_status in enumerate(["new", "qualified", "qualified", "converted"]):
+        db.add(Lead(name=f"Lead {i}", status=lead_status, created_at=now - timedelta(days=i * 20)))
+    db.commit()
+
+
+def test_dashboard_figures(client, db, auth_token, query_budget):
+    """Test every figure is derived from two grouped queries"""
+    _seed(db)
+
+    response = client.get("/api/analytics/dashboard?days=30", headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "total_conversations": 3,
+        "conversations_by_channel": {"whatsapp": 2, "facebook": 1},
+        "conversations_by_status": {"open": 2, "closed": 1},
+        "total_leads": 2,
+        "leads_by_status": {"new": 1, "qualified": 1},
+        "avg_response_time_hours": 1200 / 3600,
+        "conversion_funnel": {"conversations": 3, "leads": 2, "qualified_leads": 1, "converted": 0},
+    }
+    # Caller lookup, conversations, leads
+    query_budget(response, 3)
+
+
+def test_dashboard_with_no_activity(client, db, auth_token):
+    """Test an empty window reports zeros rather than nulls"""
+    response = client.get("/api/analytics/dashboard", headers={"Authorization": f"Bearer {auth_token}"})
+
+    data = response.json()
+    assert data["total_conversations"] == 0
+    assert data["total_leads"] == 0
+    assert data["avg_response_time_hours"] == 0
+    assert data["conversion_funnel"]["qualified_leads"] == 0
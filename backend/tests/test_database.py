@@ -0,0 +1,37 @@
+"""
+Tests for database engine configuration
+"""
+from app.database import to_async_url
+
+
+def test_async_url_uses_async_drivers():
+    """Test sync URLs are translated to their async driver equivalents"""
+    assert to_async_url("postgresql://user:secret@db/omnilead") == "postgresql+asyncpg://user:secret@db/omnilead"
+    assert to_async_url("postgresql+psycopg2://user@db/omnilead") == "postgresql+asyncpg://user@db/omnilead"
+    assert to_async_url("sqlite:///./omnilead.db") == "sqlite+aiosqlite:///./omnilead.db"
+
+
+def test_async_session_round_trip(client, db, test_user):
+    """Test data committed through the sync session is visible on the async path"""
+    response = client.post(
+        "/api/auth/login",
+        data={"username": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/conversations/", headers=headers).json() == []
+
+
+def test_packages_import_in_a_fresh_interpreter():
+    """Test app.models and app.services import first, as scripts and benchmarks do"""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    for module in ("app.models", "app.services", "app.services.notification_transports"):
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
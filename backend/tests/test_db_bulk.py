@@ -0,0 +1,81 @@
+"""
+Tests for the bulk write path
+"""
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db_bulk import BulkWriter
+from app.models import AnalyticsEvent, Conversation, Message
+from app.services import WebhookService
+from app.utils.logger import AuditLogger
+
+
+def test_insert_returns_ids_and_applies_defaults(db):
+    """Test rows land in order with the model's Python-side defaults filled in"""
+    conversation = Conversation(external_id="ext-1", channel="whatsapp", sender_id="1")
+    db.add(conversation)
+    db.commit()
+    writer = BulkWriter()
+
+    ids = writer.insert(db, Message, [
+        {"conversation_id": conversation.id, "direction": "inbound", "content": f"message {i}"} for i in range(3)
+    ], return_ids=True)
+    db.commit()
+
+    messages = db.scalars(select(Message).order_by(Message.id)).all()
+    assert ids == [message.id for message in messages]
+    assert [message.content for message in messages] == ["message 0", "message 1", "message 2"]
+    assert {message.content_type for message in messages} == {"text"}
+    assert all(message.sent_at is not None for message in messages)
+    assert db.info["has_writes"] is True
+    assert writer.get_stats()["rows"] == 3
+    assert writer.insert(db, Message, []) is None
+
+
+def test_webhook_batch_is_written_in_one_pass(db):
+    """Test every message of a batched webhook is stored, with counters per sender"""
+    async_engine = create_async_engine(db.get_bind().url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+    service = WebhookService()
+    batch = [
+        {"id": "m1", "from": "111", "text": {"body": "hello"}, "timestamp": "1700000000000"},
+        {"id": "m2", "from": "222", "text": {"body": "hi there"}, "timestamp": "1700000001000"},
+        {"id": "m3", "from": "111", "text": {"body": "anyone?"}, "timestamp": "1700000002000"},
+    ]
+
+    async def scenario():
+        async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+            return await service._ingest_messages(batch, "whatsapp", session)
+
+    conversations = asyncio.run(scenario())
+    asyncio.run(async_engine.dispose())
+
+    assert [conversation.sender_id for conversation in conversations] == ["111", "222"]
+    assert db.scalar(select(func.count(Message.id))) == 3
+    counts = dict(db.execute(select(Conversation.sender_id, Conversation.message_count)).all())
+    assert counts == {"111": 2, "222": 1}
+    assert db.scalar(select(Conversation.message_text).where(Conversation.sender_id == "111")) == "anyone?"
+
+
+def test_audit_events_are_buffered_and_flushed(db, monkeypatch):
+    """Test events logged while running are written together when the buffer flushes"""
+    monkeypatch.setattr("app.utils.logger.SessionLocal", sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr("app.config.settings.audit_flush_interval_seconds", 60)
+    audit = AuditLogger()
+
+    async def scenario():
+        await audit.start()
+        for i in range(5):
+            audit.log_conversation_event(db, i + 1, "closed")
+        pending = db.scalar(select(func.count(AnalyticsEvent.id)))
+        await audit.stop()
+        return pending
+
+    assert asyncio.run(scenario()) == 0
+    events = db.scalars(select(AnalyticsEvent).order_by(AnalyticsEvent.id)).all()
+    assert [event.conversation_id for event in events] == [1, 2, 3, 4, 5]
+    assert events[0].data["event_type"] == "closed"
+    assert audit.get_stats()["flushes"] == 1
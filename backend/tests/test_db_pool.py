@@ -0,0 +1,67 @@
+"""
+Tests for database pool configuration and instrumentation
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.config import settings
+from app.db_pool import PoolStats, _instrumented, engine_options
+
+
+def test_pool_records_in_use_and_timeouts(tmp_path):
+    """Test checkouts, in-use gauge and timeouts are recorded"""
+    stats = PoolStats("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=_instrumented(QueuePool, stats),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert stats.get_stats()["in_use"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    snapshot = stats.get_stats()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["in_use"] == 0
+    assert snapshot["max_wait_ms"] >= 50
+    engine.dispose()
+
+
+def test_postgres_options_follow_settings(monkeypatch):
+    """Test pool sizing and statement timeout come from settings"""
+    monkeypatch.setattr("app.db_pool.pool_stats", {})
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+
+    options = engine_options("postgresql://user@db/omnilead", "test_sync")
+    assert issubclass(options["poolclass"], QueuePool)
+    assert options["pool_size"] == 7
+    assert options["connect_args"]["options"] == "-c statement_timeout=5000"
+
+    options = engine_options("postgresql+asyncpg://user@db/omnilead", "test_async")
+    assert options["connect_args"]["server_settings"] == {"statement_timeout": "5000"}
+
+
+def test_pgbouncer_mode_disables_app_pool(monkeypatch):
+    """Test PgBouncer mode uses no app-side pool and no prepared statement caches"""
+    monkeypatch.setattr("app.db_pool.pool_stats", {})
+    monkeypatch.setattr(settings, "db_pgbouncer_mode", True)
+
+    options = engine_options("postgresql+asyncpg://user@pgbouncer/omnilead", "test_pgbouncer")
+    assert issubclass(options["poolclass"], NullPool)
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+
+def test_sqlite_keeps_defaults():
+    """Test SQLite engines are left with SQLAlchemy's defaults"""
+    assert engine_options("sqlite:///./omnilead.db", "test_sqlite") == {}
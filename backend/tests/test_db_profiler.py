@@ -0,0 +1,59 @@
+"""
+Tests for per-request query instrumentation
+"""
+import logging
+import re
+
+from fastapi import status
+from sqlalchemy import select
+
+from app.db_profiler import fingerprint, normalize_sql, query_profiler, track_queries
+from app.models import Conversation
+
+
+def test_fingerprint_ignores_literals_and_list_lengths():
+    """Test repeats of one query with different parameters share a fingerprint"""
+    first = "SELECT * FROM conversations WHERE id IN (1, 2, 3) AND channel = 'whatsapp' LIMIT 50"
+    second = "SELECT *  FROM conversations\nWHERE id IN (?, ?) AND channel = ? LIMIT ?"
+
+    assert normalize_sql(first) == "SELECT * FROM conversations WHERE id IN (?, ...) AND channel = ? LIMIT ?"
+    assert fingerprint(first) == fingerprint(second)
+    assert fingerprint(first) != fingerprint("SELECT * FROM leads WHERE id = 1")
+    assert normalize_sql("SELECT 'a'::regconfig, :name") == "SELECT ?::regconfig, ?"
+
+
+def test_track_queries_counts_statements(db):
+    """Test statements in a tracked block are counted and captured"""
+    with track_queries(capture=True) as stats:
+        db.scalars(select(Conversation)).all()
+        db.scalars(select(Conversation).where(Conversation.id == 1)).all()
+
+    assert stats.count == 2
+    assert len(stats.statements) == 2
+    assert stats.worst_sql in stats.statements
+    assert stats.total_ms >= stats.worst_ms
+
+
+def test_slow_queries_are_logged_by_fingerprint(db, monkeypatch, caplog):
+    """Test statements over the threshold are logged and grouped"""
+    monkeypatch.setattr("app.config.settings.slow_query_ms", 0)
+
+    with caplog.at_level(logging.WARNING, logger="omnilead.slow_query"):
+        db.scalars(select(Conversation).where(Conversation.id == 1)).all()
+
+    key = fingerprint(str(select(Conversation).where(Conversation.id == 1).compile(db.get_bind())))
+    assert any(key in record.getMessage() for record in caplog.records)
+    assert key in query_profiler.get_stats()["slow_fingerprints"]
+
+
+def test_list_conversations_query_budget(client, auth_token, query_budget):
+    """Test listing conversations takes at most two statements (caller lookup and page)"""
+    response = client.get("/api/conversations/", headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "db-worst;dur=" in response.headers["Server-Timing"]
+    query_budget(response, 2)
+    assert re.search(r'db-worst;dur=[\d.]+;desc="[0-9a-f]{12}"', response.headers["Server-Timing"])
+    route = query_profiler.get_stats()["routes"]["GET /api/conversations/"]
+    assert re.fullmatch(r"[0-9a-f]{12}", route["worst_query_fingerprint"])
+    assert route["worst_query_sql"]
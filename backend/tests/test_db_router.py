@@ -0,0 +1,57 @@
+"""
+Tests for read replica routing
+"""
+import asyncio
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.db_router import ReplicaRouter
+
+
+def test_no_replicas_reads_from_primary():
+    """Test reads use the primary when no replicas are configured"""
+    router = ReplicaRouter(replica_urls=[])
+    assert asyncio.run(router.sessionmaker_for("client")) is AsyncSessionLocal
+
+
+def test_fresh_replica_serves_reads(tmp_path):
+    """Test a replica within the lag limit serves reads"""
+    router = ReplicaRouter(replica_urls=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    replica = router.replicas[0]
+
+    async def scenario():
+        try:
+            return await router.sessionmaker_for("client")
+        finally:
+            await router.dispose()
+
+    assert asyncio.run(scenario()) is replica.sessionmaker
+    assert replica.reads == 1
+
+
+def test_lagging_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    """Test a replica too far behind is skipped"""
+    monkeypatch.setattr(settings, "replica_lag_check_seconds", 60)
+    router = ReplicaRouter(replica_urls=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    replica = router.replicas[0]
+    replica.lag_seconds = settings.replica_max_lag_seconds + 1
+    replica.checked_at = float("inf")
+
+    assert asyncio.run(router.sessionmaker_for("client")) is AsyncSessionLocal
+    assert router.primary_reads == 1
+
+
+def test_recent_writer_reads_from_primary(tmp_path):
+    """Test clients that just wrote keep reading their own writes from the primary"""
+    router = ReplicaRouter(replica_urls=[f"sqlite:///{tmp_path / 'replica.db'}"])
+    router.record_write("writer")
+
+    async def scenario():
+        try:
+            return await router.sessionmaker_for("writer"), await router.sessionmaker_for("reader")
+        finally:
+            await router.dispose()
+
+    writer, reader = asyncio.run(scenario())
+    assert writer is AsyncSessionLocal
+    assert reader is router.replicas[0].sessionmaker
@@ -0,0 +1,41 @@
+"""
+Tests for the pooled SMTP email transport
+"""
+from concurrent.futures import ThreadPoolExecutor
+from app.services.email_transport import EmailTemplate, SMTPConnectionPool, SMTPEmailTransport
+from app.services.notification_transports import NotificationJob, Recipient, EMAIL
+from app.utils.smtp_sink import LocalSMTPSink
+
+
+def _jobs(count, message="3 escalations in the last 2 minutes"):
+    return [
+        NotificationJob(EMAIL, Recipient(id=i, email=f"agent{i}@example.com", full_name=f"Agent {i}"),
+                        "OmniLead digest", message)
+        for i in range(count)
+    ]
+
+
+def test_template_is_personalized():
+    """Test one rendered template is personalized per recipient"""
+    template = EmailTemplate("Subject", "Refund of $50 requested", reference_id=7)
+    body = template.render(Recipient(id=1, email="a@example.com", full_name="Ana"))
+    assert body.startswith("Hi Ana,")
+    assert "Refund of $50 requested" in body
+    assert "Reference ID: 7" in body
+
+
+def test_batches_reuse_pooled_connections():
+    """Test many emails go over a small number of persistent connections"""
+    with LocalSMTPSink() as sink:
+        pool = SMTPConnectionPool(sink.host, sink.port, use_tls=False, size=2)
+        transport = SMTPEmailTransport(pool, "noreply@omnilead.com")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(transport.send_batch, [_jobs(25) for _ in range(4)]))
+        transport.send(_jobs(1)[0])
+        transport.close()
+
+    assert len(sink.messages) == 101
+    assert sink.connections <= 2
+    assert pool.opened <= 2
+    assert any("Hi Agent 3," in data for _, _, data in sink.messages)
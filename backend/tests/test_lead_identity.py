@@ -0,0 +1,75 @@
+"""
+Tests for lead identity resolution and deduplication
+"""
+from app.models import Conversation, Lead
+from app.services import LeadIdentityService
+from app.utils.identity import normalize_phone, normalize_email
+
+
+def _conversation(db, sender_id, channel, lead_score=0.5):
+    conversation = Conversation(
+        external_id=f"{channel}-{sender_id}",
+        channel=channel,
+        sender_id=sender_id,
+        sender_name="Student",
+        message_text="I want to enroll",
+        lead_score=lead_score
+    )
+    db.add(conversation)
+    db.commit()
+    db.refresh(conversation)
+    return conversation
+
+
+def test_normalizers():
+    """Test phone and email normalization"""
+    assert normalize_phone("+1 (555) 010-9999") == "+15550109999"
+    assert normalize_phone("0044 20 7946 0958") == "+442079460958"
+    assert normalize_phone("123") is None
+    assert normalize_email("  Student@Example.COM ") == "student@example.com"
+    assert normalize_email("not-an-email") is None
+
+
+def test_resolve_lead_merges_across_channels(db):
+    """Test the same student on two channels resolves to one lead"""
+    service = LeadIdentityService()
+    whatsapp = _conversation(db, "wa-1", "whatsapp", lead_score=0.4)
+    instagram = _conversation(db, "ig-1", "instagram", lead_score=0.9)
+
+    first = service.resolve_lead(db, {"name": "Ana", "phone": "+1 555 010 9999"}, whatsapp)
+    db.commit()
+    second = service.resolve_lead(
+        db,
+        {"phone": "+1-555-010-9999", "email": "ana@example.com", "program_interest": "MBA"},
+        instagram
+    )
+    db.commit()
+
+    assert first.id == second.id
+    assert db.query(Lead).count() == 1
+    assert second.name == "Ana"
+    assert second.email == "ana@example.com"
+    assert second.program_interest == "MBA"
+    assert second.score == 0.9
+
+
+def test_merge_duplicate_leads(db):
+    """Test batch merging of historical duplicates"""
+    conversation = _conversation(db, "fb-1", "facebook")
+    db.add_all([
+        Lead(conversation_id=conversation.id, name="Ben", phone="+1 555 010 1111", score=0.3),
+        Lead(conversation_id=conversation.id, phone="+15550101111", email="ben@example.com", score=0.8),
+        Lead(conversation_id=conversation.id, email="BEN@example.com", notes="Called back", score=0.1),
+        Lead(conversation_id=conversation.id, name="Other", phone="+1 555 010 2222", score=0.5),
+    ])
+    db.commit()
+
+    merged = LeadIdentityService().merge_duplicate_leads(db, batch_size=2)
+
+    assert merged == 2
+    leads = db.query(Lead).order_by(Lead.id).all()
+    assert len(leads) == 2
+    assert leads[0].name == "Ben"
+    assert leads[0].email == "ben@example.com"
+    assert leads[0].score == 0.8
+    assert leads[0].notes == "Called back"
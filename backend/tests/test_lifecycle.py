@@ -0,0 +1,61 @@
+"""
+Tests for worker warmup, readiness and graceful drain
+"""
+import asyncio
+from app.config import settings
+from app.lifecycle import Lifecycle, READY, WARMING, DRAINING
+
+
+def test_ready_only_after_successful_warmup(monkeypatch):
+    """Test readiness reflects warmup state"""
+    monkeypatch.setattr(settings, "warmup_retry_seconds", 0.01)
+
+    async def scenario():
+        lifecycle = Lifecycle()
+        attempts = []
+
+        async def warmup():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("database unavailable")
+
+        await lifecycle.start(warmup)
+        first_state = lifecycle.state
+        await asyncio.sleep(0.1)
+        return first_state, lifecycle
+
+    first_state, lifecycle = asyncio.run(scenario())
+
+    assert first_state == WARMING
+    assert lifecycle.state == READY
+    assert lifecycle.status()["warmup_error"] is None
+
+
+def test_drain_waits_for_in_flight_webhooks():
+    """Test draining waits for webhooks and runs drain hooks"""
+    async def scenario():
+        lifecycle = Lifecycle()
+        disconnected = []
+
+        @lifecycle.on_drain
+        async def disconnect_sockets():
+            disconnected.append(lifecycle.in_flight_webhooks)
+
+        async def warmup():
+            pass
+
+        await lifecycle.start(warmup)
+        lifecycle.in_flight_webhooks = 1
+
+        async def finish_webhook():
+            await asyncio.sleep(0.1)
+            lifecycle.in_flight_webhooks -= 1
+
+        asyncio.create_task(finish_webhook())
+        await lifecycle.drain(timeout=2)
+        return lifecycle, disconnected
+
+    lifecycle, disconnected = asyncio.run(scenario())
+
+    assert lifecycle.state == DRAINING
+    assert disconnected == [0]
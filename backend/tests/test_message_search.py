@@ -0,0 +1,84 @@
+"""
+Tests for full-text search over message content
+"""
+from fastapi import status
+
+from app.models import Conversation, Message, User
+from app.services.message_search import fts5_query
+
+
+def _conversation(db, sender_id, messages, assigned_to=None):
+    conversation = Conversation(
+        external_id=f"ext-{sender_id}",
+        channel="whatsapp",
+        sender_id=sender_id,
+        sender_name=sender_id.title(),
+        assigned_to=assigned_to,
+    )
+    db.add(conversation)
+    db.flush()
+    for content in messages:
+        db.add(Message(conversation_id=conversation.id, direction="inbound", content=content))
+    db.commit()
+    return conversation
+
+
+def _search(client, token, **params):
+    return client.get("/api/conversations/search", params=params, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_search_ranks_and_highlights_matches(client, db, auth_token):
+    """Test better matches come first and matched words are highlighted"""
+    _conversation(db, "alice", ["I would like a refund for the course", "refund refund, the refund please"])
+    _conversation(db, "bob", ["When does enrollment open?"])
+
+    response = _search(client, auth_token, q="refund")
+
+    assert response.status_code == status.HTTP_200_OK
+    hits = response.json()
+    assert [hit["sender_name"] for hit in hits] == ["Alice", "Alice"]
+    assert hits[0]["relevance"] >= hits[1]["relevance"]
+    assert "<mark>refund</mark>" in hits[0]["highlight"]
+
+
+def test_search_pages_with_cursor(client, db, auth_token):
+    """Test following cursors returns every hit exactly once"""
+    _conversation(db, "alice", [f"enrollment question {i}" for i in range(5)])
+
+    ids, cursor = [], None
+    while True:
+        response = _search(client, auth_token, q="enrollment", limit=2, **({"cursor": cursor} if cursor else {}))
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(hit["id"] for hit in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+
+
+def test_search_respects_assignment(client, db, auth_service):
+    """Test agents only find messages in their own and unassigned conversations"""
+    other = User(email="other@example.com", hashed_password="x", full_name="Other", role="counselor")
+    agent = User(email="agent@example.com", hashed_password="x", full_name="Agent", role="counselor")
+    db.add_all([other, agent])
+    db.commit()
+    _conversation(db, "mine", ["scholarship details"], assigned_to=agent.id)
+    _conversation(db, "theirs", ["scholarship deadline"], assigned_to=other.id)
+    _conversation(db, "unassigned", ["scholarship amount"])
+    token = auth_service.create_access_token(data={"sub": agent.email})
+
+    response = _search(client, token, q="scholarship")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {hit["sender_name"] for hit in response.json()} == {"Mine", "Unassigned"}
+
+
+def test_search_input_is_not_fts_syntax(client, db, auth_token):
+    """Test operators and quotes in the query are treated as plain words"""
+    _conversation(db, "alice", ['Is the "AND" OR NOT course open?'])
+
+    assert fts5_query('course" OR NOT*') == '"course" "OR" "NOT"'
+    response = _search(client, auth_token, q='course" NOT*')
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
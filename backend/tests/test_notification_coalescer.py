@@ -0,0 +1,85 @@
+"""
+Tests for notification coalescing and digests
+"""
+import asyncio
+from app.services.notification_coalescer import NotificationCoalescer
+from app.services.notification_transports import NotificationJob, Recipient, PUSH, SMS
+
+AGENT = Recipient(id=1, email="agent@example.com")
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, job):
+        self.jobs.append(job)
+        return True
+
+
+def _job(channel=PUSH, category="escalation", message="New escalated conversation"):
+    return NotificationJob(channel, AGENT, message, message, 1, category)
+
+
+def test_burst_is_collapsed_into_digest():
+    """Test a burst per recipient/channel becomes one immediate send plus one digest"""
+    async def scenario():
+        dispatcher = RecordingDispatcher()
+        coalescer = NotificationCoalescer(dispatcher, window_seconds=120)
+        await coalescer.start()
+
+        assert not coalescer.submit(_job())  # first one goes out immediately
+        for _ in range(14):
+            assert coalescer.submit(_job())
+        assert coalescer.submit(_job(category="missed_message"))
+        assert not coalescer.submit(_job(channel=SMS))  # separate channel, separate window
+
+        await coalescer.stop()
+        return dispatcher.jobs
+
+    jobs = asyncio.run(scenario())
+
+    assert len(jobs) == 1
+    assert jobs[0].category == "digest"
+    assert jobs[0].message == "14 escalations, 1 missed message in the last 2 minutes"
+
+
+def test_digests_refused_by_the_dispatcher_are_counted():
+    """Test a digest the dispatcher does not accept is counted as dropped, not lost silently"""
+    class StoppedDispatcher:
+        def enqueue(self, job):
+            return False
+
+    async def scenario():
+        coalescer = NotificationCoalescer(StoppedDispatcher(), window_seconds=120)
+        await coalescer.start()
+        coalescer.submit(_job())
+        coalescer.submit(_job())
+        await coalescer.stop()
+        return coalescer.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["digests_sent"], stats["digests_dropped"]) == (1, 1)
+
+
+def test_urgent_bypasses_window():
+    """Test urgent notifications are never held back"""
+    async def scenario():
+        coalescer = NotificationCoalescer(RecordingDispatcher(), window_seconds=120)
+        await coalescer.start()
+        coalescer.submit(_job())
+        absorbed = coalescer.submit(_job(), urgent=True)
+        await coalescer.stop()
+        return absorbed
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_disabled_when_window_is_zero():
+    """Test coalescing is a pass-through when disabled"""
+    async def scenario():
+        coalescer = NotificationCoalescer(RecordingDispatcher(), window_seconds=0)
+        await coalescer.start()
+        return [coalescer.submit(_job()) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [False, False, False]
@@ -0,0 +1,130 @@
+"""
+Tests for the parallel notification dispatcher
+"""
+import asyncio
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_service import NotificationService
+from app.services.notification_transports import (
+    BatchSendError, LocalTransport, NotificationJob, Recipient, PUSH, EMAIL, SMS
+)
+
+RECIPIENT = Recipient(id=1, email="agent@example.com", full_name="Agent", role="counselor")
+
+
+def _dispatcher(**kwargs):
+    return NotificationDispatcher(
+        workers={PUSH: 4, EMAIL: 2, SMS: 2},
+        queue_size=kwargs.pop("queue_size", 100),
+        max_retries=kwargs.pop("max_retries", 2),
+        retry_backoff=0.01
+    )
+
+
+def test_fan_out_uses_per_channel_pools():
+    """Test jobs are delivered concurrently on each channel"""
+    async def scenario():
+        transports = {PUSH: LocalTransport(latency=0.05), EMAIL: LocalTransport(), SMS: LocalTransport()}
+        dispatcher = _dispatcher()
+        await dispatcher.start(transports)
+
+        for i in range(8):
+            assert dispatcher.enqueue(NotificationJob(PUSH, RECIPIENT, "Subject", f"message {i}"))
+        assert dispatcher.enqueue(NotificationJob(EMAIL, RECIPIENT, "Subject", "email"))
+
+        started = asyncio.get_running_loop().time()
+        await dispatcher.stop()
+        elapsed = asyncio.get_running_loop().time() - started
+        return transports, dispatcher, elapsed
+
+    transports, dispatcher, elapsed = asyncio.run(scenario())
+
+    assert len(transports[PUSH].sent) == 8
+    assert len(transports[EMAIL].sent) == 1
+    # Eight 50ms sends over four workers take ~100ms, not 400ms
+    assert elapsed < 0.3
+    metrics = dispatcher.get_metrics()
+    assert metrics[PUSH]["sent"] == 8
+    assert metrics[PUSH]["avg_send_ms"] >= 50
+
+
+def test_retries_with_backoff():
+    """Test a failing provider is retried before giving up"""
+    async def scenario():
+        transports = {PUSH: LocalTransport(fail_times=2), EMAIL: LocalTransport(fail_times=5), SMS: LocalTransport()}
+        dispatcher = _dispatcher(max_retries=2)
+        await dispatcher.start(transports)
+        dispatcher.enqueue(NotificationJob(PUSH, RECIPIENT, "Subject", "push"))
+        dispatcher.enqueue(NotificationJob(EMAIL, RECIPIENT, "Subject", "email"))
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+        return transports, dispatcher.get_metrics()
+
+    transports, metrics = asyncio.run(scenario())
+
+    assert len(transports[PUSH].sent) == 1
+    assert metrics[PUSH]["retried"] == 2
+    assert len(transports[EMAIL].sent) == 0
+    assert metrics[EMAIL]["failed"] == 1
+
+
+def test_notification_service_falls_back_to_inline_send():
+    """Test notifications are sent inline when the dispatcher is not running"""
+    service = NotificationService(dispatcher=_dispatcher())
+    service.transports = {PUSH: LocalTransport(), EMAIL: LocalTransport(), SMS: LocalTransport()}
+
+    service.send_bulk_notification([RECIPIENT], "Title", "Hello")
+
+    assert len(service.transports[PUSH].sent) == 1
+    assert service.transports[EMAIL].sent[0].subject == "Title"
+
+
+def test_inline_transports_are_built_on_demand_and_closed():
+    """Test a service builds no provider transports until it sends inline, and close() drops them"""
+    service = NotificationService(dispatcher=_dispatcher())
+    assert service.transports is None
+
+    closed = []
+    transport = LocalTransport()
+    transport.close = lambda: closed.append(True)
+    service.transports = {PUSH: transport, EMAIL: LocalTransport(), SMS: LocalTransport()}
+    service.close()
+
+    assert closed == [True]
+    assert service.transports is None
+
+
+class _PartialBatchTransport(LocalTransport):
+    """Delivers the first ``deliver`` jobs of its first batch, then fails the rest"""
+
+    def __init__(self, deliver):
+        super().__init__()
+        self.deliver = deliver
+        self.batches = 0
+
+    def send_batch(self, jobs):
+        self.batches += 1
+        if self.batches == 1:
+            self.sent.extend(jobs[:self.deliver])
+            raise BatchSendError(jobs[self.deliver:], ConnectionError("Simulated disconnect"))
+        self.sent.extend(jobs)
+
+
+def test_partial_batch_failure_retries_only_undelivered_jobs():
+    """Test emails delivered before a batch failed are not sent again"""
+    async def scenario():
+        transports = {PUSH: LocalTransport(), EMAIL: _PartialBatchTransport(deliver=2), SMS: LocalTransport()}
+        dispatcher = NotificationDispatcher(
+            workers={PUSH: 1, EMAIL: 1, SMS: 1}, queue_size=100, max_retries=2, retry_backoff=0.01, batch_size=10
+        )
+        await dispatcher.start(transports)
+        for i in range(5):
+            dispatcher.enqueue(NotificationJob(EMAIL, RECIPIENT, "Subject", f"email {i}"))
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+        return transports[EMAIL], dispatcher.get_metrics()
+
+    transport, metrics = asyncio.run(scenario())
+
+    assert sorted(job.message for job in transport.sent) == [f"email {i}" for i in range(5)]
+    assert metrics[EMAIL]["sent"] == 5
+    assert metrics[EMAIL]["retried"] == 3
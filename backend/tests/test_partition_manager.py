@@ -0,0 +1,101 @@
+"""
+Tests for monthly partition maintenance
+"""
+from datetime import date
+
+from app.services.partition_manager import (
+    PartitionManager,
+    _partition_month,
+    add_months,
+    month_start,
+    partition_name,
+)
+from app.utils.compliance import ComplianceManager
+
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session: records DDL instead of running it"""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+def manager_with(partitions, months_ahead=2):
+    manager = PartitionManager(compliance=ComplianceManager(), months_ahead=months_ahead)
+    manager.list_partitions = lambda db, table: [name for name in db.partitions if name.startswith(f"{table}_y")]
+    return manager
+
+
+def test_month_arithmetic():
+    """Test month helpers roll over year boundaries"""
+    assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name("messages", date(2027, 1, 1)) == "messages_y2027m01"
+    assert _partition_month("messages", "messages_y2027m01") == date(2027, 1, 1)
+    assert _partition_month("messages", "analytics_events_y2027m01") is None
+
+
+def test_ensure_partitions_creates_only_missing_months():
+    """Test the current and upcoming months are created once"""
+    db = RecordingSession(["messages_y2026m10", "analytics_events_y2026m10", "analytics_events_y2026m11"])
+    created = manager_with(db.partitions).ensure_partitions(db, today=date(2026, 10, 19))
+
+    assert created == [
+        "messages_y2026m11",
+        "messages_y2026m12",
+        "analytics_events_y2026m12",
+    ]
+    assert "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in db.statements[-1]
+
+
+def test_expired_partitions_follow_retention_policies():
+    """Test a partition is dropped only once its whole month is past retention"""
+    today = date(2026, 10, 19)
+    db = RecordingSession([
+        # messages are kept 730 days: cutoff 2024-10-19
+        "messages_y2024m09", "messages_y2024m10", "messages_y2026m10",
+        # analytics events are kept 365 days: cutoff 2025-10-19
+        "analytics_events_y2025m09", "analytics_events_y2025m10",
+    ])
+    manager = manager_with(db.partitions)
+    dropped = manager.drop_expired_partitions(db, today=today)
+
+    assert dropped == ["messages_y2024m09", "analytics_events_y2025m09"]
+    assert "ALTER TABLE messages DETACH PARTITION messages_y2024m09" in db.statements
+    assert manager.get_stats()["partitions_dropped"] == 2
+
+
+def test_maintenance_is_a_no_op_without_postgres(db):
+    """Test SQLite tables are not treated as partitioned"""
+    assert PartitionManager().is_supported(db) is False
+
+
+def test_plain_tables_are_skipped_and_reported_once(caplog):
+    """Test tables created without partitioning (create_all in development) get no partition DDL"""
+    class CatalogSession(RecordingSession):
+        def execute(self, statement, params=None):
+            super().execute(statement, params)
+            return CatalogResult(["messages"])
+
+    class CatalogResult:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def scalars(self):
+            return iter(self.rows)
+
+    db = CatalogSession([])
+    manager = manager_with(db.partitions)
+    with caplog.at_level("WARNING", logger="app.services.partition_manager"):
+        assert manager.partitioned_tables(db) == ["messages"]
+        assert manager.partitioned_tables(db) == ["messages"]
+
+    warnings = [record.getMessage() for record in caplog.records if "analytics_events" in record.getMessage()]
+    assert len(warnings) == 1
+    created = manager.ensure_partitions(db, today=date(2026, 10, 19), tables=["messages"])
+    assert all(name.startswith("messages_") for name in created)
@@ -0,0 +1,29 @@
+"""
+Tests for the authenticated-principal cache
+"""
+from fastapi import status
+from app.services.principal_cache import principal_cache
+
+
+def test_repeat_requests_hit_the_cache(client, auth_token):
+    """Test the user lookup is cached per token"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    hits_before = principal_cache.hits
+
+    first = client.get("/api/auth/me", headers=headers)
+    second = client.get("/api/auth/me", headers=headers)
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert principal_cache.hits == hits_before + 1
+
+
+def test_user_update_invalidates_cached_principal(client, db, test_user, auth_token):
+    """Test updating a user drops its cached principal"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Test User"
+
+    test_user.full_name = "Renamed User"
+    db.commit()
+
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Renamed User"
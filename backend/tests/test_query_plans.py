@@ -0,0 +1,113 @@
+"""
+Tests that the hot queries are served by indexes rather than full table scans
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select, text
+
+from app.models import AnalyticsEvent, Conversation, Lead, Message, User
+from app.routes.conversations import CONVERSATION_SORTS
+from app.utils.pagination import encode_cursor
+
+ROWS = 5000
+
+
+@pytest.fixture
+def populated_db(db):
+    """Enough rows, with planner statistics, for the plans to reflect real usage"""
+    now = datetime.utcnow()
+    db.execute(insert(User), [
+        {"email": f"agent{i}@example.com", "full_name": f"Agent {i}", "role": "sales"} for i in range(20)
+    ])
+    db.execute(insert(Conversation), [
+        {
+            "external_id": f"ext-{i}",
+            "channel": ("whatsapp", "facebook", "instagram")[i % 3],
+            "sender_id": f"sender-{i}",
+            "status": ("open", "escalated", "closed", "replied")[i % 4],
+            "needs_human": i % 10 == 0,
+            "assigned_to": (i % 20) + 1 if i % 2 else None,
+            "lead_score": (i % 100) / 100,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(ROWS)
+    ])
+    db.execute(insert(Message), [
+        {"conversation_id": (i % ROWS) + 1, "direction": ("inbound", "outbound")[i % 2], "content": "hi"}
+        for i in range(ROWS * 2)
+    ])
+    db.execute(insert(Lead), [
+        {
+            "conversation_id": i + 1,
+            "status": ("new", "qualified", "converted", "lost")[i % 4],
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(ROWS)
+    ])
+    db.execute(insert(AnalyticsEvent), [
+        {
+            "event_type": ("message_received", "lead_created", "conversation_closed")[i % 3],
+            "conversation_id": i + 1,
+            "lead_id": i + 1,
+            "timestamp": now - timedelta(minutes=i),
+        }
+        for i in range(ROWS)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return db
+
+
+def full_scans(db, statement):
+    """Tables read by a plain full scan (no index) in the SQLite query plan"""
+    compiled = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return [row[-1] for row in plan if row[-1].startswith("SCAN") and "INDEX" not in row[-1]]
+
+
+def hot_queries():
+    since = datetime.utcnow() - timedelta(days=30)
+    return {
+        "conversation list by channel/status": select(Conversation).where(
+            Conversation.channel == "whatsapp", Conversation.status == "open"
+        ),
+        "conversation page after a cursor": CONVERSATION_SORTS["updated_at"].apply(
+            select(Conversation).where(Conversation.channel == "whatsapp", Conversation.status == "open"),
+            encode_cursor("updated_at", [since, 2500]),
+            50
+        ),
+        "conversation list for an agent": select(Conversation).where(
+            (Conversation.assigned_to == 3) | (Conversation.assigned_to.is_(None))
+        ),
+        "conversation messages": select(Message).where(Message.conversation_id == 42),
+        "dashboard conversations by channel": select(
+            Conversation.channel, func.count(Conversation.id)
+        ).where(Conversation.created_at >= since).group_by(Conversation.channel),
+        "dashboard response time": select(func.avg(Conversation.first_response_seconds)).where(
+            Conversation.created_at >= since
+        ),
+        "dashboard leads by status": select(
+            Lead.status, func.count(Lead.id)
+        ).where(Lead.created_at >= since).group_by(Lead.status),
+        "funnel qualified leads": select(func.count(Lead.id)).where(
+            Lead.created_at >= since, Lead.status == "qualified"
+        ),
+        "escalation queue": select(Conversation.id).where(
+            Conversation.needs_human == True, Conversation.status != "closed"  # noqa: E712
+        ).order_by(Conversation.created_at),
+        "agent performance": select(
+            User.full_name, func.count(Conversation.id), func.avg(Conversation.lead_score)
+        ).join(Conversation, Conversation.assigned_to == User.id).group_by(User.id, User.full_name),
+        "events by type and time": select(AnalyticsEvent).where(
+            AnalyticsEvent.event_type == "lead_created", AnalyticsEvent.timestamp >= since
+        ),
+        "lead events to repoint on merge": select(AnalyticsEvent.id).where(AnalyticsEvent.lead_id.in_([1, 2, 3])),
+    }
+
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+def test_hot_query_uses_indexes(populated_db, name):
+    """Test no hot query falls back to a sequential scan of a large table"""
+    scans = [scan for scan in full_scans(populated_db, hot_queries()[name]) if not scan.startswith("SCAN users")]
+    assert scans == [], f"{name} scans without an index: {scans}"
@@ -0,0 +1,67 @@
+"""
+Tests for the cached notification recipient directory
+"""
+from app.models import User
+from app.services.recipient_directory import RecipientDirectory
+
+
+def test_directory_is_loaded_once(db, test_user):
+    """Test repeated lookups are served from the cache"""
+    directory = RecipientDirectory(ttl_seconds=60)
+
+    first = directory.get_recipients(db, ["admin"])
+    second = directory.get_recipients(db, ["admin", "sales"])
+
+    assert [r.email for r in first] == [test_user.email]
+    assert first == second
+    assert directory.loads == 1
+    assert directory.hits == 1
+
+
+def test_directory_refreshes_after_user_changes(db, test_user):
+    """Test deactivating a user is reflected after commit"""
+    from app.services.recipient_directory import recipient_directory
+
+    assert len(recipient_directory.get_recipients(db, ["admin"])) == 1
+
+    test_user.is_active = False
+    db.commit()
+    assert recipient_directory.get_recipients(db, ["admin"]) == []
+
+    db.add(User(email="sales@example.com", full_name="Sales", role="sales",
+                hashed_password="x", notification_channels="email"))
+    db.commit()
+    recipients = recipient_directory.get_recipients(db, ["sales"])
+    assert recipients[0].accepts("email")
+    assert not recipients[0].accepts("sms")
+
+
+def test_lookup_does_not_wait_for_a_load_in_progress(db, test_user):
+    """Test a cold lookup loads by itself while another load holds the loading lock"""
+    directory = RecipientDirectory(ttl_seconds=60)
+
+    # As when another run_sync greenlet on this thread is suspended mid-load
+    directory._loading.acquire()
+    try:
+        recipients = directory.get_recipients(db, ["admin"])
+    finally:
+        directory._loading.release()
+
+    assert [r.email for r in recipients] == [test_user.email]
+    assert directory.get_recipients(db, ["admin"]) == recipients
+    assert directory.hits == 1
+
+
+def test_directory_reloads_after_another_workers_change(db, test_user):
+    """Test a user change broadcast by another worker drops the cached directory"""
+    from app.services.principal_cache import principal_cache
+    from app.services.recipient_directory import recipient_directory
+
+    recipient_directory.get_recipients(db, ["admin"])
+    loads = recipient_directory.loads
+
+    # As delivered by the principal cache's pub/sub listener
+    principal_cache._notify_remote(test_user.id)
+    recipient_directory.get_recipients(db, ["admin"])
+
+    assert recipient_directory.loads == loads + 1
@@ -0,0 +1,60 @@
+"""
+Tests for webhook ingestion
+"""
+from fastapi import status
+from sqlalchemy import func, select
+
+from app.container import get_webhook_service
+from app.main import app
+from app.models import Conversation, Message
+from app.services import WebhookService
+
+
+class ScriptedAI:
+    """Classifies every message confidently; escalation comes from the keyword rules"""
+
+    def process_message(self, message_text):
+        return {"intent": "support", "sentiment": 0.0, "lead_score": 0.2, "confidence": 0.9, "reply": None}
+
+    def extract_lead_info(self, message_text):
+        return {}
+
+
+class RecordingNotifications:
+    def __init__(self):
+        self.escalated = []
+
+    def send_escalation_notification(self, conversation, db, urgent=None):
+        self.escalated.append(conversation.sender_id)
+
+
+def _whatsapp(*messages):
+    return {"entry": [{"changes": [{"value": {"messages": [
+        {"id": f"m{i}", "from": sender, "type": "text", "text": {"body": body}, "timestamp": str(1700000000000 + i)}
+        for i, (sender, body) in enumerate(messages)
+    ]}}]}]}
+
+
+def test_batched_webhook_stores_counts_and_escalates(client, db):
+    """Test a multi-message webhook stores every message, counts per sender and escalates on the latest one"""
+    notifications = RecordingNotifications()
+    service = WebhookService(ai_service=ScriptedAI(), notification_service=notifications)
+    app.dependency_overrides[get_webhook_service] = lambda: service
+
+    response = client.post("/api/webhooks/whatsapp", json=_whatsapp(
+        ("111", "hello"),
+        ("222", "hi there"),
+        ("111", "I want a refund"),
+    ))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "processed"
+    assert response.json()["messages"] == 3
+    assert db.scalar(select(func.count(Message.id))) == 3
+
+    conversations = {c.sender_id: c for c in db.scalars(select(Conversation))}
+    assert {sender: c.message_count for sender, c in conversations.items()} == {"111": 2, "222": 1}
+    assert conversations["111"].message_text == "I want a refund"
+    assert (conversations["111"].status, conversations["111"].needs_human) == ("escalated", True)
+    assert conversations["222"].status == "open"
+    assert notifications.escalated == ["111"]